@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+"""
+Batch - Planification de menus pour plusieurs familles dans un seul processus
+
+Chaque famille d'un fichier de profils (JSONL ou CSV) obtient son propre
+MenuFlow et son propre dossier de sortie. Le travail commun est mutualisé :
+- les recettes identiques (même plat, même composition familiale, même modèle)
+  ne sont générées qu'une fois puis copiées dans le dossier de chaque famille
+- les résultats de recherche et de scraping sont partagés par le cache HTTP
+- le cache de recettes et la bibliothèque servent aussi aux exécutions suivantes
+
+Usage:
+    uv run batch familles.jsonl
+    uv run batch familles.csv --output-root output/familles
+"""
+
+import argparse
+import csv
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from pydantic import ValidationError
+
+from menu_planner import events, memory
+from menu_planner import main as menu_main
+from menu_planner.checkpoint import mark_recipe_completed
+from menu_planner.config import config
+from menu_planner.executor import run_concurrently
+from menu_planner.identity import slugify
+from menu_planner.library import get_recipe_library
+from menu_planner.metrics import get_metrics, install_hooks, reset_metrics
+from menu_planner.recipe_cache import ARTIFACT_PATHS, get_recipe_cache, recipe_cache_key
+from menu_planner.rendering import nutrition_notes_from_output
+from menu_planner.schemas import FamilyProfile
+
+logger = logging.getLogger("menu_planner.batch")
+
+
+def load_profiles(path) -> List[FamilyProfile]:
+    """
+    Charge les profils de familles depuis un fichier JSONL ou CSV.
+
+    Colonnes / clés attendues: name, adults, children, children_age, email.
+    Les lignes invalides sont ignorées avec un avertissement.
+
+    Returns:
+        List[FamilyProfile]: Profils valides, dans l'ordre du fichier
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            rows = [{k: v for k, v in row.items() if v not in (None, "")} for row in csv.DictReader(f)]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    profiles = []
+    for line_number, row in enumerate(rows, start=1):
+        try:
+            profiles.append(FamilyProfile(**row))
+        except ValidationError as e:
+            logger.warning(f"Ignoring invalid family profile #{line_number}: {str(e)}")
+    logger.info(f"Loaded {len(profiles)} family profiles from {path}")
+    return profiles
+
+
+def family_slug(name: str) -> str:
+    """Nom de dossier sûr pour une famille."""
+    return slugify(name, default="famille")
+
+
+def create_family_flows(profiles: List[FamilyProfile], output_root) -> List[menu_main.MenuFlow]:
+    """
+    Crée un MenuFlow par famille, avec son état et un dossier de sortie isolé.
+
+    Returns:
+        List[MenuFlow]: Flows alignés sur `profiles`
+    """
+    flows = []
+    used_slugs = set()
+    for profile in profiles:
+        slug = family_slug(profile.name)
+        suffix = 2
+        while slug in used_slugs:
+            slug = f"{family_slug(profile.name)}_{suffix}"
+            suffix += 1
+        used_slugs.add(slug)
+
+        output_dir = str(Path(output_root) / slug)
+        menu_main.ensure_output_dirs(output_dir)
+        flow = menu_main.MenuFlow()
+        flow.state.adults = profile.adults
+        flow.state.children = profile.children
+        flow.state.children_age = profile.children_age
+        flow.state.send_to = profile.email or config.family.email
+        flow.state.output_dir = output_dir
+        flows.append(flow)
+    return flows
+
+
+def plan_menu(flow) -> bool:
+    """Étapes du menu d'une famille: génération, vérification, page du menu (en arrière-plan) et préparation des recettes."""
+    flow.generate_menu()
+    flow.check_state()
+    flow.start_menu_html()
+    flow.prepare_recipe_inputs()
+    return True
+
+
+def generate_shared_recipes(flows) -> Dict[str, int]:
+    """
+    Génère les recettes de toutes les familles en mutualisant les plats identiques.
+
+    Les recettes sont regroupées par clé de cache (plat, composition familiale,
+    modèle et prompts). Pour chaque groupe, une seule recette est restaurée du
+    cache ou de la bibliothèque, ou générée, puis ses fichiers sont copiés chez les autres familles
+    dès qu'elle est prête, ce qui alimente aussitôt l'agrégat de leur liste de courses.
+    `parallel_results` de chaque flow est ensuite rempli comme par `process_recipes`.
+
+    Returns:
+        Dict[str, int]: Nombre de recettes demandées, distinctes, restaurées et générées
+    """
+    groups: Dict[str, list] = {}
+    for flow in flows:
+        flow.start_shopping_aggregate(flow.state.recipe_inputs)
+        for recipe_input in flow.state.recipe_inputs:
+            groups.setdefault(recipe_cache_key(recipe_input), []).append((flow, recipe_input))
+    group_of = {id(members[0][1]): key for key, members in groups.items()}
+    succeeded = set()
+
+    def distribute(key):
+        """Copie les fichiers d'une recette prête chez chaque famille du groupe."""
+        source = groups[key][0][1]
+        for flow, recipe_input in groups[key]:
+            if recipe_input is not source:
+                try:
+                    for path_key in ARTIFACT_PATHS.values():
+                        shutil.copyfile(source[path_key], recipe_input[path_key])
+                except OSError as e:
+                    logger.error(f"Could not copy {recipe_input['recipe_name']} to {flow.state.output_dir}: {str(e)}")
+                    continue
+                events.emit_recipe("recipe_completed", recipe_input, source="shared")
+            mark_recipe_completed(flow.state, recipe_input["recipe_id"])
+            flow.add_to_shopping_list(recipe_input)
+            succeeded.add(id(recipe_input))
+
+    recipe_cache = get_recipe_cache()
+    recipe_library = get_recipe_library()
+    pending = []
+    for key, members in groups.items():
+        if recipe_cache and recipe_cache.restore(members[0][1]):
+            if recipe_library:
+                recipe_library.ingest(members[0][1])
+            events.emit_recipe("recipe_completed", members[0][1], source="cache")
+            distribute(key)
+        elif recipe_library and recipe_library.restore(members[0][1]):
+            events.emit_recipe("recipe_completed", members[0][1], source="library")
+            distribute(key)
+        else:
+            pending.append(key)
+    logger.info(f"Batch recipes: {sum(len(m) for m in groups.values())} requested, {len(groups)} distinct, "
+                f"{len(groups) - len(pending)} restored from cache or library, {len(pending)} to generate")
+
+    def on_recipe_complete(recipe_input, result):
+        if recipe_cache:
+            recipe_cache.store(recipe_input)
+        if recipe_library:
+            recipe_library.ingest(recipe_input, nutrition_notes_from_output(result))
+        events.emit_recipe("recipe_completed", recipe_input, source="generated")
+        distribute(group_of[id(recipe_input)])
+
+    execution = config.execution
+    results = run_concurrently(
+        menu_main.MenuFlow.generate_recipe,
+        [groups[key][0][1] for key in pending],
+        max_concurrency=execution.max_concurrency,
+        timeout=execution.recipe_timeout,
+        max_retries=execution.max_retries,
+        retry_backoff=execution.retry_backoff,
+        label=lambda recipe_input: recipe_input["recipe_name"],
+        on_complete=on_recipe_complete,
+    )
+    for key, result in zip(pending, results):
+        if result is None:
+            for _, recipe_input in groups[key]:
+                events.emit_recipe("recipe_failed", recipe_input)
+
+    for flow in flows:
+        flow.state.parallel_results = [
+            "shared" if id(recipe_input) in succeeded else None for recipe_input in flow.state.recipe_inputs
+        ]
+        flow.state.processing_mode = "batch"
+
+    return {
+        "requested": sum(len(members) for members in groups.values()),
+        "distinct": len(groups),
+        "restored": len(groups) - len(pending),
+        "generated": sum(1 for result in results if result is not None),
+    }
+
+
+def finish_family(flow) -> bool:
+    """Étapes finales d'une famille: suivi des recettes, liste de courses et HTML du menu."""
+    flow.track_recipe_results()
+    shopping_ok = flow.prepare_shopping_list()
+    html_ok = flow.collect_menu_html()
+    return shopping_ok is not False and html_ok is not False
+
+
+def run_batch(profiles: List[FamilyProfile], output_root="output/families") -> dict:
+    """
+    Planifie les menus de plusieurs familles en partageant le travail commun.
+
+    Args:
+        profiles: Profils des familles
+        output_root: Dossier racine, un sous-dossier par famille
+
+    Returns:
+        dict: Dossier de sortie et statut de chaque famille, statistiques de mutualisation
+    """
+    if menu_main.MaRecette:
+        logger.error("Batch mode plans full menus; unset SINGLE_RECIPE to use it")
+        return {}
+    if config.checkpoint_path:
+        # Un fichier unique serait écrasé par chaque famille: les checkpoints restent dans leurs dossiers
+        logger.error("Batch mode saves one checkpoint per family output directory; unset CHECKPOINT_PATH to use it")
+        return {}
+
+    flows = create_family_flows(profiles, output_root)
+    concurrency = config.execution.max_concurrency
+    label = lambda flow: flow.state.output_dir
+
+    planned = run_concurrently(plan_menu, flows, max_concurrency=concurrency, label=label)
+    planned_flows = [flow for flow, ok in zip(flows, planned) if ok]
+    recipe_stats = generate_shared_recipes(planned_flows)
+    finished = run_concurrently(finish_family, planned_flows, max_concurrency=concurrency, label=label)
+
+    status = {id(flow): bool(ok) for flow, ok in zip(planned_flows, finished)}
+    families = [
+        {"name": profile.name, "output_dir": flow.state.output_dir, "success": status.get(id(flow), False),
+         "recipes": len(flow.state.recipe_ids)}
+        for profile, flow in zip(profiles, flows)
+    ]
+    succeeded = sum(1 for family in families if family["success"])
+    logger.info(f"Batch complete: {succeeded}/{len(families)} families, "
+                f"{recipe_stats['distinct']} distinct recipes for {recipe_stats['requested']} requested")
+    return {"families": families, "recipes": recipe_stats}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan menus for several families in one process")
+    parser.add_argument("profiles", help="JSONL or CSV file of family profiles")
+    parser.add_argument("--output-root", default="output/families", help="one output directory per family below this")
+    parser.add_argument("--report", help="write the batch summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    profiles = load_profiles(args.profiles)
+    if not profiles:
+        logger.error("No valid family profile to plan")
+        return
+
+    menu_main.init_monitoring()
+    metrics = reset_metrics()
+    install_hooks()
+    memory.begin_run()
+    events.start_event_stream(metrics.run_id, args.output_root)
+    events.emit("run_started", mode="batch", families=len(profiles), output_dir=args.output_root)
+    success = False
+    try:
+        summary = run_batch(profiles, args.output_root)
+        success = True
+    finally:
+        events.emit("run_finished", success=success, seconds=round(time.time() - metrics.started_at, 3))
+        events.stop_event_stream()
+        memory.end_run()
+        try:
+            get_metrics().export()
+        except OSError as e:
+            logger.error(f"Could not export run metrics: {str(e)}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
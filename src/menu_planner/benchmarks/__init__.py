@@ -0,0 +1 @@
+"""Benchmarks hors ligne de Menu Planner (LLM factice, outils locaux)."""
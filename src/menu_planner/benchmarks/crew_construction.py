@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Benchmark de construction des crews
+
+Compare, pour N recettes, la construction d'un RecipeExpertCrew complet via
+`@CrewBase` (relecture des YAML, création des agents et tâches) à la copie
+d'un gabarit construit une fois (`menu_planner.crew_factory`). Mesure la
+durée totale, la durée par crew et la mémoire allouée (tracemalloc).
+
+Aucun crew n'est lancé : le LLM factice et les outils locaux du benchmark
+hors ligne évitent toute clé API et tout appel réseau.
+
+Usage:
+    uv run crew_benchmark
+    uv run crew_benchmark --crews 500 --crew MenuDesignerCrew
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def measure(build, count: int) -> dict:
+    """Construit `count` crews avec `build` et mesure durée et allocations."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(count):
+        build()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "total_seconds": round(seconds, 3),
+        "ms_per_crew": round(seconds * 1000 / count, 2),
+        "peak_alloc_mb": round(peak / (1024 * 1024), 1),
+    }
+
+
+def run(count: int, crew_name: str) -> dict:
+    """
+    Compare la construction directe et la copie de gabarit pour `crew_name`.
+
+    Returns:
+        dict: Mesures des deux stratégies et gain de la copie
+    """
+    os.chdir(tempfile.mkdtemp(prefix="menu_planner_crews_"))
+    from menu_planner.benchmarks.run import configure_offline
+
+    configure_offline(latency=0.0, concurrency=1)
+
+    from menu_planner import crew_factory, crews
+
+    crew_class = getattr(crews, crew_name)
+    crew_class().crew()  # warm-up: imports and first YAML parse
+    crew_factory.get_template(crew_name)
+
+    direct = measure(lambda: crew_class().crew(), count)
+    copied = measure(lambda: crew_factory.create_crew(crew_name), count)
+    return {
+        "crew": crew_name,
+        "crews": count,
+        "direct": direct,
+        "template_copy": copied,
+        "speedup": round(direct["total_seconds"] / max(copied["total_seconds"], 1e-9), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare direct crew construction with template copies")
+    parser.add_argument("--crews", type=int, default=200, help="number of crews to build per strategy")
+    parser.add_argument("--crew", default="RecipeExpertCrew", help="crew class to build")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    result = run(args.crews, args.crew)
+    print(f"{result['crew']} x {result['crews']}")
+    for strategy in ("direct", "template_copy"):
+        stats = result[strategy]
+        print(f"  {strategy:<14} {stats['total_seconds']:>8.2f} s  {stats['ms_per_crew']:>8.2f} ms/crew  "
+              f"{stats['peak_alloc_mb']:>7.1f} MB peak")
+    print(f"  speedup        {result['speedup']:.1f}x")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Fakes - LLM et outils locaux déterministes pour les benchmarks hors ligne
+
+`FakeLLM` reconnaît la tâche en cours à partir du prompt et renvoie une réponse
+pré-enregistrée (menu JSON, recette, YAML Paprika, ingrédients JSON, HTML...)
+au format attendu par CrewAI. Les outils de recherche et de scraping sont
+remplacés par des équivalents locaux qui n'accèdent jamais au réseau.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.tools import BaseTool
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MENU_TITLES = [
+    "Gratin dauphinois", "Poulet rôti aux herbes", "Soupe de légumes", "Lasagnes aux épinards",
+    "Saumon en papillote", "Curry de lentilles", "Quiche lorraine", "Ratatouille",
+    "Hachis parmentier", "Salade niçoise", "Blanquette de veau", "Risotto aux champignons",
+    "Chili sin carne", "Tarte aux poireaux",
+]
+
+FAKE_MENU = {
+    "menu": {
+        day: {
+            "lunch": {"title": MENU_TITLES[2 * i], "description": "Plat familial équilibré", "calories": 450},
+            "dinner": {"title": MENU_TITLES[2 * i + 1], "description": "Dîner léger et savoureux", "calories": 380},
+        }
+        for i, day in enumerate(DAYS)
+    }
+}
+
+FAKE_INGREDIENTS = [
+    {"name": "pommes de terre", "quantity": 1, "unit": "kg"},
+    {"name": "crème fraîche", "quantity": 20, "unit": "cl"},
+    {"name": "lait entier", "quantity": 200, "unit": "ml"},
+    {"name": "gousses d'ail", "quantity": 2, "unit": "unités"},
+    {"name": "huile d'olive", "quantity": 2, "unit": "c. à soupe"},
+    {"name": "beurre", "quantity": 30, "unit": "g"},
+    {"name": "sel", "quantity": 1, "unit": "pincée"},
+]
+
+FAKE_YAML = """name: Recette de test
+servings: 4 portions
+source: Benchmark
+source_url: https://example.org/recette
+prep_time: 15 min
+cook_time: 30 min
+on_favorites: non
+categories: [Plats principaux]
+nutritional_info: 400 calories par portion
+difficulty: Facile
+rating: 4
+notes: |
+  Recette générée hors ligne pour les benchmarks.
+ingredients: |
+  1 kg de pommes de terre
+  20 cl de crème fraîche
+directions: |
+  1. Préparer les ingrédients.
+  2. Cuire 30 minutes.
+"""
+
+FAKE_HTML = "<!DOCTYPE html><html lang=\"fr\"><head><meta charset=\"UTF-8\"><title>Test</title></head>" \
+            "<body><h1>Recette de test</h1></body></html>"
+
+FAKE_RECIPE_PAGE = FAKE_HTML.replace("</head>", "<script type=\"application/ld+json\">" + json.dumps({
+    "@context": "https://schema.org", "@type": "Recipe", "name": "Recette de test", "recipeYield": "4",
+    "prepTime": "PT15M", "cookTime": "PT30M", "recipeIngredient": ["500 g de pâtes", "2 tomates"],
+    "recipeInstructions": [{"@type": "HowToStep", "text": "Cuire les pâtes."}],
+}) + "</script></head>")
+
+FAKE_STRUCTURED_RECIPE = {
+    "name": "Recette de test",
+    "subtitle": "Plat familial équilibré",
+    "servings": "4 portions",
+    "source": "Benchmark",
+    "source_url": "https://example.org/recette",
+    "prep_time": "15 min",
+    "cook_time": "30 min",
+    "categories": ["Plats principaux"],
+    "nutritional_info": "400 calories par portion",
+    "difficulty": "Facile",
+    "rating": 4,
+    "notes": "Recette générée hors ligne pour les benchmarks.",
+    "ingredients": FAKE_INGREDIENTS,
+    "directions": ["Préparer les ingrédients.", "Cuire 30 minutes."],
+    "nutrition_tips": ["Ajouter des légumes de saison."],
+}
+
+FAKE_TEXT = "Recette détaillée : ingrédients, étapes et paramètres Thermomix. Environ 400 kcal par portion."
+
+# Marqueurs de prompt -> réponse, testés dans l'ordre (le premier qui correspond l'emporte)
+CANNED_RESPONSES = [
+    ("plan de menu complet", json.dumps(FAKE_MENU, ensure_ascii=False)),
+    ("unique objet structuré", json.dumps(FAKE_STRUCTURED_RECIPE, ensure_ascii=False)),
+    ("Paprika 3", FAKE_YAML),
+    ("ingrédients au format JSON", json.dumps(FAKE_INGREDIENTS, ensure_ascii=False)),
+    ("rayons de supermarché", json.dumps([{"category": "Épicerie", "ingredients": FAKE_INGREDIENTS}],
+                                          ensure_ascii=False)),
+    ("version Markdown", "# Liste de courses\n\n- [ ] pommes de terre (1 kg)\n"),
+    ("HTML", FAKE_HTML),
+    ("profil nutritionnel", FAKE_TEXT),
+]
+
+READY = "READY: I am ready to execute the task."
+
+_usage_lock = threading.Lock()
+
+
+class FakeLLM(BaseLLM):
+    """
+    LLM déterministe et local, compatible avec le format ReAct de CrewAI.
+
+    Les compteurs sont tenus dans le dictionnaire `usage`, partagé avec les
+    copies du LLM (CrewAI copie le LLM des agents avec le crew) et, s'il est
+    fourni, avec l'appelant.
+
+    Attributs:
+        latency: Latence simulée par appel, en secondes
+        usage: Compteurs `calls`, `prompt_tokens` (environ quatre caractères par token) et `completion_tokens`
+    """
+
+    def __init__(self, latency: float = 0.0, model: str = "fake/menu-planner", usage: Optional[dict] = None):
+        super().__init__(model=model, temperature=0)
+        self.latency = latency
+        self.usage = usage if usage is not None else {}
+        for counter in ("calls", "prompt_tokens", "completion_tokens"):
+            self.usage.setdefault(counter, 0)
+
+    @property
+    def calls(self) -> int:
+        """Nombre d'appels reçus."""
+        return self.usage["calls"]
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens d'entrée reçus."""
+        return self.usage["prompt_tokens"]
+
+    @property
+    def completion_tokens(self) -> int:
+        """Tokens de sortie renvoyés."""
+        return self.usage["completion_tokens"]
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], tools: Optional[List[dict]] = None,
+             callbacks: Optional[List[Any]] = None, available_functions: Optional[Dict[str, Any]] = None,
+             **kwargs) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(message.get("content", "")) for message in messages
+        )
+        # Les appels hors exécution de tâche (planification du raisonnement) n'attendent pas de "Final Answer"
+        if "Final Answer" not in prompt:
+            answer = f"Plan: suivre les instructions de la tâche.\n{READY}"
+        else:
+            answer = f"Thought: I now know the final answer\nFinal Answer: {self.answer_for(prompt)}"
+        with _usage_lock:
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += len(prompt) // 4
+            self.usage["completion_tokens"] += len(answer) // 4
+        return answer
+
+    @staticmethod
+    def answer_for(prompt: str) -> str:
+        """Réponse pré-enregistrée correspondant à la tâche décrite dans le prompt."""
+        # Seule la dernière description de tâche est pertinente (le contexte peut en citer d'autres)
+        task_text = prompt.rsplit("Current Task:", 1)[-1]
+        for marker, response in CANNED_RESPONSES:
+            if marker in task_text:
+                return response
+        return FAKE_TEXT
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128000
+
+
+class StubSearchTool(BaseTool):
+    """Remplaçant local de SafeSerperTool."""
+    name: str = "search_internet"
+    description: str = "Offline stand-in for the internet search tool."
+
+    def _run(self, search_query: str) -> str:
+        return f"Search results for: {search_query}\n\n1. Recette de test\n   Résultat local\n   URL: https://example.org\n"
+
+
+class StubScrapeTool(BaseTool):
+    """Remplaçant local de ScrapeNinjaTool."""
+    name: str = "ScrapeNinja"
+    description: str = "Offline stand-in for the ScrapeNinja scraping tool."
+
+    def _run(self, url: str = "", **kwargs) -> str:
+        from menu_planner.tools.recipe_extractor import compact_scrape_response
+
+        return compact_scrape_response(json.dumps({"info": {"statusCode": 200}, "body": FAKE_RECIPE_PAGE}), url)
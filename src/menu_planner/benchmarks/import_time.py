@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Budget de temps d'import des points d'entrée
+
+Mesure avec `python -X importtime`, dans un processus neuf, le temps d'import
+cumulé des modules de démarrage et vérifie qu'aucun module lourd n'y est
+chargé (CrewAI, crews, outils, AgentOps). Un dépassement fait échouer la
+commande (code de sortie 1) : à lancer en intégration continue pour détecter
+les régressions de démarrage.
+
+Usage:
+    uv run import_budget
+    uv run import_budget --repeat 5 --json import_time.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Module mesuré -> (budget en millisecondes, préfixes de modules interdits)
+BUDGETS = {
+    "menu_planner.cli": (100, ["crewai", "litellm", "agentops", "pydantic", "menu_planner.main",
+                               "menu_planner.crews", "menu_planner.tools"]),
+    "menu_planner.config": (400, ["crewai", "litellm", "agentops"]),
+    "menu_planner.main": (None, ["agentops", "crewai_tools", "menu_planner.tools",
+                                 "menu_planner.crews.recipe_expert_crew", "menu_planner.crews.menu_designer_crew",
+                                 "menu_planner.crews.shopping_crew", "menu_planner.crews.html_design_crew"]),
+}
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> dict:
+    """
+    Importe `module` dans un nouvel interpréteur avec `-X importtime`.
+
+    Returns:
+        dict: Temps cumulé du module (ms) et liste des modules importés, ou "error"
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        return {"error": last_line[0]}
+
+    cumulative_us = 0
+    imported = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        imported.append(match.group(4))
+        if match.group(4) == module:
+            cumulative_us = int(match.group(2))
+    return {"milliseconds": cumulative_us / 1000, "imported": imported}
+
+
+def check(module: str, budget_ms, forbidden, repeat: int = 3) -> dict:
+    """Mesure `module` `repeat` fois et compare la médiane au budget."""
+    runs = [measure(module) for _ in range(repeat)]
+    errors = [run["error"] for run in runs if "error" in run]
+    if errors:
+        return {"module": module, "ok": False, "error": errors[0]}
+
+    median_ms = statistics.median(run["milliseconds"] for run in runs)
+    loaded = sorted({name for name in runs[0]["imported"]
+                     if any(name == prefix or name.startswith(prefix + ".") for prefix in forbidden)})
+    over_budget = budget_ms is not None and median_ms > budget_ms
+    return {
+        "module": module,
+        "ok": not over_budget and not loaded,
+        "median_ms": round(median_ms, 1),
+        "budget_ms": budget_ms,
+        "forbidden_imports": loaded,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the entry points")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS), help="modules to check")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per module (median is used)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI machines)")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in args.modules:
+        budget_ms, forbidden = BUDGETS.get(module, (None, []))
+        if budget_ms is not None:
+            budget_ms *= args.scale
+        result = check(module, budget_ms, forbidden, args.repeat)
+        results.append(result)
+        if "error" in result:
+            print(f"FAIL {module}: import failed ({result['error']})")
+            continue
+        budget = f"{result['budget_ms']:.0f} ms" if result["budget_ms"] is not None else "no budget"
+        status = "ok  " if result["ok"] else "FAIL"
+        print(f"{status} {module}: {result['median_ms']:.1f} ms ({budget})")
+        for name in result["forbidden_imports"]:
+            print(f"     loads {name} at import time")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
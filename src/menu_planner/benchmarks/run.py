@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Benchmark hors ligne de MenuFlow
+
+Exécute toutes les étapes du flow (menu, recettes, liste de courses, HTML)
+avec un LLM factice déterministe et des outils locaux, sans réseau ni clé API,
+afin de mesurer le coût propre de l'orchestration : construction des crews,
+chargement des YAML, gestion de l'état et écriture des fichiers.
+
+Chaque taille (par défaut 14, 100 et 1 000 recettes) est exécutée dans un
+processus séparé, dans un répertoire temporaire, pour isoler la mémoire
+maximale (RSS) et les fichiers produits. Le code de sortie est non nul si
+une exécution échoue, perd des recettes ou a une étape en erreur.
+
+Usage:
+    uv run benchmark
+    uv run benchmark --recipes 14 100 --latency 0.05 --json bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DEFAULT_SIZES = [14, 100, 1000]
+
+
+def configure_offline(latency: float, concurrency: int):
+    """
+    Prépare le processus pour une exécution sans réseau.
+
+    Doit être appelé avant l'import de `menu_planner.main`, dans le répertoire
+    de travail du benchmark.
+
+    Returns:
+        FakeLLM: Le LLM factice installé pour tous les agents
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+    os.environ.pop("AGENTOPS_API_KEY", None)
+
+    from menu_planner.benchmarks.fakes import FakeLLM, StubScrapeTool, StubSearchTool
+    from menu_planner.config import config
+    from menu_planner.crews.recipe_expert_crew import recipe_expert_crew
+    from menu_planner.llm import set_llm_override
+
+    config.cache.enabled = False
+    config.library.enabled = False
+    config.http.cache_enabled = False
+    config.memory.backend = "off"
+    config.single_recipe = ""
+    config.execution.max_concurrency = concurrency
+    config.execution.max_retries = 0
+    config.execution.recipe_timeout = 0
+
+    recipe_expert_crew.search_tools[:] = [StubSearchTool(), StubScrapeTool()]
+    fake_llm = FakeLLM(latency=latency)
+    set_llm_override(fake_llm)
+    return fake_llm
+
+
+def synthetic_recipe_names(menu_names, count):
+    """Complète les recettes du menu par des recettes synthétiques jusqu'à `count`."""
+    names = list(menu_names[:count])
+    names.extend(f"Recette de test n°{i}" for i in range(len(names) + 1, count + 1))
+    return names
+
+
+def execute_flow(recipe_count: int) -> dict:
+    """
+    Enchaîne toutes les étapes du flow pour `recipe_count` recettes (processus déjà configuré hors ligne).
+
+    Returns:
+        dict: `flow`, mesures (`metrics`), `wall_seconds` et `import_seconds`
+    """
+    started = time.perf_counter()
+    from menu_planner import main
+    import_seconds = time.perf_counter() - started
+
+    main.ensure_output_dirs()
+
+    metrics = main.reset_metrics()
+    metrics.step_dependencies = main.STEP_DEPENDENCIES
+    flow = main.MenuFlow()
+
+    started = time.perf_counter()
+    flow.generate_menu()
+    flow.check_state()
+    flow.start_menu_html()
+    flow.prepare_recipe_inputs()
+    menu_names = flow.state.recipe_list.get("recipes", []) if isinstance(flow.state.recipe_list, dict) else []
+    if len(flow.state.recipe_inputs) != recipe_count:
+        flow.build_recipe_inputs(synthetic_recipe_names(menu_names, recipe_count))
+    flow.process_recipes()
+    flow.track_recipe_results()
+    flow.prepare_shopping_list()
+    flow.collect_menu_html()
+    return {"flow": flow, "metrics": metrics.to_dict(), "wall_seconds": time.perf_counter() - started,
+            "import_seconds": import_seconds}
+
+
+def run_once(recipe_count: int, latency: float = 0.0, concurrency: int = 4) -> dict:
+    """
+    Exécute le flow complet une fois pour `recipe_count` recettes dans le processus courant.
+
+    Returns:
+        dict: Durée totale, RSS maximale, durée par étape et compteurs
+    """
+    workdir = tempfile.mkdtemp(prefix="menu_planner_bench_")
+    os.chdir(workdir)
+    fake_llm = configure_offline(latency, concurrency)
+    execution = execute_flow(recipe_count)
+    data = execution["metrics"]
+    return {
+        "recipes": recipe_count,
+        "latency": latency,
+        "concurrency": concurrency,
+        "wall_seconds": round(execution["wall_seconds"], 3),
+        "import_seconds": round(execution["import_seconds"], 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "steps": {step: timing["total_seconds"] for step, timing in data["steps"].items()},
+        "failed_steps": [step for step, timing in data["steps"].items() if timing["errors"]],
+        "critical_path": data["critical_path"],
+        "llm_calls": fake_llm.calls,
+        "recipes_succeeded": len(execution["flow"].state.recipe_ids),
+        "workdir": workdir,
+    }
+
+
+def run_isolated(recipe_count: int, latency: float, concurrency: int, verbose: bool = False) -> dict:
+    """Exécute `run_once` dans un sous-processus et retourne son résultat."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        result_path = result_file.name
+    command = [sys.executable, "-m", "menu_planner.benchmarks.run", "--child",
+               "--recipes", str(recipe_count), "--latency", str(latency),
+               "--concurrency", str(concurrency), "--result-file", result_path]
+    output = None if verbose else subprocess.DEVNULL
+    completed = subprocess.run(command, stdout=output, stderr=output)
+    try:
+        if completed.returncode != 0:
+            return {"recipes": recipe_count, "error": f"exit code {completed.returncode}"}
+        return json.loads(Path(result_path).read_text(encoding="utf-8"))
+    finally:
+        Path(result_path).unlink(missing_ok=True)
+
+
+def failed(result: dict) -> bool:
+    """Vrai si l'exécution a échoué, a perdu des recettes ou a eu une étape en erreur."""
+    return "error" in result or result["recipes_succeeded"] < result["recipes"] or bool(result["failed_steps"])
+
+
+def format_report(results) -> str:
+    """Tableau texte des résultats, avec la durée de chaque étape."""
+    steps = []
+    for result in results:
+        for step in result.get("steps", {}):
+            if step not in steps:
+                steps.append(step)
+    header = ["recipes", "succeeded", "wall (s)", "critical (s)", "parallel saving (s)", "peak RSS (MB)",
+              "LLM calls", "failed steps"] + steps
+    rows = [header]
+    for result in results:
+        if "error" in result:
+            rows.append([str(result["recipes"]), result["error"]] + [""] * (len(header) - 2))
+            continue
+        critical = result.get("critical_path") or {}
+        rows.append([str(result["recipes"]), str(result["recipes_succeeded"]), f"{result['wall_seconds']:.2f}",
+                     f"{critical.get('seconds', 0):.2f}", f"{critical.get('parallel_saving_seconds', 0):.2f}",
+                     f"{result['peak_rss_mb']:.0f}", str(result["llm_calls"]),
+                     ", ".join(result["failed_steps"]) or "-"]
+                    + [f"{result['steps'].get(step, 0):.2f}" for step in steps])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline MenuFlow benchmark with a fake LLM and stub tools")
+    parser.add_argument("--recipes", type=int, nargs="+", default=DEFAULT_SIZES, help="recipe counts to run")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency per LLM call (seconds)")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum concurrent recipes")
+    parser.add_argument("--json", dest="json_path", help="write the raw results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the flow and crew output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        logging.disable(logging.INFO)
+        result = run_once(args.recipes[0], args.latency, args.concurrency)
+        Path(args.result_file).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    results = [run_isolated(count, args.latency, args.concurrency, args.verbose) for count in args.recipes]
+    print(format_report(results))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if any(failed(result) for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
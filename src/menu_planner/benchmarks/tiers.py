@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Benchmark hors ligne des niveaux de modèles
+
+Compare, avec des LLM factices dont la latence et le prix suivent un profil
+de modèle, la durée et le coût d'une exécution complète selon la répartition
+des agents entre les niveaux de `config.llm.tiers` :
+- `strong` : tous les agents sur le niveau `strong` (raisonnement compris)
+- `tiered` : répartition configurée (`LLM_TIERS`, formatage sur `fast`)
+- `fast` : tous les agents sur le niveau `fast`
+
+Le mode `tasks` (une tâche par format) est utilisé par défaut : c'est lui qui
+confie le YAML et le JSON des ingrédients à `formatting_specialist`. Chaque
+configuration est exécutée dans un processus séparé. Le code de sortie est
+non nul si une configuration échoue, perd des recettes ou ne fait aucun appel LLM.
+
+Usage:
+    uv run tier_benchmark
+    uv run tier_benchmark --recipes 14 --mode structured --latency-scale 2 --json tiers.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+CONFIGURATIONS = ["strong", "tiered", "fast"]
+
+# Latence simulée par appel (secondes) et prix en dollars par million de tokens d'entrée et de sortie,
+# de l'ordre de gpt-4.1 pour `strong` et de gpt-4.1-nano pour `fast`
+MODEL_PROFILES = {
+    "strong": {"latency": 0.05, "input_price": 2.0, "output_price": 8.0},
+    "fast": {"latency": 0.015, "input_price": 0.1, "output_price": 0.4},
+}
+
+
+def run_configuration(name: str, recipe_count: int, mode: str, latency_scale: float = 1.0,
+                      concurrency: int = 4) -> dict:
+    """
+    Exécute le flow complet avec une répartition des niveaux, dans le processus courant.
+
+    Returns:
+        dict: Durée, appels, tokens et coût estimé, au total et par niveau
+    """
+    from menu_planner.benchmarks.fakes import FakeLLM
+    from menu_planner.benchmarks.run import configure_offline, execute_flow
+    from menu_planner.config import config
+    from menu_planner.llm import set_llm_factory, set_llm_override
+
+    os.chdir(tempfile.mkdtemp(prefix="menu_planner_tiers_"))
+    configure_offline(0.0, concurrency)
+    config.recipe_mode = mode
+    if name != "tiered":
+        config.llm.tier_assignments = {}
+        config.llm.default_tier = name
+
+    # Compteurs par niveau, communs au LLM factice du niveau et à toutes ses copies
+    usage = {}
+
+    def fake_for_tier(tier_name, tier):
+        profile = MODEL_PROFILES.get(tier_name, MODEL_PROFILES["strong"])
+        return FakeLLM(latency=profile["latency"] * latency_scale, model=f"fake/{tier_name}",
+                       usage=usage.setdefault(tier_name, {}))
+
+    set_llm_override(None)
+    set_llm_factory(fake_for_tier)
+    execution = execute_flow(recipe_count)
+
+    tiers = {}
+    for tier_name, counters in usage.items():
+        profile = MODEL_PROFILES.get(tier_name, MODEL_PROFILES["strong"])
+        cost = (counters["prompt_tokens"] * profile["input_price"]
+                + counters["completion_tokens"] * profile["output_price"]) / 1e6
+        tiers[tier_name] = {**counters, "cost_usd": round(cost, 6),
+                            "reasoning": config.llm.tiers[tier_name].reasoning}
+    return {
+        "configuration": name,
+        "recipes": recipe_count,
+        "mode": mode,
+        "wall_seconds": round(execution["wall_seconds"], 3),
+        "llm_calls": sum(tier["calls"] for tier in tiers.values()),
+        "prompt_tokens": sum(tier["prompt_tokens"] for tier in tiers.values()),
+        "completion_tokens": sum(tier["completion_tokens"] for tier in tiers.values()),
+        "cost_usd": round(sum(tier["cost_usd"] for tier in tiers.values()), 6),
+        "tiers": tiers,
+        "recipes_succeeded": len(execution["flow"].state.recipe_ids),
+    }
+
+
+def run_isolated(name: str, recipe_count: int, mode: str, latency_scale: float, concurrency: int,
+                 verbose: bool = False) -> dict:
+    """Exécute `run_configuration` dans un sous-processus et retourne son résultat."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        result_path = result_file.name
+    command = [sys.executable, "-m", "menu_planner.benchmarks.tiers", "--child", "--configurations", name,
+               "--recipes", str(recipe_count), "--mode", mode, "--latency-scale", str(latency_scale),
+               "--concurrency", str(concurrency), "--result-file", result_path]
+    output = None if verbose else subprocess.DEVNULL
+    completed = subprocess.run(command, stdout=output, stderr=output)
+    try:
+        if completed.returncode != 0:
+            return {"configuration": name, "error": f"exit code {completed.returncode}"}
+        return json.loads(Path(result_path).read_text(encoding="utf-8"))
+    finally:
+        Path(result_path).unlink(missing_ok=True)
+
+
+def failed(result: dict) -> bool:
+    """Vrai si l'exécution a échoué, a perdu des recettes ou n'a fait aucun appel LLM."""
+    return "error" in result or result["recipes_succeeded"] < result["recipes"] or result["llm_calls"] == 0
+
+
+def format_report(results) -> str:
+    """Tableau texte : durée, appels, tokens et coût par configuration, appels par niveau."""
+    header = ["configuration", "wall (s)", "LLM calls", "strong calls", "fast calls", "tokens in", "tokens out",
+              "cost ($)", "recipes"]
+    rows = [header]
+    for result in results:
+        if "error" in result:
+            rows.append([result["configuration"], result["error"]] + [""] * (len(header) - 2))
+            continue
+        tiers = result["tiers"]
+        rows.append([result["configuration"], f"{result['wall_seconds']:.2f}", str(result["llm_calls"]),
+                     str(tiers.get("strong", {}).get("calls", 0)), str(tiers.get("fast", {}).get("calls", 0)),
+                     str(result["prompt_tokens"]), str(result["completion_tokens"]),
+                     f"{result['cost_usd']:.4f}", str(result["recipes_succeeded"])])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline comparison of model tier configurations")
+    parser.add_argument("--configurations", nargs="+", choices=CONFIGURATIONS, default=CONFIGURATIONS,
+                        help="tier configurations to compare")
+    parser.add_argument("--recipes", type=int, default=14, help="number of recipes")
+    parser.add_argument("--mode", choices=["tasks", "structured"], default="tasks", help="recipe mode")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier of the simulated latencies")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum concurrent recipes")
+    parser.add_argument("--json", dest="json_path", help="write the raw results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the flow and crew output")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        logging.disable(logging.INFO)
+        result = run_configuration(args.configurations[0], args.recipes, args.mode, args.latency_scale,
+                                   args.concurrency)
+        Path(args.result_file).write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    results = [run_isolated(name, args.recipes, args.mode, args.latency_scale, args.concurrency, args.verbose)
+               for name in args.configurations]
+    print(format_report(results))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if any(failed(result) for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Checkpoint - Sauvegarde et reprise de l'état d'un MenuFlow
+
+L'état partagé (`MenuState`) est écrit sur disque après chaque étape du flow et
+après chaque recette terminée. En cas d'interruption (limite de débit, délai
+dépassé...), `resume` recharge cet état et le flow ne refait que le travail
+restant: le menu n'est pas régénéré et les recettes déjà produites, dont les
+fichiers existent et sont valides, ne repassent pas par le crew.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from pydantic import BaseModel, ValidationError
+
+from menu_planner.config import config
+from menu_planner.schemas import MenuState, RecipeIngredient
+
+logger = logging.getLogger("menu_planner.checkpoint")
+
+# Champs contenant des objets CrewAI non sérialisables, reconstruits à la reprise
+TRANSIENT_FIELDS = {"parallel_results", "html_result", "shopping_list_result"}
+
+_checkpoint_lock = threading.RLock()
+
+
+def checkpoint_path(output_dir: Optional[str] = None) -> Path:
+    """
+    Fichier de checkpoint: `config.checkpoint_path` s'il est défini, sinon dans le dossier de sortie.
+
+    Args:
+        output_dir: Dossier de sortie de l'état du flow (par défaut celui d'un nouveau `MenuState`)
+    """
+    if config.checkpoint_path:
+        return Path(config.checkpoint_path)
+    return Path(output_dir or MenuState.model_fields["output_dir"].default) / "checkpoint.json"
+
+
+def save_checkpoint(state: BaseModel, path: Optional[Path] = None) -> None:
+    """
+    Écrit l'état du flow de manière atomique (fichier temporaire puis renommage).
+
+    Args:
+        state: État du flow à sauvegarder
+        path: Fichier de checkpoint (par défaut celui du dossier de sortie de l'état)
+    """
+    path = Path(path or checkpoint_path(state.output_dir))
+    with _checkpoint_lock:
+        data = state.model_dump(mode="json", exclude=TRANSIENT_FIELDS, warnings=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+    logger.debug(f"Checkpoint saved to {path}")
+
+
+def load_checkpoint(path: Optional[Path] = None) -> Optional[dict]:
+    """
+    Charge un checkpoint précédemment sauvegardé.
+
+    Args:
+        path: Fichier de checkpoint (par défaut `checkpoint_path()`, à préciser avec le dossier de sortie du flow)
+
+    Returns:
+        Optional[dict]: Les champs de l'état, ou None si aucun checkpoint exploitable
+    """
+    path = Path(path or checkpoint_path())
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Could not read checkpoint {path}: {str(e)}")
+        return None
+
+
+def clear_checkpoint(path: Optional[Path] = None) -> None:
+    """Supprime le checkpoint (par défaut `checkpoint_path()`) pour démarrer une nouvelle exécution."""
+    path = Path(path or checkpoint_path())
+    with _checkpoint_lock:
+        path.unlink(missing_ok=True)
+
+
+def restore_state(state: BaseModel, data: dict) -> None:
+    """
+    Recopie les champs d'un checkpoint dans l'état du flow.
+
+    Les valeurs sont affectées telles quelles (sans revalidation), comme le
+    fait le flow lui-même lorsqu'il met à jour son état.
+    """
+    for field, value in data.items():
+        if field in type(state).model_fields and field not in TRANSIENT_FIELDS:
+            setattr(state, field, value)
+
+
+def mark_step_completed(state: BaseModel, step: str) -> None:
+    """Enregistre une étape terminée et sauvegarde l'état."""
+    with _checkpoint_lock:
+        if step not in state.completed_steps:
+            state.completed_steps.append(step)
+        save_checkpoint(state)
+
+
+def mark_recipe_completed(state: BaseModel, recipe_id: str) -> None:
+    """Enregistre une recette terminée et sauvegarde l'état."""
+    with _checkpoint_lock:
+        if recipe_id not in state.completed_recipes:
+            state.completed_recipes.append(recipe_id)
+        save_checkpoint(state)
+
+
+def checkpointed(method):
+    """
+    Décorateur de méthode de flow: sauvegarde l'état une fois l'étape terminée.
+
+    À placer sous les décorateurs CrewAI (`@start`, `@listen`, `@router`).
+    Une étape qui retourne False (échec géré) n'est pas marquée comme terminée,
+    afin d'être rejouée lors d'une reprise.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if result is False:
+            return result
+        try:
+            mark_step_completed(self.state, method.__name__)
+        except Exception as e:
+            logger.error(f"Could not checkpoint step {method.__name__}: {str(e)}")
+        return result
+
+    return wrapper
+
+
+def recipe_artifacts_valid(recipe_input: dict) -> bool:
+    """
+    Vérifie que les fichiers d'une recette existent et sont exploitables.
+
+    Le HTML doit être non vide, le YAML analysable et le JSON d'ingrédients
+    doit être une liste valide de `RecipeIngredient`.
+    """
+    try:
+        html = Path(recipe_input["recipe_html_path"]).read_text(encoding="utf-8")
+        yaml_text = Path(recipe_input["recipe_yaml_path"]).read_text(encoding="utf-8")
+        ingredients = json.loads(Path(recipe_input["recipe_ingredients_path"]).read_text(encoding="utf-8"))
+        if not html.strip() or not isinstance(yaml.safe_load(yaml_text), dict):
+            return False
+        if not isinstance(ingredients, list) or not ingredients:
+            return False
+        for item in ingredients:
+            RecipeIngredient.model_validate(item)
+    except (OSError, ValueError, yaml.YAMLError, ValidationError):
+        return False
+    return True
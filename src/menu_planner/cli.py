@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+CLI - Point d'entrée léger de Menu Planner
+
+Ce module n'importe que la bibliothèque standard : CrewAI, les crews, les
+outils et AgentOps ne sont chargés que par la commande qui en a besoin.
+`--help` et `dry-run` restent donc quasi instantanés, ce qui compte lorsque
+la commande est lancée plusieurs fois par heure par un ordonnanceur.
+
+Usage:
+    menu_planner kickoff
+    menu_planner resume
+    menu_planner dry-run
+    menu_planner plot
+    menu_planner batch familles.jsonl
+    menu_planner library poulet --ingredient tomate --max-calories 500
+"""
+
+import argparse
+import sys
+
+
+def kickoff():
+    """Nouvelle exécution complète du flow."""
+    from menu_planner import main as menu_main
+
+    menu_main.kickoff()
+
+
+def resume():
+    """Reprise de la dernière exécution interrompue."""
+    from menu_planner import main as menu_main
+
+    menu_main.resume()
+
+
+def plot():
+    """Schéma du flow (sans exécuter les crews)."""
+    from menu_planner import main as menu_main
+
+    menu_main.plot()
+
+
+def dry_run() -> dict:
+    """
+    Affiche la configuration résolue et les étapes prévues, sans rien exécuter.
+
+    Seule la configuration est chargée : aucun import de CrewAI, aucun appel
+    réseau, aucun fichier créé.
+
+    Returns:
+        dict: Configuration et plan affichés
+    """
+    import json
+    import os
+
+    from menu_planner.checkpoint import checkpoint_path
+    from menu_planner.config import config
+    from menu_planner.schemas import MenuState
+
+    output_dir = MenuState.model_fields["output_dir"].default
+    checkpoint = checkpoint_path(output_dir)
+    if config.single_recipe:
+        steps = ["generate_menu", "generate_single_recipe"]
+    else:
+        steps = ["generate_menu", "check_state", "generate_html_output (parallel)", "prepare_recipe_inputs",
+                 "process_recipes", "track_recipe_results", "prepare_shopping_list"]
+    plan = {
+        "model": config.llm.model_name,
+        "model_tiers": {name: tier.model_dump() for name, tier in config.llm.tiers.items()},
+        "tier_assignments": config.llm.tier_assignments,
+        "family": config.family.model_dump(),
+        "single_recipe": config.single_recipe or None,
+        "recipe_mode": config.recipe_mode,
+        "local_rendering": config.local_rendering,
+        "execution": config.execution.model_dump(),
+        "memory": config.memory.model_dump(),
+        "recipe_cache": str(config.cache.path) if config.cache.enabled else None,
+        "recipe_library": {"path": str(config.library.path), "reuse": config.library.reuse}
+        if config.library.enabled else None,
+        "http_cache": str(config.http.cache_path) if config.http.cache_enabled else None,
+        "scrape_extraction": config.http.scrape_max_chars if config.http.scrape_extract else None,
+        "tool_memo": {"size": config.http.memo_size, "ttl": config.http.memo_ttl}
+        if config.http.singleflight else None,
+        "rate_limit": config.rate_limit.model_dump() if config.rate_limit.enabled else None,
+        "nutrition": config.nutrition.model_dump(mode="json") if config.nutrition.enabled else None,
+        "output_dir": output_dir,
+        "checkpoint": {"path": str(checkpoint), "exists": checkpoint.exists()},
+        "api_keys": {name: bool(os.getenv(name)) for name in
+                     ("OPENAI_API_KEY", "SERPER_API_KEY", "RAPIDAPI_KEY", "AGENTOPS_API_KEY")},
+        "steps": steps,
+    }
+    print(json.dumps(plan, ensure_ascii=False, indent=2, default=str))
+    return plan
+
+
+def library(args) -> list:
+    """
+    Recherche dans la bibliothèque de recettes et affiche les résultats.
+
+    Returns:
+        list: Recettes trouvées
+    """
+    import json
+
+    from menu_planner.library import get_recipe_library
+
+    recipe_library = get_recipe_library()
+    if recipe_library is None:
+        print("Recipe library disabled (RECIPE_LIBRARY=false)")
+        return []
+    results = recipe_library.search(" ".join(args.query), ingredient=args.ingredient or "",
+                                    max_calories=args.max_calories, max_prep_minutes=args.max_prep,
+                                    limit=args.limit)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return results
+    for recipe in results:
+        calories = f"{recipe['calories']} kcal" if recipe["calories"] else "? kcal"
+        prep = f"{recipe['prep_minutes']} min" if recipe["prep_minutes"] is not None else "? min"
+        print(f"{recipe['name']:<50} {calories:>9} {prep:>8}  famille {recipe['family']}  ({recipe['uses']} reprises)")
+    stats = recipe_library.stats()
+    print(f"{len(results)} result(s), {stats['recipes']} recipes in {recipe_library.path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="menu_planner", description="Weekly family menu planner")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.add_parser("kickoff", help="run the full flow from scratch")
+    commands.add_parser("resume", help="resume the last interrupted run from its checkpoint")
+    commands.add_parser("dry-run", help="print the resolved configuration and planned steps")
+    commands.add_parser("plot", help="render the flow diagram")
+    batch_parser = commands.add_parser("batch", help="plan menus for several families", add_help=False)
+    batch_parser.add_argument("batch_args", nargs=argparse.REMAINDER)
+    library_parser = commands.add_parser("library", help="search the recipe library")
+    library_parser.add_argument("query", nargs="*", help="words searched in titles, ingredients and categories")
+    library_parser.add_argument("--ingredient", help="words searched in ingredients only")
+    library_parser.add_argument("--max-calories", type=int, help="maximum calories per serving")
+    library_parser.add_argument("--max-prep", type=int, help="maximum preparation time in minutes")
+    library_parser.add_argument("--limit", type=int, default=20, help="maximum number of results")
+    library_parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "kickoff":
+        kickoff()
+    elif args.command == "resume":
+        resume()
+    elif args.command == "dry-run":
+        dry_run()
+    elif args.command == "plot":
+        plot()
+    elif args.command == "batch":
+        from menu_planner import batch
+
+        batch.main(args.batch_args)
+    elif args.command == "library":
+        library(args)
+    else:
+        parser.print_help()
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,88 @@ a single source of truth for application configuration.
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
+# Les valeurs par défaut ci-dessous sont lues dans l'environnement à l'import:
+# le fichier .env doit donc être chargé avant
+load_dotenv()
+
 # Base directories
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR.parent.parent / "output"
+CACHE_DIR = BASE_DIR.parent.parent / ".cache"
+LIBRARY_DIR = BASE_DIR.parent.parent / "library"
+
+DEFAULT_MODEL = os.getenv("MODEL", os.getenv("OPENAI_MODEL_NAME", "gpt-4.1-mini"))
+
+# Tier of each agent (or of every agent of a crew) unless overridden by LLM_TIERS
+DEFAULT_TIER_ASSIGNMENTS = {
+    "culinary_expert": "strong",
+    "nutritionist": "strong",
+    "menu_planner_specialist": "strong",
+    "formatting_specialist": "fast",
+    "content_specialist": "fast",
+    "ShoppingCrew": "fast",
+    "HtmlDesignCrew": "fast",
+}
+
+
+class ModelTier(BaseModel):
+    """Model and reasoning settings shared by the agents assigned to a tier."""
+    model: str = Field(description="LiteLLM model name")
+    temperature: Optional[float] = Field(default=None, description="Sampling temperature (provider default if unset)")
+    max_tokens: Optional[int] = Field(default=None, description="Maximum output tokens per call")
+    reasoning: bool = Field(default=True, description="Let the agent plan before executing its task")
+    max_reasoning_attempts: Optional[int] = Field(default=3, description="Maximum planning refinements")
+
+
+def _tier_from_env(name: str, reasoning: bool, temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None) -> ModelTier:
+    """Tier settings read from LLM_<NAME>_MODEL, _TEMPERATURE, _MAX_TOKENS and _REASONING."""
+    prefix = f"LLM_{name.upper()}_"
+    return ModelTier(
+        model=os.getenv(f"{prefix}MODEL", DEFAULT_MODEL),
+        temperature=float(os.environ[f"{prefix}TEMPERATURE"]) if os.getenv(f"{prefix}TEMPERATURE") else temperature,
+        max_tokens=int(os.environ[f"{prefix}MAX_TOKENS"]) if os.getenv(f"{prefix}MAX_TOKENS") else max_tokens,
+        reasoning=bool(os.getenv(f"{prefix}REASONING", str(reasoning)).lower() == "true"),
+        max_reasoning_attempts=int(os.getenv(f"{prefix}REASONING_ATTEMPTS", "3")),
+    )
+
+
+def _tier_assignments() -> dict:
+    """DEFAULT_TIER_ASSIGNMENTS updated with LLM_TIERS ('name=tier' separated by commas)."""
+    assignments = dict(DEFAULT_TIER_ASSIGNMENTS)
+    for item in filter(None, (part.strip() for part in os.getenv("LLM_TIERS", "").split(","))):
+        name, _, tier = item.partition("=")
+        if tier.strip():
+            assignments[name.strip()] = tier.strip()
+    return assignments
+
 
 class LLMConfig(BaseModel):
     """Configuration for language models used in the application."""
     model_name: str = Field(
-        default="gpt-4.1-mini",
+        default=DEFAULT_MODEL,
         description="Default model name for agents when not specified"
     )
+    tiers: Dict[str, ModelTier] = Field(
+        default_factory=lambda: {
+            "strong": _tier_from_env("strong", reasoning=True),
+            "fast": _tier_from_env("fast", reasoning=False, temperature=0.2, max_tokens=4000),
+        },
+        description="Model tiers: 'strong' for recipe development and menu design, "
+                    "'fast' for formatting and presentation"
+    )
+    tier_assignments: Dict[str, str] = Field(
+        default_factory=_tier_assignments,
+        description="Tier of each agent name or crew class name; the tasks of an agent run on its tier"
+    )
+    default_tier: str = Field(
+        default=os.getenv("LLM_DEFAULT_TIER", "strong"),
+        description="Tier of the agents without an assignment"
+    )
     temperature: float = Field(
         default=0.7, 
         description="Default temperature for model generations"
@@ -28,6 +97,10 @@ class LLMConfig(BaseModel):
         default=300,
         description="Default timeout for model calls in seconds"
     )
+    api_base: Optional[str] = Field(
+        default=os.getenv("API_BASE") or None,
+        description="Base URL of the model API (local Ollama server for instance)"
+    )
 
 class FamilyConfig(BaseModel):
     """Configuration for family details used in menu planning."""
@@ -48,14 +121,266 @@ class FamilyConfig(BaseModel):
         description="Email address to send menu to"
     )
 
+class CacheConfig(BaseModel):
+    """Configuration for the persistent recipe artifact cache."""
+    enabled: bool = Field(
+        default=bool(os.getenv("RECIPE_CACHE", "True").lower() == "true"),
+        description="Reuse previously generated recipes instead of running RecipeExpertCrew"
+    )
+    path: Path = Field(
+        default=Path(os.getenv("RECIPE_CACHE_PATH", str(CACHE_DIR / "recipes.sqlite3"))),
+        description="SQLite database storing the cached recipe artifacts"
+    )
+    max_entries: int = Field(
+        default=int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "1000")),
+        description="Maximum number of cached recipes kept (least recently used evicted first)"
+    )
+    max_bytes: int = Field(
+        default=int(os.getenv("RECIPE_CACHE_MAX_MB", "200")) * 1024 * 1024,
+        description="Maximum total size of cached artifacts in bytes"
+    )
+    max_age_days: int = Field(
+        default=int(os.getenv("RECIPE_CACHE_MAX_AGE_DAYS", "90")),
+        description="Cached recipes older than this are discarded"
+    )
+
+class LibraryConfig(BaseModel):
+    """Configuration for the persistent, searchable recipe library."""
+    enabled: bool = Field(
+        default=bool(os.getenv("RECIPE_LIBRARY", "True").lower() == "true"),
+        description="Keep every completed recipe in the library and restore known recipes from it"
+    )
+    path: Path = Field(
+        default=Path(os.getenv("RECIPE_LIBRARY_PATH", str(LIBRARY_DIR / "recipes.sqlite3"))),
+        description="SQLite database (with FTS5 index) holding the recipe library"
+    )
+    reuse: int = Field(
+        default=int(os.getenv("LIBRARY_REUSE", "0")),
+        description="Number of meals per week MenuDesignerCrew should take from known library recipes"
+    )
+
+class EventsConfig(BaseModel):
+    """Configuration for the progress event stream (JSONL file and local SSE server)."""
+    enabled: bool = Field(
+        default=bool(os.getenv("EVENTS", "True").lower() == "true"),
+        description="Append progress events to a JSONL file as they happen"
+    )
+    path: Optional[Path] = Field(
+        default=Path(os.environ["EVENTS_PATH"]) if os.getenv("EVENTS_PATH") else None,
+        description="JSONL event file (defaults to events.jsonl in the run output directory)"
+    )
+    sse_host: str = Field(
+        default=os.getenv("EVENTS_SSE_HOST", "127.0.0.1"),
+        description="Interface of the local SSE server"
+    )
+    sse_port: int = Field(
+        default=int(os.getenv("EVENTS_SSE_PORT", "0")),
+        description="Port of the local SSE server serving /events and /files (0 disables it)"
+    )
+    llm_stream: bool = Field(
+        default=bool(os.getenv("LLM_STREAM", "False").lower() == "true"),
+        description="Stream LLM responses and publish their text deltas as llm_delta events"
+    )
+
+class MemoryConfig(BaseModel):
+    """Configuration for the agent memory of RecipeExpertCrew."""
+    backend: str = Field(
+        default=os.getenv("RECIPE_MEMORY_BACKEND",
+                          "shared" if os.getenv("RECIPE_CREW_MEMORY", "True").lower() == "true" else "off"),
+        description="'shared': one bounded in-process memory for every recipe crew; "
+                    "'crewai': CrewAI's default on-disk memory, created per crew; 'off': no memory"
+    )
+    max_entries: int = Field(
+        default=int(os.getenv("RECIPE_MEMORY_MAX_ENTRIES", "500")),
+        description="Maximum number of entries kept by the shared memory (least recently used evicted first)"
+    )
+    ttl: int = Field(
+        default=int(os.getenv("RECIPE_MEMORY_TTL", "3600")),
+        description="Lifetime of a shared memory entry in seconds (0 to disable)"
+    )
+    embedder_provider: str = Field(
+        default=os.getenv("RECIPE_MEMORY_EMBEDDER", "openai"),
+        description="Embedding provider used by the memory (CrewAI embedder configuration)"
+    )
+    embedder_model: str = Field(
+        default=os.getenv("RECIPE_MEMORY_EMBEDDER_MODEL", "text-embedding-3-small"),
+        description="Embedding model used by the memory"
+    )
+
+class ExecutionConfig(BaseModel):
+    """Configuration for concurrent recipe generation."""
+    max_concurrency: int = Field(
+        default=int(os.getenv("RECIPE_MAX_CONCURRENCY", "4")),
+        description="Maximum number of recipes generated at the same time"
+    )
+    recipe_timeout: int = Field(
+        default=int(os.getenv("RECIPE_TIMEOUT", "900")),
+        description="Maximum duration of one recipe generation attempt in seconds (0 to disable)"
+    )
+    max_retries: int = Field(
+        default=int(os.getenv("RECIPE_MAX_RETRIES", "2")),
+        description="Number of additional attempts for a failed recipe"
+    )
+    retry_backoff: float = Field(
+        default=float(os.getenv("RECIPE_RETRY_BACKOFF", "5")),
+        description="Base delay in seconds before retrying a failed recipe"
+    )
+    task_validation_retries: int = Field(
+        default=int(os.getenv("TASK_VALIDATION_RETRIES", "2")),
+        description="Number of times a task whose output fails validation is re-run with the error as feedback"
+    )
+
+class HttpConfig(BaseModel):
+    """Configuration for the HTTP layer shared by the search and scraping tools."""
+    timeout: float = Field(
+        default=float(os.getenv("HTTP_TIMEOUT", "20")),
+        description="Default timeout for tool HTTP requests in seconds"
+    )
+    pool_size: int = Field(
+        default=int(os.getenv("HTTP_POOL_SIZE", "16")),
+        description="Maximum number of pooled keep-alive connections per host"
+    )
+    max_retries: int = Field(
+        default=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        description="Number of retries on 429/5xx responses and network errors"
+    )
+    backoff: float = Field(
+        default=float(os.getenv("HTTP_BACKOFF", "0.5")),
+        description="Base delay in seconds for jittered exponential backoff"
+    )
+    max_backoff: float = Field(
+        default=float(os.getenv("HTTP_MAX_BACKOFF", "30")),
+        description="Upper bound for a single retry delay in seconds"
+    )
+    cache_enabled: bool = Field(
+        default=bool(os.getenv("HTTP_CACHE", "True").lower() == "true"),
+        description="Cache successful search and scraping responses on disk"
+    )
+    cache_path: Path = Field(
+        default=Path(os.getenv("HTTP_CACHE_PATH", str(CACHE_DIR / "http.sqlite3"))),
+        description="SQLite database storing cached HTTP responses"
+    )
+    cache_ttl: int = Field(
+        default=int(os.getenv("HTTP_CACHE_TTL", str(7 * 24 * 3600))),
+        description="Lifetime of a cached HTTP response in seconds"
+    )
+    scrape_extract: bool = Field(
+        default=bool(os.getenv("SCRAPE_EXTRACT", "True").lower() == "true"),
+        description="Return the schema.org recipe or the main text of scraped pages instead of the raw HTML"
+    )
+    scrape_max_chars: int = Field(
+        default=int(os.getenv("SCRAPE_MAX_CHARS", "6000")),
+        description="Maximum size in characters of an extracted scraping result (0 for no limit)"
+    )
+    singleflight: bool = Field(
+        default=bool(os.getenv("TOOL_SINGLEFLIGHT", "True").lower() == "true"),
+        description="Share identical in-flight search and scraping calls and remember their results"
+    )
+    memo_size: int = Field(
+        default=int(os.getenv("TOOL_MEMO_SIZE", "256")),
+        description="Number of search and scraping results remembered in memory per tool"
+    )
+    memo_ttl: int = Field(
+        default=int(os.getenv("TOOL_MEMO_TTL", "3600")),
+        description="Lifetime of a remembered tool result in seconds (0 for no limit)"
+    )
+
+class RateLimitConfig(BaseModel):
+    """Configuration for the process-wide scheduler of LLM and tool API calls."""
+    enabled: bool = Field(
+        default=bool(os.getenv("RATE_LIMIT", "True").lower() == "true"),
+        description="Schedule LLM and tool calls through shared token buckets and adaptive concurrency"
+    )
+    llm_rpm: float = Field(
+        default=float(os.getenv("LLM_RPM", "500")),
+        description="Requests per minute allowed for each LLM provider"
+    )
+    llm_tpm: float = Field(
+        default=float(os.getenv("LLM_TPM", "200000")),
+        description="Tokens per minute allowed for each LLM provider (0 to disable)"
+    )
+    llm_max_concurrency: int = Field(
+        default=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        description="Upper bound of concurrent calls per LLM provider"
+    )
+    completion_tokens: int = Field(
+        default=int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "1000")),
+        description="Output tokens reserved for each LLM call in the tokens-per-minute bucket"
+    )
+    llm_retries: int = Field(
+        default=int(os.getenv("LLM_RATE_LIMIT_RETRIES", "4")),
+        description="Retries of an LLM call rejected with a rate-limit error"
+    )
+    serper_rpm: float = Field(
+        default=float(os.getenv("SERPER_RPM", "300")),
+        description="Requests per minute allowed for the Serper search API"
+    )
+    rapidapi_rpm: float = Field(
+        default=float(os.getenv("RAPIDAPI_RPM", "60")),
+        description="Requests per minute allowed for the ScrapeNinja RapidAPI endpoint"
+    )
+    tool_max_concurrency: int = Field(
+        default=int(os.getenv("TOOL_MAX_CONCURRENCY", "8")),
+        description="Upper bound of concurrent calls per tool API"
+    )
+    overrides: str = Field(
+        default=os.getenv("RATE_LIMITS", ""),
+        description="Per-limiter quotas, 'name=rpm[/tpm]' separated by commas (e.g. 'gemini=60/32000')"
+    )
+
+class NutritionConfig(BaseModel):
+    """Configuration for the local nutrition computation."""
+    enabled: bool = Field(
+        default=bool(os.getenv("NUTRITION_ENGINE", "True").lower() == "true"),
+        description="Compute recipe and menu nutrition locally from the structured ingredients"
+    )
+    llm_evaluation: bool = Field(
+        default=bool(os.getenv("NUTRITION_LLM_EVALUATION", "False").lower() == "true"),
+        description="Keep the nutritionist's nutrition_evaluation task in 'tasks' recipe mode"
+    )
+    table_path: Path = Field(
+        default=Path(os.getenv("NUTRITION_TABLE", str(Path(__file__).parent / "data" / "food_composition.csv"))),
+        description="CSV food-composition table (values per 100 g)"
+    )
+    min_coverage: float = Field(
+        default=float(os.getenv("NUTRITION_MIN_COVERAGE", "0.6")),
+        description="Share of recognized ingredients required to replace the LLM estimate of a recipe"
+    )
+
 class AppConfig(BaseModel):
     """Main application configuration."""
     llm: LLMConfig = Field(default_factory=LLMConfig)
     family: FamilyConfig = Field(default_factory=FamilyConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    library: LibraryConfig = Field(default_factory=LibraryConfig)
+    events: EventsConfig = Field(default_factory=EventsConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
+    execution: ExecutionConfig = Field(default_factory=ExecutionConfig)
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    nutrition: NutritionConfig = Field(default_factory=NutritionConfig)
     single_recipe: Optional[str] = Field(
         default="",
         description="If set, generates only this single recipe instead of a full menu"
     )
+    recipe_mode: str = Field(
+        default=os.getenv("RECIPE_MODE", "tasks"),
+        description="'structured': one task returns a StructuredRecipe and the files are derived locally; "
+                    "'tasks': one task per output format"
+    )
+    local_rendering: bool = Field(
+        default=bool(os.getenv("LOCAL_RENDERING", "False").lower() == "true"),
+        description="Render recipe, menu and shopping list pages from templates instead of LLM tasks"
+    )
+    checkpoint_path: Optional[Path] = Field(
+        default=Path(os.environ["CHECKPOINT_PATH"]) if os.getenv("CHECKPOINT_PATH") else None,
+        description="File where the flow state is saved after each step, used by resume "
+                    "(defaults to checkpoint.json in the run output directory)"
+    )
+    metrics_dir: Path = Field(
+        default=Path(os.getenv("METRICS_DIR", "output/metrics")),
+        description="Directory receiving runs.jsonl and the Prometheus textfile"
+    )
     debug: bool = Field(
         default=bool(os.getenv("DEBUG", "False").lower() == "true"),
         description="Enable debug mode with additional logging"
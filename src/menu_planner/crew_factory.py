@@ -0,0 +1,87 @@
+"""
+Crew factory - Gabarits de crews construits une fois, copiés pour chaque exécution
+
+Construire un crew via `@CrewBase` relit `agents.yaml` et `tasks.yaml` et
+recrée tous les agents et tâches. Pour les crews lancés de nombreuses fois
+dans un même processus (une fois par recette, une fois par famille en mode
+batch), ce module construit un gabarit par crew et par configuration, puis
+remet à chaque exécution une copie indépendante (`Crew.copy()`) : agents,
+tâches et contextes sont dupliqués, les outils, le LLM et la mémoire
+partagée (`menu_planner.memory`) sont communs.
+
+Le gabarit n'est jamais lancé lui-même : l'interpolation des inputs
+(`{recipe_name}`, `{recipe_html_path}`...) ne touche que les copies, qui
+peuvent donc être exécutées simultanément.
+"""
+
+import logging
+import threading
+from typing import Dict, Tuple
+
+from menu_planner import crews, memory
+from menu_planner.config import config
+from menu_planner.llm import llm_signature
+
+logger = logging.getLogger("menu_planner.crew_factory")
+
+# Crews dont les copies partagent la mémoire du processus (menu_planner.memory)
+SHARED_MEMORY_CREWS = {"RecipeExpertCrew"}
+
+_templates: Dict[Tuple, object] = {}
+_templates_lock = threading.Lock()
+
+
+def _config_signature() -> Tuple:
+    """Réglages lus à la construction des crews: un changement impose un nouveau gabarit."""
+    return (config.recipe_mode, config.local_rendering, config.memory.backend, config.nutrition.llm_evaluation,
+            llm_signature())
+
+
+def get_template(crew_name: str):
+    """
+    Gabarit du crew pour la configuration courante, construit au premier appel.
+
+    Args:
+        crew_name: Nom de la classe de crew (ex: "RecipeExpertCrew")
+
+    Returns:
+        Crew: Gabarit partagé, à ne pas lancer directement
+    """
+    key = (crew_name, _config_signature())
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                logger.debug(f"Building {crew_name} template")
+                template = getattr(crews, crew_name)().crew()
+                _templates[key] = template
+    return template
+
+
+def create_crew(crew_name: str):
+    """
+    Crew prêt à être lancé, copié depuis le gabarit partagé.
+
+    Les agents copiés gardent le LLM partagé du gabarit, et les copies des
+    crews de `SHARED_MEMORY_CREWS` reçoivent la mémoire partagée du processus
+    au lieu d'en créer une chacune.
+
+    Returns:
+        Crew: Copie indépendante (agents, tâches, contexte)
+    """
+    template = get_template(crew_name)
+    crew = template.copy()
+    # Agent.copy() duplique le LLM : on remet l'instance partagée du gabarit, pour
+    # que ses limiteurs de débit et ses compteurs restent communs à toutes les copies
+    for agent, template_agent in zip(crew.agents, template.agents):
+        agent.llm = template_agent.llm
+    if crew_name in SHARED_MEMORY_CREWS:
+        memory.attach(crew)
+    return crew
+
+
+def clear_templates() -> None:
+    """Oublie les gabarits (par exemple après avoir modifié les fichiers YAML)."""
+    with _templates_lock:
+        _templates.clear()
@@ -0,0 +1,28 @@
+"""
+Crews - Accès paresseux aux crews spécialisés
+
+Chaque crew importe CrewAI, ses outils et ses fichiers de configuration :
+le module correspondant n'est chargé qu'au premier accès à la classe
+(`crews.RecipeExpertCrew`), pour que l'import de `menu_planner.main` et les
+commandes comme `plot` restent rapides.
+"""
+
+import importlib
+
+_CREW_MODULES = {
+    "MenuDesignerCrew": "menu_planner.crews.menu_designer_crew.menu_designer_crew",
+    "RecipeExpertCrew": "menu_planner.crews.recipe_expert_crew.recipe_expert_crew",
+    "ShoppingCrew": "menu_planner.crews.shopping_crew.shopping_crew",
+    "HtmlDesignCrew": "menu_planner.crews.html_design_crew.html_design_crew",
+}
+
+__all__ = list(_CREW_MODULES)
+
+
+def __getattr__(name):
+    module_name = _CREW_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    crew_class = getattr(importlib.import_module(module_name), name)
+    globals()[name] = crew_class
+    return crew_class
@@ -1,6 +1,10 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 
+from menu_planner.llm import agent_options
+from menu_planner.prompts import task_config
+from menu_planner.validation import clean_html, validated_task
+
 @CrewBase
 class HtmlDesignCrew:
     """HtmlDesignCrew for professional French menu HTML generation"""
@@ -12,14 +16,16 @@ class HtmlDesignCrew:
     def reporting_analyst(self) -> Agent:
         return Agent(
             config=self.agents_config['reporting_analyst'],
-            verbose=True
+            verbose=True,
+            **agent_options("reporting_analyst", "HtmlDesignCrew"),
         )
 
     @task
     def html_menu_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['html_menu_task'],
-            output_file='output/menu_designer_crew/menu.html',
+        return validated_task(
+            "html_menu_task", clean_html,
+            config=task_config(self.tasks_config['html_menu_task']),
+            output_file='{output_dir}/menu_designer_crew/menu.html',
             verbose=True,
         )
 
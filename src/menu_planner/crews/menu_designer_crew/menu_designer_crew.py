@@ -1,12 +1,11 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
+from menu_planner.llm import agent_options
+from menu_planner.prompts import task_config
 from menu_planner.schemas import MenuJson  # RecipeList handled through the consolidated task
-from dotenv import load_dotenv
+from menu_planner.validation import clean_menu, validated_task
 from pathlib import Path
 
-
-load_dotenv()
-
 # Initiali
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
@@ -33,8 +32,7 @@ class MenuDesignerCrew:
         return Agent(
             config=self.agents_config["menu_planner_specialist"],
             verbose=True,
-            reasoning=True,
-            max_reasoning_attempts=3,
+            **agent_options("menu_planner_specialist", "MenuDesignerCrew"),
         )
 
     @task
@@ -45,31 +43,18 @@ class MenuDesignerCrew:
         Cette tâche consolidée produit en une seule opération les deux structures
         JSON nécessaires pour le workflow: le menu détaillé et la liste des recettes.
         """
-        return Task(
-            config=self.tasks_config["generate_complete_menu"],
-            output_file="output/menu_designer_crew/menu.json",  # Primary output
+        return validated_task(
+            "generate_complete_menu", clean_menu,
+            config=task_config(self.tasks_config["generate_complete_menu"]),
+            output_file="{output_dir}/menu_designer_crew/menu.json",  # Primary output
             output_json=MenuJson,
             verbose=True,
         )
 
-    @task
-    def create_html_presentation_task(self) -> Task:
-        """
-        Crée une présentation HTML attrayante du menu.
-        
-        Cette tâche génère un fichier HTML complet à partir des données du menu
-        en utilisant un template optimisé pour l'affichage et la lisibilité.
-        """
-        return Task(
-            config=self.tasks_config["create_html_presentation"],
-            output_file="output/menu_designer_crew/menu.html",
-            verbose=True,
-        )
-
     # @task
     # def send_email_task(self) -> Task:
     #     return Task(
-    #         config=self.tasks_config["send_email"],
+    #         config=task_config(self.tasks_config["send_email"]),
     #         tools=gmail,
     #         verbose=True,
     #     )
@@ -80,6 +65,7 @@ class MenuDesignerCrew:
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
+        # La page HTML du menu est produite par le flow (generate_html_output), en parallèle des recettes
         return Crew(
             agents=self.agents,  # Automatically created by the @agent decorator
             tasks=self.tasks,  # Automatically created by the @task decorator
@@ -11,31 +11,46 @@ Version: 1.0.0
 License: MIT
 """
 
+import threading
+
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from dotenv import load_dotenv
 
-from menu_planner.tools.safe_serper import SafeSerperTool
-from menu_planner.tools.scrapeninja import ScrapeNinjaTool
+from menu_planner.config import config
+from menu_planner.llm import agent_options
+from menu_planner.memory import embedder_config
+from menu_planner.prompts import task_config
+from menu_planner.schemas import StructuredRecipe
+from menu_planner.validation import (clean_html, clean_ingredients, clean_paprika_yaml,
+                                     clean_structured_recipe, validated_task)
 
-# Load environment variables
-load_dotenv()
+# Ensemble complet d'outils mis à disposition des agents, créé au premier usage
+search_tools = []
+_search_tools_lock = threading.Lock()
 
-# Initialize tools with appropriate configurations
-search_tool = SafeSerperTool()  # Recherche web générale avec gestion améliorée des requêtes
 
-scrape_tool = ScrapeNinjaTool(  # Extraction web avancée
-    geo="fr",  # Localisé en France
-    timeout=10,  # Timeout raisonnable pour les sites culinaires
-    follow_redirects=1,  # Suivre les redirections pour les sites complexes
-    retry_num=2,  # Réessayer en cas d'échec initial
-)
+def get_search_tools() -> list:
+    """
+    Outils de recherche partagés par les agents, instanciés à la première demande.
 
-# Ensemble complet d'outils mis à disposition des agents
-search_tools = [
-    search_tool,  # Recherche web générale pour les recettes
-    scrape_tool,  # Extraction détaillée des sites de recettes
-]
+    Returns:
+        list: Recherche web (SafeSerperTool) et extraction de pages (ScrapeNinjaTool)
+    """
+    with _search_tools_lock:
+        if not search_tools:
+            from menu_planner.tools.safe_serper import SafeSerperTool
+            from menu_planner.tools.scrapeninja import ScrapeNinjaTool
+
+            search_tools.extend([
+                SafeSerperTool(),  # Recherche web générale pour les recettes
+                ScrapeNinjaTool(  # Extraction détaillée des sites de recettes
+                    geo="fr",  # Localisé en France
+                    timeout=10,  # Timeout raisonnable pour les sites culinaires
+                    follow_redirects=1,  # Suivre les redirections pour les sites complexes
+                    retry_num=2,  # Réessayer en cas d'échec initial
+                ),
+            ])
+    return search_tools
 
 
 @CrewBase
@@ -83,10 +98,9 @@ class RecipeExpertCrew:
         """
         return Agent(
             config=self.agents_config["culinary_expert"],
-            tools=search_tools,
+            tools=get_search_tools(),
             verbose=True,
-            reasoning=True,
-            max_reasoning_attempts=3,
+            **agent_options("culinary_expert", "RecipeExpertCrew"),
         )
 
     @agent
@@ -102,10 +116,9 @@ class RecipeExpertCrew:
         """
         return Agent(
             config=self.agents_config["nutritionist"],
-            tools=search_tools,
+            tools=get_search_tools(),
             verbose=True,
-            reasoning=True,
-            max_reasoning_attempts=3,
+            **agent_options("nutritionist", "RecipeExpertCrew"),
         )
         
     @agent
@@ -122,10 +135,9 @@ class RecipeExpertCrew:
         """
         return Agent(
             config=self.agents_config["formatting_specialist"],
-            tools=search_tools,
+            tools=get_search_tools(),
             verbose=True,
-            reasoning=True,
-            max_reasoning_attempts=3,
+            **agent_options("formatting_specialist", "RecipeExpertCrew"),
         )
 
     @agent
@@ -142,7 +154,22 @@ class RecipeExpertCrew:
         return Agent(
             config=self.agents_config["content_specialist"],
             verbose=True,
-            reasoning=True,
+            **agent_options("content_specialist", "RecipeExpertCrew"),
+        )
+
+    @task
+    def structured_recipe(self) -> Task:
+        """
+        Recette complète et analyse nutritionnelle en une seule tâche structurée.
+        
+        Utilisée en mode `structured`: le HTML, le YAML Paprika et le JSON des
+        ingrédients sont ensuite dérivés localement de ce résultat validé.
+        """
+        return validated_task(
+            "structured_recipe", clean_structured_recipe,
+            config=task_config(self.tasks_config["structured_recipe"]),
+            output_pydantic=StructuredRecipe,
+            verbose=True
         )
 
     @task
@@ -154,7 +181,7 @@ class RecipeExpertCrew:
         en un seul processus intégré pour plus d'efficacité.
         """
         return Task(
-            config=self.tasks_config["recipe_development"],
+            config=task_config(self.tasks_config["recipe_development"]),
             # Not specifying output_file as this is an intermediate task
             verbose=True
         )
@@ -168,7 +195,7 @@ class RecipeExpertCrew:
         propose des modifications adaptées aux besoins des enfants.
         """
         return Task(
-            config=self.tasks_config["nutrition_evaluation"],
+            config=task_config(self.tasks_config["nutrition_evaluation"]),
             # Not specifying output_file as this is an intermediate task
             verbose=True
         )
@@ -179,10 +206,12 @@ class RecipeExpertCrew:
         Génération du format HTML pour la recette.
         
         Cette tâche crée une version HTML structurée et élégante de la recette
-        pour l'affichage web ou l'impression.
+        pour l'affichage web ou l'impression. Elle n'est utilisée que si le rendu
+        local est désactivé (voir menu_planner.rendering).
         """
-        return Task(
-            config=self.tasks_config["generate_html"],
+        return validated_task(
+            "generate_html", clean_html,
+            config=task_config(self.tasks_config["generate_html"]),
             output_file="{recipe_html_path}",
             verbose=True
         )
@@ -195,8 +224,9 @@ class RecipeExpertCrew:
         Cette tâche crée une version YAML compatible avec Paprika 3
         pour l'importation dans l'application de gestion de recettes.
         """
-        return Task(
-            config=self.tasks_config["generate_yaml"],
+        return validated_task(
+            "generate_yaml", clean_paprika_yaml,
+            config=task_config(self.tasks_config["generate_yaml"]),
             output_file="{recipe_yaml_path}",
             verbose=True
         )
@@ -209,8 +239,9 @@ class RecipeExpertCrew:
         Cette tâche crée une liste structurée des ingrédients au format JSON
         pour faciliter le traitement programmatique et l'analyse.
         """
-        return Task(
-            config=self.tasks_config["generate_ingredients_json"],
+        return validated_task(
+            "generate_ingredients_json", clean_ingredients,
+            config=task_config(self.tasks_config["generate_ingredients_json"]),
             output_file="{recipe_ingredients_path}",
             verbose=True
         )
@@ -223,26 +254,53 @@ class RecipeExpertCrew:
         Returns:
             Crew: Instance complètement configurée du RecipeExpertCrew
         """
-        # Define tasks
-        recipe_dev = self.recipe_development()
-        nutrition = self.nutrition_evaluation()
-        html = self.generate_html()
-        yaml = self.generate_yaml()
-        ingredients = self.generate_ingredients_json()
-        
-        # Set up task dependencies
-        nutrition.context = [recipe_dev]
-        html.context = [nutrition]
-        yaml.context = [nutrition]
-        ingredients.context = [nutrition]
+        if config.recipe_mode == "structured":
+            tasks = [self.structured_recipe()]
+        else:
+            tasks = self.format_tasks()
         
         return Crew(
             agents=self.agents,  # Automatically created by the @agent decorator
-            tasks=[recipe_dev, nutrition, html, yaml, ingredients],
+            tasks=tasks,
             process=Process.sequential,
             respect_context_window=True,
-            memory=True,
+            # Mémoire partagée branchée sur chaque copie par crew_factory (voir menu_planner.memory)
+            memory=config.memory.backend == "crewai",
+            embedder=embedder_config() if config.memory.backend == "crewai" else None,
             cache=True,
             verbose=True,
             timeout=300,
         )
+
+    def format_tasks(self) -> list:
+        """
+        Tâches du mode `tasks`: développement, nutrition (optionnelle) puis une tâche par format.
+        
+        Returns:
+            list: Tâches ordonnées, avec leurs dépendances de contexte
+        """
+        # Define tasks
+        recipe_dev = self.recipe_development()
+        yaml = self.generate_yaml()
+        ingredients = self.generate_ingredients_json()
+        tasks = [recipe_dev, yaml, ingredients]
+        
+        # Les valeurs nutritionnelles sont calculées localement (voir menu_planner.nutrition);
+        # l'évaluation par le nutritionniste n'est ajoutée que sur demande
+        source = recipe_dev
+        if config.nutrition.llm_evaluation:
+            source = self.nutrition_evaluation()
+            source.context = [recipe_dev]
+            tasks.insert(1, source)
+        
+        # Set up task dependencies
+        yaml.context = [source]
+        ingredients.context = [source]
+        
+        # Le HTML est rendu localement à partir du YAML et des ingrédients,
+        # sauf si le rendu local est désactivé
+        if not config.local_rendering:
+            html = self.generate_html()
+            html.context = [source]
+            tasks.insert(tasks.index(yaml), html)
+        return tasks
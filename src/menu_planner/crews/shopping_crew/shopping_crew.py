@@ -3,6 +3,10 @@ from crewai.project import CrewBase, agent, crew, task
 from pydantic import BaseModel
 from typing import List
 
+from menu_planner.llm import agent_options
+from menu_planner.prompts import task_config
+from menu_planner.validation import clean_html, clean_text, validated_task
+
 class IngredientItem(BaseModel):
     name: str
     quantity: float
@@ -14,7 +18,13 @@ class CategoryIngredients(BaseModel):
 
 @CrewBase
 class ShoppingCrew:
-    """ShoppingCrew pour créer une liste de courses organisée à partir des recettes"""
+    """
+    ShoppingCrew pour créer une liste de courses organisée à partir des recettes
+
+    L'agrégation des quantités est faite localement (voir menu_planner.ingredients);
+    le crew reçoit la liste agrégée via l'input `aggregated_ingredients` et se
+    charge uniquement du classement par rayon et de la présentation.
+    """
 
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
@@ -23,43 +33,40 @@ class ShoppingCrew:
     def ingredient_organizer(self) -> Agent:
         return Agent(
             config=self.agents_config['ingredient_organizer'],
-            verbose=True
+            verbose=True,
+            **agent_options("ingredient_organizer", "ShoppingCrew"),
         )
 
     @agent
     def shopping_list_designer(self) -> Agent:
         return Agent(
             config=self.agents_config['shopping_list_designer'],
-            verbose=True
-        )
-
-    @task
-    def aggregate_ingredients(self) -> Task:
-        return Task(
-            config=self.tasks_config['aggregate_ingredients'],
-            verbose=True
+            verbose=True,
+            **agent_options("shopping_list_designer", "ShoppingCrew"),
         )
 
     @task
     def organize_by_category(self) -> Task:
         return Task(
-            config=self.tasks_config['organize_by_category'],
+            config=task_config(self.tasks_config['organize_by_category']),
             verbose=True
         )
 
     @task
     def create_html_shopping_list(self) -> Task:
-        return Task(
-            config=self.tasks_config['create_html_shopping_list'],
-            output_file="output/shopping_crew/liste_courses.html",
+        return validated_task(
+            "create_html_shopping_list", clean_html,
+            config=task_config(self.tasks_config['create_html_shopping_list']),
+            output_file="{output_dir}/shopping_crew/liste_courses.html",
             verbose=True
         )
 
     @task
     def create_markdown_shopping_list(self) -> Task:
-        return Task(
-            config=self.tasks_config['create_markdown_shopping_list'],
-            output_file="output/shopping_crew/liste_courses.md",
+        return validated_task(
+            "create_markdown_shopping_list", clean_text,
+            config=task_config(self.tasks_config['create_markdown_shopping_list']),
+            output_file="{output_dir}/shopping_crew/liste_courses.md",
             verbose=True
         )
 
@@ -0,0 +1,284 @@
+"""
+Events - Flux d'événements de progression d'une exécution
+
+Pendant l'exécution du flow, ce module publie au fil de l'eau :
+- `run_started` / `run_finished`
+- `step_started` / `step_finished` pour chaque étape (`generate_menu`, `process_recipes`...)
+- `recipe_started`, puis `recipe_completed` (avec les chemins de ses fichiers
+  et sa provenance : `generated`, `cache`, `library`...) ou `recipe_failed`
+- `artifact` dès qu'un fichier de synthèse est disponible (menu JSON et HTML,
+  liste de courses)
+- `llm_delta` : fragments de texte des réponses LLM en streaming (`LLM_STREAM`),
+  rattachés à la recette en cours de génération dans le thread
+
+Chaque événement est ajouté, dès sa publication, à un fichier JSONL
+(`<sortie>/events.jsonl`). Un serveur SSE local optionnel (`EVENTS_SSE_PORT`)
+diffuse les mêmes événements (`GET /events`, historique rejoué à la connexion)
+et sert les fichiers produits (`GET /files/<chemin publié dans l'événement>`,
+limité au dossier de sortie), pour afficher les recettes au fur et à mesure qu'elles sont prêtes.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import unquote, urlsplit
+
+from menu_planner.config import config
+
+logger = logging.getLogger("menu_planner.events")
+
+# Chemins d'artefacts d'une recette publiés avec `recipe_completed`
+RECIPE_ARTIFACT_KEYS = {"html": "recipe_html_path", "yaml": "recipe_yaml_path",
+                        "ingredients": "recipe_ingredients_path"}
+
+_CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".json": "application/json",
+                  ".yaml": "text/yaml; charset=utf-8", ".md": "text/markdown; charset=utf-8"}
+
+
+class EventStream:
+    """
+    Diffusion des événements d'une exécution vers un fichier JSONL et des abonnés.
+
+    Attributs:
+        run_id: Identifiant de l'exécution, repris dans chaque événement
+        path: Fichier JSONL (None pour ne rien écrire)
+        root: Dossier de sortie servi par le serveur SSE
+    """
+
+    def __init__(self, run_id: str, path: Optional[Path] = None, root: Optional[Path] = None,
+                 history: int = 5000):
+        self.run_id = run_id
+        self.path = Path(path) if path else None
+        self.root = Path(root or ".").resolve()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._history = deque(maxlen=history)
+        self._subscribers = []
+        self._file = None
+        self.server = None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def emit(self, event_type: str, **fields) -> dict:
+        """Publie un événement, l'écrit immédiatement dans le JSONL et le transmet aux abonnés."""
+        with self._lock:
+            self._sequence += 1
+            event = {"id": self._sequence, "type": event_type, "ts": round(time.time(), 3),
+                     "run_id": self.run_id, **fields}
+            if self._file:
+                self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+            self._history.append(event)
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(event)
+                except queue.Full:
+                    logger.debug("Dropping event for a slow SSE client")
+        return event
+
+    def subscribe(self) -> queue.Queue:
+        """File des événements à venir, préremplie avec l'historique de l'exécution."""
+        subscriber = queue.Queue(maxsize=10000)
+        with self._lock:
+            for event in self._history:
+                subscriber.put_nowait(event)
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def close(self) -> None:
+        """Ferme le fichier JSONL et arrête le serveur SSE."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(None)
+                except queue.Full:
+                    pass
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def serve(self, host: str, port: int) -> ThreadingHTTPServer:
+        """Démarre le serveur SSE dans un thread démon."""
+        stream = self
+
+        class Handler(_SSEHandler):
+            event_stream = stream
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="menu-planner-sse", daemon=True).start()
+        logger.info(f"Progress events served on http://{host}:{self.server.server_address[1]}/events")
+        return self.server
+
+
+class _SSEHandler(BaseHTTPRequestHandler):
+    """`GET /events` (Server-Sent Events) et `GET /files/<chemin>` (fichiers produits)."""
+
+    event_stream: EventStream = None
+    keepalive_seconds = 15
+
+    def do_GET(self):
+        path = unquote(urlsplit(self.path).path)
+        if path == "/events":
+            self._stream_events()
+        elif path.startswith("/files/"):
+            self._send_file(path[len("/files/"):])
+        else:
+            self.send_error(404)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        subscriber = self.event_stream.subscribe()
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=self.keepalive_seconds)
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                self.wfile.write(f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if event["type"] == "run_finished":
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("SSE client disconnected")
+        finally:
+            self.event_stream.unsubscribe(subscriber)
+
+    def _send_file(self, artifact_path: str):
+        root = self.event_stream.root
+        target = Path(artifact_path).resolve()
+        if not target.is_relative_to(root) or not target.is_file():
+            self.send_error(404)
+            return
+        content = target.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPES.get(target.suffix, "application/octet-stream"))
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        logger.debug(f"SSE {self.address_string()} {format % args}")
+
+
+_stream: Optional[EventStream] = None
+_local = threading.local()
+_llm_hook_installed = False
+_llm_hook_lock = threading.Lock()
+
+
+def start_event_stream(run_id: str, output_dir: str = "output") -> Optional[EventStream]:
+    """
+    Ouvre le flux d'événements de l'exécution selon `config.events`.
+
+    Returns:
+        Optional[EventStream]: None si les événements sont désactivés
+    """
+    global _stream
+    stop_event_stream()
+    settings = config.events
+    if not settings.enabled and not settings.sse_port:
+        return None
+    path = Path(settings.path or Path(output_dir) / "events.jsonl") if settings.enabled else None
+    _stream = EventStream(run_id, path=path, root=Path(output_dir))
+    if settings.sse_port:
+        try:
+            _stream.serve(settings.sse_host, settings.sse_port)
+        except OSError as e:
+            logger.error(f"Could not start the SSE server on port {settings.sse_port}: {str(e)}")
+    if settings.llm_stream:
+        install_llm_stream_hook()
+    return _stream
+
+
+def stop_event_stream() -> None:
+    """Ferme le flux d'événements courant, s'il existe."""
+    global _stream
+    if _stream is not None:
+        _stream.close()
+        _stream = None
+
+
+def get_event_stream() -> Optional[EventStream]:
+    return _stream
+
+
+def emit(event_type: str, **fields) -> Optional[dict]:
+    """Publie un événement sur le flux courant (sans effet si aucun flux n'est ouvert)."""
+    stream = _stream
+    if stream is None:
+        return None
+    try:
+        return stream.emit(event_type, **fields)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not publish {event_type} event: {str(e)}")
+        return None
+
+
+def emit_recipe(event_type: str, recipe_input: dict, **fields) -> Optional[dict]:
+    """Publie un événement de recette avec son nom, son identifiant et les chemins de ses fichiers."""
+    return emit(
+        event_type,
+        recipe=recipe_input["recipe_name"],
+        recipe_id=recipe_input.get("recipe_id"),
+        artifacts={name: recipe_input[key] for name, key in RECIPE_ARTIFACT_KEYS.items() if key in recipe_input},
+        **fields,
+    )
+
+
+@contextmanager
+def recipe_scope(recipe_input: dict):
+    """Rattache les fragments LLM produits dans ce thread à la recette en cours."""
+    previous = getattr(_local, "recipe_id", None)
+    _local.recipe_id = recipe_input.get("recipe_id")
+    try:
+        yield
+    finally:
+        _local.recipe_id = previous
+
+
+def install_llm_stream_hook() -> None:
+    """Publie chaque fragment de réponse LLM en streaming (événement CrewAI `LLMStreamChunkEvent`)."""
+    global _llm_hook_installed
+    with _llm_hook_lock:
+        if _llm_hook_installed:
+            return
+        _llm_hook_installed = True
+
+    try:
+        from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+    except ImportError:
+        logger.warning("CrewAI LLM stream events unavailable, token deltas will not be published")
+        return
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_llm_chunk(source, event):
+        # Le bus CrewAI appelle les handlers dans le thread qui génère la recette
+        emit("llm_delta", recipe_id=getattr(_local, "recipe_id", None), text=event.chunk)
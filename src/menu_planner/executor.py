@@ -0,0 +1,172 @@
+"""
+Executor - Exécution concurrente et bornée des générations de recettes
+
+Les recettes d'un menu sont indépendantes: ce module les exécute dans un pool
+de threads de taille bornée, avec un délai maximal et un nombre de tentatives
+propres à chaque recette. Seules les recettes en échec sont relancées; les
+autres conservent leur résultat.
+
+`run_in_background` lance une étape indépendante (la page du menu) dans son
+propre thread, pendant que le flow poursuit avec les recettes.
+
+Note: un thread Python ne peut pas être interrompu, le délai n'annule donc
+pas le travail en cours. Une tentative qui le dépasse continue en arrière-plan
+et écrit toujours ses fichiers : avant de relancer la recette, comme avant
+de rendre la main après la dernière tentative, on attend qu'elle se termine
+(au plus un nouveau délai) pour que deux tentatives n'écrivent jamais en même
+temps et que l'appelant ne reprenne pas des fichiers encore en cours
+d'écriture. Si elle réussit entre-temps, son résultat est retenu; si elle ne
+se termine pas, la recette est abandonnée sans nouvelle tentative.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+logger = logging.getLogger("menu_planner.executor")
+
+
+class AttemptTimeout(TimeoutError):
+    """
+    Tentative qui a dépassé son délai; elle poursuit son exécution dans `worker`.
+
+    Attributs:
+        worker: Thread de la tentative abandonnée
+        outcome: Résultat (`result`) ou exception (`error`) de la tentative, une fois terminée
+    """
+
+    def __init__(self, message: str, worker: threading.Thread, outcome: dict):
+        super().__init__(message)
+        self.worker = worker
+        self.outcome = outcome
+
+
+def call_with_timeout(func: Callable[[Any], Any], item: Any, timeout: Optional[float]) -> Any:
+    """
+    Appelle `func(item)` en levant AttemptTimeout si l'appel dépasse `timeout` secondes.
+
+    Le délai n'interrompt pas l'appel : il se poursuit dans son thread, que
+    l'appelant peut attendre via l'exception.
+
+    Args:
+        func: Fonction à exécuter
+        item: Argument unique passé à la fonction
+        timeout: Délai maximal en secondes (None ou 0 pour aucun délai)
+
+    Returns:
+        Any: Valeur retournée par la fonction
+    """
+    if not timeout:
+        return func(item)
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func(item)
+        except BaseException as e:  # propagated to the caller below
+            outcome["error"] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise AttemptTimeout(f"exceeded {timeout}s", worker, outcome)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def run_concurrently(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_concurrency: int = 4,
+    timeout: Optional[float] = None,
+    max_retries: int = 0,
+    retry_backoff: float = 0.0,
+    label: Callable[[Any], str] = str,
+    on_complete: Optional[Callable[[Any, Any], None]] = None,
+) -> List[Any]:
+    """
+    Exécute `func` sur chaque élément avec une concurrence bornée.
+
+    Args:
+        func: Fonction appliquée à chaque élément
+        items: Éléments à traiter
+        max_concurrency: Nombre maximal d'exécutions simultanées
+        timeout: Délai maximal par tentative, en secondes (n'annule pas la tentative, voir le module)
+        max_retries: Nombre de nouvelles tentatives pour un élément en échec
+        retry_backoff: Délai de base avant une nouvelle tentative (exponentiel, avec gigue)
+        label: Fonction donnant un libellé lisible à un élément pour les logs
+        on_complete: Rappel `(item, result)` appelé dès qu'un élément réussit
+
+    Returns:
+        List[Any]: Résultats alignés sur `items`, None pour les éléments en échec
+    """
+
+    def run_one(item):
+        for attempt in range(max_retries + 1):
+            started = time.monotonic()
+            try:
+                result = call_with_timeout(func, item, timeout)
+            except AttemptTimeout as e:
+                logger.warning(f"Attempt {attempt + 1}/{max_retries + 1} failed for {label(item)}: {str(e)}")
+                # Relancer (ou rendre la main après la dernière tentative) sans attendre laisserait
+                # la tentative écrire ses fichiers pendant qu'une autre tentative ou l'appelant s'en sert
+                logger.info(f"Waiting up to {timeout}s for the abandoned attempt on {label(item)} to finish")
+                e.worker.join(timeout)
+                if e.worker.is_alive():
+                    logger.error(f"Abandoned attempt on {label(item)} is still running, giving up")
+                    break
+                if "result" not in e.outcome:
+                    continue
+                logger.info(f"Abandoned attempt on {label(item)} finished, keeping its result")
+                result = e.outcome["result"]
+            except Exception as e:
+                logger.warning(f"Attempt {attempt + 1}/{max_retries + 1} failed for {label(item)}: {str(e)}")
+                if attempt < max_retries and retry_backoff:
+                    time.sleep(retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+                continue
+            logger.info(f"Completed {label(item)} in {time.monotonic() - started:.1f}s")
+            if on_complete:
+                try:
+                    on_complete(item, result)
+                except Exception as e:
+                    logger.error(f"Completion callback failed for {label(item)}: {str(e)}")
+            return result
+        logger.error(f"Giving up on {label(item)} after {attempt + 1} attempts")
+        return None
+
+    if not items:
+        return []
+    workers = max(1, min(max_concurrency, len(items)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recipe") as pool:
+        return list(pool.map(run_one, items))
+
+
+def run_in_background(func: Callable[..., Any], *args: Any, name: str = "background") -> Future:
+    """
+    Exécute `func(*args)` dans un thread démon.
+
+    Args:
+        func: Fonction à exécuter
+        name: Nom du thread, repris dans les logs
+
+    Returns:
+        Future: Résultat de l'appel, ou exception levée par la fonction
+    """
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:  # propagated by future.result()
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return future
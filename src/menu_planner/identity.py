@@ -0,0 +1,93 @@
+"""
+Identity - Identité canonique des recettes
+
+Un même plat revient sous des titres légèrement différents d'un jour ou
+d'une semaine à l'autre ("Tarte aux pommes", "Tarte à la pomme", "TARTE
+AUX POMMES"). Ce module calcule, pour chaque titre :
+- un titre canonique : Unicode normalisé (NFKC), sans accents ni casse,
+  apostrophes et ponctuation remplacées par des espaces, articles,
+  prépositions et qualificatifs sans effet sur le plat ("maison", "façon")
+  retirés, mots au singulier
+- un identifiant de recette : slug ASCII du titre canonique, tronqué, suivi
+  d'un suffixe de hachage stable du titre canonique
+
+Deux titres de même titre canonique partagent donc leurs fichiers, leur
+entrée de cache et leur génération ; deux titres différents ne peuvent pas
+produire le même identifiant, même lorsque leurs slugs tronqués coïncident.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+# Articles, prépositions et contractions ignorés dans l'identité d'un plat
+STOP_WORDS = frozenset({
+    "a", "au", "aux", "d", "de", "des", "du", "en", "et", "l", "la", "le", "les", "un", "une",
+    "facon", "maison",
+})
+
+# Mots dont le pluriel ne doit pas être retiré
+_INVARIABLE_ENDINGS = ("is", "us", "ss", "os", "as", "z")
+
+# Ligatures que la décomposition Unicode ne sépare pas
+_LIGATURES = str.maketrans({"œ": "oe", "Œ": "OE", "æ": "ae", "Æ": "AE", "ß": "ss"})
+
+SLUG_MAX_LENGTH = 60
+HASH_LENGTH = 8
+DEFAULT_TITLE = "recette"
+
+
+def strip_accents(text: str) -> str:
+    """Texte sans diacritiques ni ligatures ("crème brûlée" -> "creme brulee", "œuf" -> "oeuf")."""
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text.translate(_LIGATURES)) if not unicodedata.combining(c)
+    )
+
+
+def singularize(word: str) -> str:
+    """Retire les marques du pluriel les plus courantes en français."""
+    if len(word) <= 3 or word.endswith(_INVARIABLE_ENDINGS):
+        return word
+    if word.endswith(("eaux", "eux", "oux")):
+        return word[:-1]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def slugify(text: str, default: str = DEFAULT_TITLE) -> str:
+    """Slug ASCII (minuscules, chiffres et `_`) d'un texte libre."""
+    # Les caractères restés hors ASCII (apostrophe typographique, guillemets...) séparent les mots
+    ascii_text = re.sub(r"[^\x00-\x7f]", " ", strip_accents(unicodedata.normalize("NFKC", str(text))))
+    return re.sub(r"[^a-z0-9]+", "_", ascii_text.lower()).strip("_") or default
+
+
+def canonical_title(title: str) -> str:
+    """
+    Titre canonique d'une recette, base de son identité.
+
+    Returns:
+        str: Mots significatifs, en minuscules ASCII et au singulier, séparés par des espaces
+    """
+    words = slugify(title, default="").split("_")
+    significant = [singularize(word) for word in words if word and word not in STOP_WORDS]
+    # Un titre fait uniquement de mots vides reste identifiable
+    return " ".join(significant or [word for word in words if word]) or DEFAULT_TITLE
+
+
+def recipe_id(title: str) -> str:
+    """
+    Identifiant stable et sûr pour un nom de fichier, dérivé du titre canonique.
+
+    Exemple:
+        recipe_id("Tarte aux Pommes") == recipe_id("tarte à la pomme") == "tarte_pomme_<hash>"
+
+    Returns:
+        str: Slug tronqué à `SLUG_MAX_LENGTH` caractères suivi de `_<hash>`
+    """
+    canonical = canonical_title(title)
+    slug = canonical.replace(" ", "_")
+    if len(slug) > SLUG_MAX_LENGTH:
+        slug = slug[:SLUG_MAX_LENGTH].rsplit("_", 1)[0] or slug[:SLUG_MAX_LENGTH]
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+    return f"{slug}_{digest}"
@@ -0,0 +1,345 @@
+"""
+Ingredients - Agrégation locale et déterministe des ingrédients de la semaine
+
+Ce module remplace l'étape d'agrégation confiée jusqu'ici à un LLM dans
+ShoppingCrew. Il charge les fichiers `*_ingredients.json` produits par
+RecipeExpertCrew, les valide avec `RecipeIngredient`, normalise les unités et
+les noms d'ingrédients, puis additionne les quantités en une seule passe
+vectorisée. `ShoppingAggregator` tient le même agrégat à jour recette par
+recette, pendant la génération.
+
+Normalisation des unités:
+- masses ramenées en grammes (mg, g, kg)
+- volumes ramenés en millilitres (ml, cl, dl, l, c. à soupe, c. à café)
+- unités dénombrables ramenées à "pièce" (unité, pièce, pc...)
+- les autres unités (pincée, botte, au goût...) sont conservées telles quelles
+"""
+
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from menu_planner.identity import singularize, strip_accents
+from menu_planner.schemas import RecipeIngredient
+
+logger = logging.getLogger("menu_planner.ingredients")
+
+# Unité de base et facteur de conversion pour chaque unité connue
+UNIT_ALIASES = {
+    # Masses
+    "mg": ("g", 0.001),
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "gramme": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "kilogramme": ("g", 1000.0),
+    # Volumes
+    "ml": ("ml", 1.0),
+    "millilitre": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "centilitre": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "litre": ("ml", 1000.0),
+    "c. a soupe": ("ml", 15.0),
+    "c.a soupe": ("ml", 15.0),
+    "cuillere a soupe": ("ml", 15.0),
+    "cas": ("ml", 15.0),
+    "cs": ("ml", 15.0),
+    "c. a cafe": ("ml", 5.0),
+    "c.a cafe": ("ml", 5.0),
+    "cuillere a cafe": ("ml", 5.0),
+    "cac": ("ml", 5.0),
+    "cc": ("ml", 5.0),
+    # Pièces
+    "": ("pièce", 1.0),
+    "piece": ("pièce", 1.0),
+    "pc": ("pièce", 1.0),
+    "pcs": ("pièce", 1.0),
+    "unite": ("pièce", 1.0),
+    "u": ("pièce", 1.0),
+}
+
+# Unités d'affichage: au-delà du seuil, la quantité de base est convertie
+DISPLAY_UNITS = {
+    "g": (1000.0, "kg"),
+    "ml": (1000.0, "l"),
+}
+
+# Rayons de supermarché et mots-clés (normalisés: sans accents, au singulier),
+# testés dans l'ordre; les ingrédients non reconnus vont en "Épicerie"
+CATEGORY_KEYWORDS = {
+    "Fruits et Légumes": [
+        "pomme de terre", "carotte", "oignon", "echalote", "ail", "poireau", "courgette", "aubergine",
+        "poivron", "tomate", "salade", "laitue", "epinard", "chou", "brocoli", "haricot vert", "petit pois",
+        "champignon", "celeri", "concombre", "radis", "navet", "potiron", "courge", "patate douce",
+        "betterave", "fenouil", "avocat", "citron", "orange", "pomme", "poire", "banane", "fraise",
+        "framboise", "raisin", "abricot", "peche", "kiwi", "mangue", "ananas", "persil", "ciboulette",
+        "coriandre", "basilic", "menthe", "aneth", "gingembre",
+    ],
+    "Boucherie/Poissonnerie": [
+        "poulet", "dinde", "canard", "boeuf", "veau", "porc", "agneau", "jambon", "lardon", "bacon",
+        "saucisse", "viande", "steak", "escalope", "filet mignon", "chorizo", "saumon", "cabillaud",
+        "thon", "colin", "merlu", "truite", "sardine", "crevette", "moule", "poisson",
+    ],
+    "Produits Laitiers": [
+        "lait", "beurre", "creme", "yaourt", "fromage", "gruyere", "emmental", "parmesan", "mozzarella",
+        "comte", "chevre", "feta", "ricotta", "mascarpone", "oeuf", "œuf",
+    ],
+    "Boulangerie": ["pain", "baguette", "brioche", "pate feuilletee", "pate brisee", "pate a pizza", "tortilla"],
+    "Surgelés": ["surgele", "glace"],
+    "Condiments et Épices": [
+        "sel", "poivre", "muscade", "cumin", "curry", "paprika", "cannelle", "curcuma", "herbe de provence",
+        "thym", "laurier", "romarin", "origan", "moutarde", "vinaigre", "sauce soja", "bouillon", "epice",
+    ],
+}
+DEFAULT_CATEGORY = "Épicerie"
+
+
+def normalize_unit(unit: str) -> Tuple[str, float]:
+    """
+    Normalise une unité vers son unité de base.
+
+    Args:
+        unit: Unité telle qu'écrite dans le fichier d'ingrédients
+
+    Returns:
+        Tuple[str, float]: Unité de base et facteur multiplicatif à appliquer
+    """
+    raw = " ".join(str(unit or "").strip().lower().split())
+    key = strip_accents(raw).replace("’", "'")
+    key = re.sub(r"\bde\b|\bd'", "", key).strip()
+    if key in UNIT_ALIASES:
+        return UNIT_ALIASES[key]
+    singular = " ".join(singularize(w) for w in key.split())
+    if singular in UNIT_ALIASES:
+        return UNIT_ALIASES[singular]
+    # Unité non convertible: conservée au singulier
+    return " ".join(singularize(w) for w in raw.split()), 1.0
+
+
+def normalize_name(name: str) -> str:
+    """Normalise le nom affiché d'un ingrédient (minuscules, espaces, apostrophes)."""
+    text = " ".join(str(name).replace("’", "'").strip().lower().split())
+    return re.sub(r"^(de |d'|du |des )", "", text)
+
+
+def ingredient_key(name: str) -> str:
+    """Clé de regroupement d'un ingrédient: sans accents ni pluriels."""
+    words = re.split(r"[\s\-]+", strip_accents(normalize_name(name)))
+    return " ".join(singularize(w) for w in words if w)
+
+
+def strip_code_fences(text: str) -> str:
+    """Supprime les délimiteurs markdown ``` éventuellement laissés par le LLM."""
+    return "\n".join(
+        line for line in text.splitlines() if not re.fullmatch(r"\s*```[a-zA-Z]*\s*", line)
+    )
+
+
+def load_ingredients_file(path: str) -> List[RecipeIngredient]:
+    """
+    Charge et valide un fichier `*_ingredients.json`.
+
+    Les entrées invalides sont ignorées avec un avertissement, afin qu'un
+    ingrédient mal formé ne fasse pas échouer toute la liste de courses.
+
+    Returns:
+        List[RecipeIngredient]: Ingrédients valides du fichier
+    """
+    try:
+        data = json.loads(strip_code_fences(Path(path).read_text(encoding="utf-8")))
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not load ingredients from {path}: {str(e)}")
+        return []
+
+    if isinstance(data, dict):
+        data = data.get("ingredients", [])
+    if not isinstance(data, list):
+        logger.warning(f"Unexpected ingredients format in {path}")
+        return []
+
+    ingredients = []
+    for item in data:
+        try:
+            ingredients.append(RecipeIngredient.model_validate(item))
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid ingredient in {path}: {item!r} ({e.error_count()} errors)")
+    return ingredients
+
+
+def aggregate_ingredients(ingredients: Iterable[RecipeIngredient]) -> List[RecipeIngredient]:
+    """
+    Additionne les quantités des ingrédients identiques.
+
+    Les ingrédients sont regroupés par (nom normalisé, unité de base); les
+    sommes sont calculées en une passe avec `numpy.bincount`. L'ordre de
+    première apparition est conservé pour un résultat reproductible.
+
+    Returns:
+        List[RecipeIngredient]: Ingrédients agrégés, avec unités d'affichage
+    """
+    keys, names, units, quantities = [], [], [], []
+    for ingredient in ingredients:
+        base_unit, factor = normalize_unit(ingredient.unit)
+        keys.append(f"{ingredient_key(ingredient.name)}|{base_unit}")
+        names.append(normalize_name(ingredient.name))
+        units.append(base_unit)
+        quantities.append(ingredient.quantity * factor)
+
+    if not keys:
+        return []
+
+    unique_keys, first_index, inverse = np.unique(
+        np.array(keys, dtype=object), return_index=True, return_inverse=True
+    )
+    totals = np.bincount(inverse.ravel(), weights=np.asarray(quantities, dtype=float),
+                         minlength=len(unique_keys))
+
+    return [
+        display_ingredient(names[first_index[group]], float(totals[group]), units[first_index[group]])
+        for group in np.argsort(first_index, kind="stable")
+    ]
+
+
+def display_ingredient(name: str, quantity: float, base_unit: str) -> RecipeIngredient:
+    """Ingrédient agrégé exprimé dans son unité d'affichage (1500 g -> 1.5 kg)."""
+    unit = base_unit
+    if unit in DISPLAY_UNITS and quantity >= DISPLAY_UNITS[unit][0]:
+        quantity, unit = quantity / DISPLAY_UNITS[unit][0], DISPLAY_UNITS[unit][1]
+    return RecipeIngredient(name=name, quantity=round(quantity, 2), unit=unit)
+
+
+def aggregate_ingredient_files(paths: Iterable[str]) -> List[RecipeIngredient]:
+    """
+    Charge tous les fichiers d'ingrédients et agrège leur contenu.
+
+    Les chemins en double sont ignorés pour ne pas compter deux fois une recette.
+    """
+    unique_paths = list(dict.fromkeys(paths))
+    ingredients = [item for path in unique_paths for item in load_ingredients_file(path)]
+    logger.info(f"Aggregating {len(ingredients)} ingredients from {len(unique_paths)} recipes")
+    return aggregate_ingredients(ingredients)
+
+
+class ShoppingAggregator:
+    """
+    Agrégat courant des ingrédients, alimenté recette par recette.
+
+    Chaque fichier d'ingrédients est ajouté dès que sa recette est terminée
+    (générée, restaurée du cache ou de la bibliothèque), depuis n'importe quel
+    thread. Les totaux sont tenus à jour à chaque ajout : la liste de courses
+    est disponible dès l'arrivée de la dernière recette, sans relire ni
+    réagréger l'ensemble des fichiers.
+
+    `ingredients()` retourne le même résultat que `aggregate_ingredient_files`
+    sur les mêmes chemins, quel que soit l'ordre d'arrivée des recettes.
+
+    Attributs:
+        paths: Fichiers d'ingrédients attendus, dans l'ordre des recettes
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = list(dict.fromkeys(paths))
+        self._rank = {path: index for index, path in enumerate(self.paths)}
+        self._lock = threading.Lock()
+        self._added = set()
+        # clé -> [position de première apparition, nom, unité de base, total]
+        self._totals = {}
+
+    def add(self, path: str, ingredients: Optional[Iterable[RecipeIngredient]] = None) -> bool:
+        """
+        Ajoute les ingrédients d'une recette à l'agrégat (une seule fois par fichier).
+
+        Args:
+            path: Fichier d'ingrédients de la recette
+            ingredients: Ingrédients déjà chargés, sinon lus depuis `path`
+
+        Returns:
+            bool: True si le fichier a été ajouté, False s'il l'était déjà
+        """
+        if path in self._added:
+            return False
+        items = list(ingredients) if ingredients is not None else load_ingredients_file(path)
+        with self._lock:
+            if path in self._added:
+                return False
+            self._added.add(path)
+            if path not in self._rank:
+                self._rank[path] = len(self.paths)
+                self.paths.append(path)
+            rank = self._rank[path]
+            for index, ingredient in enumerate(items):
+                base_unit, factor = normalize_unit(ingredient.unit)
+                key = f"{ingredient_key(ingredient.name)}|{base_unit}"
+                position = (rank, index)
+                entry = self._totals.get(key)
+                if entry is None:
+                    self._totals[key] = [position, normalize_name(ingredient.name), base_unit,
+                                         ingredient.quantity * factor]
+                    continue
+                entry[3] += ingredient.quantity * factor
+                if position < entry[0]:
+                    entry[0], entry[1] = position, normalize_name(ingredient.name)
+        return True
+
+    @property
+    def complete(self) -> bool:
+        """True lorsque tous les fichiers attendus ont été ajoutés."""
+        with self._lock:
+            return self._added.issuperset(self.paths)
+
+    def covers(self, paths: Iterable[str]) -> bool:
+        """True si l'agrégat contient exactement ces fichiers (recettes réussies d'une exécution)."""
+        with self._lock:
+            return self._added == set(paths)
+
+    def progress(self) -> Tuple[int, int]:
+        """Nombre de fichiers ajoutés et nombre de fichiers attendus."""
+        with self._lock:
+            return len(self._added & set(self.paths)), len(self.paths)
+
+    def ingredients(self) -> List[RecipeIngredient]:
+        """
+        Instantané de l'agrégat, dans l'ordre de première apparition.
+
+        Returns:
+            List[RecipeIngredient]: Ingrédients agrégés, avec unités d'affichage
+        """
+        with self._lock:
+            entries = sorted((tuple(entry) for entry in self._totals.values()), key=lambda entry: entry[0])
+        return [display_ingredient(name, quantity, unit) for _, name, unit, quantity in entries]
+
+
+def categorize_ingredient(name: str) -> str:
+    """
+    Rayon de supermarché d'un ingrédient, d'après `CATEGORY_KEYWORDS`.
+
+    Returns:
+        str: Nom du rayon, `DEFAULT_CATEGORY` si aucun mot-clé ne correspond
+    """
+    padded = " " + ingredient_key(name).replace("'", " ") + " "
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(f" {keyword} " in padded for keyword in keywords):
+            return category
+    return DEFAULT_CATEGORY
+
+
+def categorize_ingredients(ingredients: Iterable[RecipeIngredient]) -> List[Tuple[str, List[RecipeIngredient]]]:
+    """
+    Classe les ingrédients par rayon, dans l'ordre de `CATEGORY_KEYWORDS`.
+
+    Returns:
+        List[Tuple[str, List[RecipeIngredient]]]: Rayons non vides et leurs ingrédients
+    """
+    groups = {category: [] for category in [*CATEGORY_KEYWORDS, DEFAULT_CATEGORY]}
+    for ingredient in ingredients:
+        groups[categorize_ingredient(ingredient.name)].append(ingredient)
+    return [(category, items) for category, items in groups.items() if items]
@@ -0,0 +1,360 @@
+"""
+Library - Bibliothèque persistante et interrogeable des recettes générées
+
+Contrairement au cache de recettes (clé technique, éviction LRU), la
+bibliothèque garde chaque recette terminée, sans limite de durée, avec ses
+données structurées : fiche Paprika, ingrédients, calories, temps de
+préparation et analyse nutritionnelle. Un index plein texte SQLite FTS5
+(titre, ingrédients, catégories, insensible aux accents) permet de la
+consulter rapidement par titre, ingrédient, calories ou temps de préparation.
+
+Elle sert aussi de source de recettes connues : MenuDesignerCrew peut
+reprendre une partie de la semaine depuis la bibliothèque (`LIBRARY_REUSE`),
+et toute recette déjà présente pour la même composition familiale est
+restaurée sans appel au crew.
+
+Une recette est identifiée par son identifiant canonique (voir
+`menu_planner.identity`) et par la composition de la famille.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import yaml
+
+from menu_planner.config import config
+from menu_planner.identity import STOP_WORDS, canonical_title, recipe_id, singularize, strip_accents
+from menu_planner.ingredients import strip_code_fences
+from menu_planner.recipe_cache import ARTIFACT_PATHS
+
+logger = logging.getLogger("menu_planner.library")
+
+_COLUMNS = ("recipe_id", "name", "calories", "prep_minutes", "cook_minutes", "categories",
+            "nutritional_info", "uses", "last_used_at")
+
+
+def family_signature(adults, children, children_age) -> str:
+    """Composition familiale sous forme de clé ("2/1/10")."""
+    return f"{int(adults)}/{int(children)}/{str(children_age).strip()}"
+
+
+def parse_minutes(value) -> Optional[int]:
+    """Durée en minutes à partir d'un texte libre ("15 min", "1 h 30", "1h30", "2 heures")."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = strip_accents(str(value or "")).lower()
+    match = re.search(r"(\d+)\s*h(?:eures?)?\s*(\d+)?", text)
+    if match:
+        return int(match.group(1)) * 60 + int(match.group(2) or 0)
+    match = re.search(r"\d+", text)
+    return int(match.group(0)) if match else None
+
+
+def parse_calories(value) -> Optional[int]:
+    """Calories par portion à partir d'un texte libre ("350 calories par portion", "420 kcal")."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value or "").lower()
+    match = re.search(r"(\d+)\s*(?:k?cal|calorie)", text)
+    if match:
+        return int(match.group(1))
+    match = re.search(r"\d+", text)
+    return int(match.group(0)) if match else None
+
+
+def _fts_query(text: str) -> str:
+    """Requête FTS5 sûre: chaque mot significatif devient un préfixe entre guillemets, combinés par AND."""
+    words = re.findall(r"\w+", strip_accents(text).lower())
+    return " ".join(f'"{singularize(word)}"*' for word in words if word not in STOP_WORDS)
+
+
+class RecipeLibrary:
+    """
+    Bibliothèque SQLite des recettes, sûre pour un usage multi-threads.
+
+    Attributs:
+        path: Chemin de la base SQLite
+        fts_enabled: False si SQLite n'a pas été compilé avec FTS5 (recherche par LIKE)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                recipe_id TEXT NOT NULL,
+                family TEXT NOT NULL,
+                name TEXT NOT NULL,
+                canonical TEXT NOT NULL,
+                calories INTEGER,
+                prep_minutes INTEGER,
+                cook_minutes INTEGER,
+                categories TEXT NOT NULL,
+                nutritional_info TEXT,
+                nutrition_notes TEXT,
+                data TEXT NOT NULL,
+                ingredients TEXT NOT NULL,
+                html BLOB NOT NULL,
+                yaml BLOB NOT NULL,
+                ingredients_file BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_used_at REAL,
+                uses INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (recipe_id, family)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_library_calories ON recipes(calories)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_library_prep ON recipes(prep_minutes)")
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5("
+                "name, ingredients, categories, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite FTS5 unavailable, library search falls back to LIKE queries")
+            self.fts_enabled = False
+        self._conn.commit()
+
+    def ingest(self, recipe_input: dict, nutrition_notes: str = "") -> bool:
+        """
+        Ajoute (ou met à jour) une recette terminée à partir de ses fichiers.
+
+        Args:
+            recipe_input: Inputs de la recette (nom, famille et chemins `recipe_*_path`)
+            nutrition_notes: Analyse nutritionnelle produite par le crew, si disponible
+
+        Returns:
+            bool: True si la recette a été enregistrée
+        """
+        name = recipe_input["recipe_name"]
+        try:
+            artifacts = {key: Path(recipe_input[path_key]).read_bytes() for key, path_key in ARTIFACT_PATHS.items()}
+            data = yaml.safe_load(strip_code_fences(artifacts["yaml"].decode("utf-8")))
+            ingredients = json.loads(strip_code_fences(artifacts["ingredients"].decode("utf-8")))
+        except (OSError, UnicodeDecodeError, yaml.YAMLError, json.JSONDecodeError) as e:
+            logger.warning(f"Not adding {name} to the library: {str(e)}")
+            return False
+        if not isinstance(data, dict) or not isinstance(ingredients, list):
+            logger.warning(f"Not adding {name} to the library: unexpected recipe format")
+            return False
+
+        categories = data.get("categories") or []
+        if isinstance(categories, str):
+            categories = [categories]
+        ingredient_names = [str(item.get("name", "")) for item in ingredients if isinstance(item, dict)]
+        family = family_signature(recipe_input.get("adults", config.family.adults),
+                                  recipe_input.get("children", config.family.children),
+                                  recipe_input.get("children_age", config.family.children_age))
+        now = time.time()
+        row = {
+            "recipe_id": recipe_id(name),
+            "family": family,
+            "name": name,
+            "canonical": canonical_title(name),
+            "calories": parse_calories(data.get("nutritional_info")),
+            "prep_minutes": parse_minutes(data.get("prep_time")),
+            "cook_minutes": parse_minutes(data.get("cook_time")),
+            "categories": json.dumps([str(category) for category in categories], ensure_ascii=False),
+            "nutritional_info": str(data.get("nutritional_info") or ""),
+            "nutrition_notes": nutrition_notes or "",
+            "data": json.dumps(data, ensure_ascii=False, default=str),
+            "ingredients": json.dumps(ingredients, ensure_ascii=False),
+            "html": artifacts["html"],
+            "yaml": artifacts["yaml"],
+            "ingredients_file": artifacts["ingredients"],
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO recipes ({', '.join(row)}) VALUES ({', '.join('?' * len(row))}) "
+                "ON CONFLICT(recipe_id, family) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in row
+                            if column not in ("created_at", "nutrition_notes"))
+                # Une recette restaurée (sans analyse) ne doit pas effacer l'analyse déjà connue
+                + ", nutrition_notes = COALESCE(NULLIF(excluded.nutrition_notes, ''), recipes.nutrition_notes)",
+                tuple(row.values()),
+            )
+            rowid = self._conn.execute("SELECT rowid FROM recipes WHERE recipe_id = ? AND family = ?",
+                                       (row["recipe_id"], family)).fetchone()[0]
+            if self.fts_enabled:
+                self._conn.execute("DELETE FROM recipes_fts WHERE rowid = ?", (rowid,))
+                self._conn.execute("INSERT INTO recipes_fts (rowid, name, ingredients, categories) VALUES (?, ?, ?, ?)",
+                                   (rowid, strip_accents(name), strip_accents(" ; ".join(ingredient_names)),
+                                    strip_accents(" ; ".join(str(category) for category in categories))))
+            self._conn.commit()
+        logger.debug(f"Library: stored {name} ({row['recipe_id']}, family {family})")
+        return True
+
+    def search(self, text: str = "", ingredient: str = "", max_calories: Optional[int] = None,
+               max_prep_minutes: Optional[int] = None, family: Optional[str] = None,
+               limit: int = 20) -> List[dict]:
+        """
+        Recherche des recettes par titre, ingrédient, calories et temps de préparation.
+
+        Args:
+            text: Mots recherchés dans le titre, les ingrédients et les catégories
+            ingredient: Mots recherchés dans les seuls ingrédients
+            max_calories: Calories maximales par portion
+            max_prep_minutes: Temps de préparation maximal
+            family: Composition familiale (`family_signature`), toutes si None
+
+        Returns:
+            List[dict]: Recettes trouvées (champs résumés), les plus pertinentes d'abord
+        """
+        clauses, params = [], []
+        join = ""
+        order = "recipes.name"
+        text_query, ingredient_query = _fts_query(text), _fts_query(ingredient)
+        if self.fts_enabled and (text_query or ingredient_query):
+            match = []
+            if text_query:
+                match.append(f"{{name ingredients categories}} : ({text_query})")
+            if ingredient_query:
+                match.append(f"ingredients : ({ingredient_query})")
+            join = "JOIN recipes_fts ON recipes_fts.rowid = recipes.rowid"
+            clauses.append("recipes_fts MATCH ?")
+            params.append(" AND ".join(match))
+            order = "recipes_fts.rank"
+        else:
+            for words, columns in ((text, ("canonical", "ingredients", "categories")), (ingredient, ("ingredients",))):
+                for word in re.findall(r"\w+", strip_accents(words).lower()):
+                    if word in STOP_WORDS:
+                        continue
+                    clauses.append("(" + " OR ".join(f"recipes.{column} LIKE ?" for column in columns) + ")")
+                    params.extend([f"%{singularize(word)}%"] * len(columns))
+        if max_calories is not None:
+            clauses.append("recipes.calories <= ?")
+            params.append(max_calories)
+        if max_prep_minutes is not None:
+            clauses.append("recipes.prep_minutes <= ?")
+            params.append(max_prep_minutes)
+        if family:
+            clauses.append("recipes.family = ?")
+            params.append(family)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        columns = ", ".join(f"recipes.{column}" for column in _COLUMNS + ("family",))
+        query = f"SELECT {columns} FROM recipes {join} {where} ORDER BY {order} LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [dict(row, categories=json.loads(row["categories"])) for row in rows]
+
+    def suggest(self, count: int, family: str, exclude: Iterable[str] = ()) -> List[dict]:
+        """
+        Recettes connues à reprendre dans un menu, les moins récemment servies d'abord.
+
+        Args:
+            count: Nombre de recettes souhaitées
+            family: Composition familiale (`family_signature`)
+            exclude: Identifiants de recettes à écarter
+
+        Returns:
+            List[dict]: Recettes (nom, calories, temps...) pour cette famille
+        """
+        if count <= 0:
+            return []
+        exclude = list(exclude)
+        not_in = f"AND recipe_id NOT IN ({', '.join('?' * len(exclude))})" if exclude else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM recipes WHERE family = ? {not_in} "
+                "ORDER BY COALESCE(last_used_at, 0) ASC, uses ASC, name LIMIT ?",
+                (family, *exclude, count),
+            ).fetchall()
+        return [dict(row, categories=json.loads(row["categories"])) for row in rows]
+
+    def restore(self, recipe_input: dict) -> bool:
+        """
+        Écrit les fichiers d'une recette de la bibliothèque aux chemins attendus par le flow.
+
+        Returns:
+            bool: True si la recette existe pour cette famille et que ses fichiers ont été écrits
+        """
+        key = recipe_id(recipe_input["recipe_name"])
+        family = family_signature(recipe_input.get("adults", config.family.adults),
+                                  recipe_input.get("children", config.family.children),
+                                  recipe_input.get("children_age", config.family.children_age))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html, yaml, ingredients_file FROM recipes WHERE recipe_id = ? AND family = ?",
+                (key, family),
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute(
+                "UPDATE recipes SET uses = uses + 1, last_used_at = ? WHERE recipe_id = ? AND family = ?",
+                (time.time(), key, family),
+            )
+            self._conn.commit()
+        artifacts = {"html": row["html"], "yaml": row["yaml"], "ingredients": row["ingredients_file"]}
+        for name, path_key in ARTIFACT_PATHS.items():
+            target = Path(recipe_input[path_key])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(bytes(artifacts[name]))
+        logger.info(f"Recipe library hit: {recipe_input['recipe_name']}")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de recettes et de familles de la bibliothèque."""
+        with self._lock:
+            recipes, families = self._conn.execute(
+                "SELECT COUNT(DISTINCT recipe_id), COUNT(DISTINCT family) FROM recipes"
+            ).fetchone()
+        return {"recipes": recipes, "families": families}
+
+
+_recipe_library: Optional[RecipeLibrary] = None
+_recipe_library_lock = threading.Lock()
+
+
+def get_recipe_library() -> Optional[RecipeLibrary]:
+    """
+    Retourne la bibliothèque de recettes partagée par le processus.
+
+    Returns:
+        Optional[RecipeLibrary]: None si la bibliothèque est désactivée ou inutilisable
+    """
+    global _recipe_library
+    if not config.library.enabled:
+        return None
+    with _recipe_library_lock:
+        if _recipe_library is None:
+            try:
+                _recipe_library = RecipeLibrary(config.library.path)
+            except sqlite3.Error as e:
+                logger.error(f"Recipe library unavailable: {str(e)}")
+                return None
+    return _recipe_library
+
+
+def library_menu_input(library: Optional[RecipeLibrary], count: int, family: str) -> str:
+    """
+    Liste des recettes connues proposée à MenuDesignerCrew (`{library_recipes}`).
+
+    Returns:
+        str: "Titre (calories kcal)" séparés par des points-virgules, ou "aucune"
+    """
+    suggestions = library.suggest(count, family) if library else []
+    if not suggestions:
+        return "aucune"
+    logger.info(f"Library: proposing {len(suggestions)} known recipes to MenuDesignerCrew")
+    return " ; ".join(
+        f"{recipe['name']} ({recipe['calories']} kcal)" if recipe["calories"] else recipe["name"]
+        for recipe in suggestions
+    )
@@ -0,0 +1,160 @@
+"""
+LLM - Point d'entrée unique pour le choix du modèle des agents
+
+Tous les agents des crews obtiennent leur LLM et leurs réglages de
+raisonnement via `agent_options`. Chaque agent (ou tout un crew) est rattaché
+à un niveau de `config.llm.tiers` : `strong` pour le développement des
+recettes et la conception du menu, `fast` (modèle économique, sans
+raisonnement, température basse) pour le formatage et la présentation. Les
+tâches s'exécutent sur le niveau de leur agent.
+
+Les agents d'un même niveau partagent un LLM dont les appels passent par le
+limiteur de débit de leur fournisseur (voir menu_planner.ratelimit) : ils
+attendent leur tour au lieu de déclencher des erreurs 429, et un appel rejeté
+est relancé après le délai indiqué par le fournisseur. Sans ordonnancement ni
+streaming (`RATE_LIMIT=false`), un niveau sans réglage propre laisse CrewAI
+utiliser son modèle par défaut. Un LLM (ou une fabrique de LLM par niveau) de
+substitution peut être installé pour tout le processus, par exemple les faux
+LLM déterministes des benchmarks.
+
+Avec `LLM_STREAM=true`, ces LLM partagés fonctionnent en mode streaming et
+leurs fragments de réponse sont publiés dans le flux d'événements (`llm_delta`).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from crewai import LLM
+
+from menu_planner import ratelimit
+from menu_planner.config import ModelTier, config
+
+logger = logging.getLogger("menu_planner.llm")
+
+_llm_override: Optional[Any] = None
+_llm_factory: Optional[Callable[[str, ModelTier], Any]] = None
+_shared_llms: Dict[str, Any] = {}
+_shared_llms_lock = threading.Lock()
+
+
+class ScheduledLLM(LLM):
+    """LLM CrewAI dont chaque appel passe par le limiteur de débit de son fournisseur."""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        provider = ratelimit.provider_of(self.model)
+        tokens = ratelimit.estimate_tokens(messages) + config.rate_limit.completion_tokens
+        retries = config.rate_limit.llm_retries
+        for attempt in range(retries + 1):
+            with ratelimit.slot(provider, tokens) as call:
+                try:
+                    return super().call(messages, tools, callbacks, available_functions, **kwargs)
+                except Exception as e:
+                    if attempt == retries or not ratelimit.is_rate_limit_error(e):
+                        raise
+                    retry_after = ratelimit.error_retry_after(e)
+                    call.throttled(retry_after)
+            # Avec Retry-After, le limiteur fait déjà patienter tous les appels du fournisseur
+            delay = 0.0 if retry_after else ratelimit.backoff_delay(attempt)
+            logger.warning(f"LLM call to {provider} rate limited, retry {attempt + 1}/{retries}"
+                           + (f" in {delay:.1f}s" if delay else ""))
+            time.sleep(delay)
+
+
+def set_llm_override(llm: Optional[Any]) -> None:
+    """Impose un LLM à tous les agents créés ensuite (None pour revenir au défaut)."""
+    global _llm_override
+    _llm_override = llm
+
+
+def set_llm_factory(factory: Optional[Callable[[str, ModelTier], Any]]) -> None:
+    """Remplace la création des LLM partagés : `factory(nom du niveau, réglages)` (None pour revenir au défaut)."""
+    global _llm_factory
+    _llm_factory = factory
+    with _shared_llms_lock:
+        _shared_llms.clear()
+
+
+def tier_of(agent_name: str, crew_name: Optional[str] = None) -> str:
+    """
+    Niveau de modèle d'un agent : celui de l'agent, sinon celui de son crew, sinon le niveau par défaut.
+
+    Returns:
+        str: Nom d'un niveau de `config.llm.tiers`
+    """
+    settings = config.llm
+    tier = settings.tier_assignments.get(agent_name) or settings.tier_assignments.get(crew_name or "")
+    tier = tier or settings.default_tier
+    if tier not in settings.tiers:
+        logger.warning(f"Unknown model tier {tier!r} for agent {agent_name}, using {settings.default_tier!r}")
+        tier = settings.default_tier
+    return tier
+
+
+def get_llm(agent_name: str, crew_name: Optional[str] = None) -> Optional[Any]:
+    """
+    LLM à utiliser pour un agent.
+
+    Args:
+        agent_name: Nom de l'agent tel que défini dans `agents.yaml`
+        crew_name: Nom de la classe du crew de l'agent
+
+    Returns:
+        Optional[Any]: Instance de LLM, ou None pour le modèle par défaut de CrewAI
+    """
+    if _llm_override is not None:
+        return _llm_override
+    tier_name = tier_of(agent_name, crew_name)
+    tier = config.llm.tiers[tier_name]
+    customized = (tier.model != config.llm.model_name or tier.temperature is not None
+                  or tier.max_tokens is not None)
+    if _llm_factory is None and not (customized or config.rate_limit.enabled or config.events.llm_stream):
+        return None
+    return get_shared_llm(tier_name)
+
+
+def agent_options(agent_name: str, crew_name: Optional[str] = None) -> dict:
+    """
+    Réglages de modèle d'un agent selon son niveau, à passer à `Agent(...)`.
+
+    Returns:
+        dict: `llm`, `reasoning` et `max_reasoning_attempts`
+    """
+    tier = config.llm.tiers[tier_of(agent_name, crew_name)]
+    return {
+        "llm": get_llm(agent_name, crew_name),
+        "reasoning": tier.reasoning,
+        "max_reasoning_attempts": tier.max_reasoning_attempts if tier.reasoning else None,
+    }
+
+
+def get_shared_llm(tier_name: Optional[str] = None):
+    """LLM partagé par tous les agents d'un niveau (ordonnancé, en streaming si demandé)."""
+    tier_name = tier_name or config.llm.default_tier
+    tier = config.llm.tiers[tier_name]
+    with _shared_llms_lock:
+        llm = _shared_llms.get(tier_name)
+        if llm is None:
+            if _llm_factory is not None:
+                llm = _llm_factory(tier_name, tier)
+            else:
+                llm_class = ScheduledLLM if config.rate_limit.enabled else LLM
+                llm = llm_class(model=tier.model, temperature=tier.temperature, max_tokens=tier.max_tokens,
+                                api_base=config.llm.api_base, timeout=config.llm.timeout,
+                                stream=config.events.llm_stream)
+            _shared_llms[tier_name] = llm
+    return llm
+
+
+def shared_llms() -> Dict[str, Any]:
+    """LLM partagés déjà créés, par niveau."""
+    with _shared_llms_lock:
+        return dict(_shared_llms)
+
+
+def llm_signature() -> Tuple:
+    """Réglages des modèles lus à la construction des agents (voir crew_factory)."""
+    tiers = tuple(sorted((name, tier.model_dump_json()) for name, tier in config.llm.tiers.items()))
+    return (id(_llm_override), id(_llm_factory), tiers, tuple(sorted(config.llm.tier_assignments.items())),
+            config.llm.default_tier)
@@ -15,25 +15,45 @@
 # --- Imports standard et système ---
 import os
 import json
+import time
 import logging
+import threading
 from pathlib import Path
 
-# --- Imports monitoring et configuration ---
-import agentops
-from dotenv import load_dotenv
-
 # --- Imports du framework CrewAI ---
 from crewai.flow import Flow, start, listen, router, and_
 
 # --- Imports des schemas ---
 from menu_planner.schemas import MenuState
 from menu_planner.config import config
+from menu_planner.recipe_cache import get_recipe_cache
+from menu_planner.library import family_signature, get_recipe_library, library_menu_input
+from menu_planner.ingredients import ShoppingAggregator, aggregate_ingredient_files
+from menu_planner import events, identity, memory, nutrition
+from menu_planner.rendering import (
+    nutrition_notes_from_output,
+    render_menu_html,
+    render_recipe_file,
+    render_shopping_list,
+    structured_recipe_from_output,
+    task_output_text,
+    write_output,
+    write_recipe_files,
+)
+from menu_planner.executor import run_concurrently, run_in_background
+from menu_planner.checkpoint import (
+    checkpoint_path,
+    checkpointed,
+    clear_checkpoint,
+    load_checkpoint,
+    mark_recipe_completed,
+    recipe_artifacts_valid,
+    restore_state,
+)
+from menu_planner.metrics import format_critical_path, get_metrics, install_hooks, reset_metrics, timed_step
 
-# --- Imports des crews spécialisés ---
-from menu_planner.crews.menu_designer_crew.menu_designer_crew import MenuDesignerCrew
-from menu_planner.crews.html_design_crew.html_design_crew import HtmlDesignCrew
-from menu_planner.crews.recipe_expert_crew.recipe_expert_crew import RecipeExpertCrew
-from menu_planner.crews.shopping_crew.shopping_crew import ShoppingCrew
+# --- Crews spécialisés (chargés au premier usage, copiés depuis un gabarit) ---
+from menu_planner.crew_factory import create_crew
 
 # Initialiser le logging
 logging.basicConfig(
@@ -42,32 +62,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger("menu_planner")
 
-load_dotenv()  # Chargement des variables d'environnement
+_monitoring_initialized = False
+
+
+def init_monitoring():
+    """Initialise AgentOps au démarrage d'une exécution, si la clé API est définie."""
+    global _monitoring_initialized
+    if _monitoring_initialized or not os.getenv("AGENTOPS_API_KEY"):
+        return
+    import agentops
 
-# Initialisation du monitoring si la clé API est définie
-if os.getenv("AGENTOPS_API_KEY"):
     logger.info("Initializing AgentOps monitoring")
     agentops.init(
         api_key=os.getenv("AGENTOPS_API_KEY"),
     )
+    _monitoring_initialized = True
 
-# Créer les dossiers de sortie s'ils n'existent pas
-output_dirs = [
-    "output/menu_designer_crew",
-    "output/recipe_expert_crew",
-    "output/shopping_crew",
-    "output/html_design_crew"
+
+# Sous-dossiers de sortie, un par crew
+CREW_OUTPUT_DIRS = [
+    "menu_designer_crew",
+    "recipe_expert_crew",
+    "shopping_crew",
+    "html_design_crew"
 ]
 
-for directory in output_dirs:
-    Path(directory).mkdir(parents=True, exist_ok=True)
-    logger.debug(f"Ensured output directory exists: {directory}")
+
+def ensure_output_dirs(output_dir="output"):
+    """Crée les dossiers de sortie des crews s'ils n'existent pas."""
+    for crew_dir in CREW_OUTPUT_DIRS:
+        directory = Path(output_dir) / crew_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Ensured output directory exists: {directory}")
+
+# Dépendances entre les étapes mesurées du flow (rapport de chemin critique).
+# La page du menu ne dépend que du menu: elle est rendue pendant la génération des recettes.
+STEP_DEPENDENCIES = {
+    "generate_menu": [],
+    "generate_single_recipe": ["generate_menu"],
+    "generate_html_output": ["generate_menu"],
+    "prepare_recipe_inputs": ["generate_menu"],
+    "process_recipes": ["prepare_recipe_inputs"],
+    "track_recipe_results": ["process_recipes"],
+    "prepare_shopping_list": ["track_recipe_results"],
+}
 
 # Configuration pour le mode de génération (une recette ou menu complet)
 # Pour générer une seule recette, définir le nom ici.
 # Pour générer un menu complet, laisser vide.
 MaRecette = config.single_recipe if hasattr(config, 'single_recipe') else ""
-logger.info(f"Recipe generation mode: {'Single recipe: ' + MaRecette if MaRecette else 'Full menu'}")
 
 
 class MenuFlow(Flow[MenuState]):
@@ -83,6 +126,8 @@ class MenuFlow(Flow[MenuState]):
     """
 
     @start()
+    @checkpointed
+    @timed_step
     def generate_menu(self):
         """
         Génère le menu mensuel complet ou prépare une recette spécifique.
@@ -99,6 +144,11 @@ class MenuFlow(Flow[MenuState]):
         Returns:
             None: Met à jour self.state avec menu_json et recipe_list
         """
+        # Reprise: le menu a déjà été généré lors d'une exécution précédente
+        if "generate_menu" in self.state.completed_steps and (self.state.menu_json or self.state.recipe_name):
+            logger.info("Reprise: génération du menu déjà effectuée, étape ignorée")
+            return
+
         # Si MaRecette est définie, on saute la génération du menu complet
         if MaRecette:
             logger.info(f"Génération d'une recette unique: {MaRecette}")
@@ -126,14 +176,20 @@ class MenuFlow(Flow[MenuState]):
             "menu_json": self.state.menu_json,
             "recipe_list": self.state.recipe_list,
             "send_to": getattr(self.state, 'send_to', ''),
-            "menu_html": getattr(self.state, 'menu_html', '')
+            "menu_html": getattr(self.state, 'menu_html', ''),
+            "output_dir": self.state.output_dir,
+            
+            # Recettes connues que le menu doit reprendre (LIBRARY_REUSE)
+            "library_recipes": library_menu_input(
+                get_recipe_library(), config.library.reuse,
+                family_signature(self.state.adults, self.state.children, self.state.children_age),
+            ),
         }
         
         # Lancement du crew avec toutes les variables requises
         logger.info("Starting MenuDesignerCrew to generate weekly menu")
         try:
-            menu_designer_crew = MenuDesignerCrew()
-            menu_result = menu_designer_crew.crew().kickoff(inputs=inputs)
+            menu_result = create_crew("MenuDesignerCrew").kickoff(inputs=inputs)
             
             # Use standard CrewAI output handling pattern - direct task attribute access
             logger.debug(f"Menu result type: {type(menu_result)}")
@@ -174,7 +230,7 @@ class MenuFlow(Flow[MenuState]):
                         # Final fallback: try to extract from other MenuDesignerCrew output files
                         try:
                             import json
-                            with open("output/menu_designer_crew/liste_recettes.json", 'r') as f:
+                            with open(f"{self.state.output_dir}/menu_designer_crew/liste_recettes.json", 'r') as f:
                                 self.state.recipe_list = json.load(f)
                             logger.info("Extracted recipe_list from output file")
                         except (FileNotFoundError, json.JSONDecodeError) as e:
@@ -184,6 +240,8 @@ class MenuFlow(Flow[MenuState]):
                         
             # Log successful menu generation
             logger.info(f"Successfully generated menu with {len(self.state.recipe_list.get('recipes', []))} recipes")
+            events.emit("artifact", kind="menu_json", path=f"{self.state.output_dir}/menu_designer_crew/menu.json",
+                        output_dir=self.state.output_dir)
             
         except Exception as e:
             logger.error(f"Error in MenuDesignerCrew execution: {str(e)}")
@@ -213,6 +271,8 @@ class MenuFlow(Flow[MenuState]):
             return self.check_state
 
     @listen(route_menu_or_recipe)
+    @checkpointed
+    @timed_step
     def generate_single_recipe(self):
         """
         Génère une recette unique spécifiée par MaRecette.
@@ -225,29 +285,49 @@ class MenuFlow(Flow[MenuState]):
         """
         if MaRecette != "":
             logger.info(f"Génération de la recette unique: {self.state.recipe_name}")
-            recipe_id = self.state.recipe_name.lower().replace(" ", "_")
+            recipe_id = identity.recipe_id(self.state.recipe_name)
             
             # Préparer les chemins standardisés pour les fichiers de sortie
             inputs = {
                 "recipe_name": self.state.recipe_name,
                 "recipe_id": recipe_id,
-                "recipe_html_path": f"output/recipe_expert_crew/{recipe_id}.html",
-                "recipe_yaml_path": f"output/recipe_expert_crew/{recipe_id}.yaml",
-                "recipe_ingredients_path": f"output/recipe_expert_crew/{recipe_id}_ingredients.json",
+                "recipe_html_path": f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}.html",
+                "recipe_yaml_path": f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}.yaml",
+                "recipe_ingredients_path": f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}_ingredients.json",
+                "adults": self.state.adults,
+                "children": self.state.children,
+                "children_age": self.state.children_age,
                 "menu_json": self.state.menu_json or {},
             }
             
+            # Réutiliser la recette si elle a déjà été générée pour cette famille
+            recipe_cache = get_recipe_cache()
+            recipe_library = get_recipe_library()
+            if recipe_cache and recipe_cache.restore(inputs):
+                logger.info(f"Recette restaurée depuis le cache: {self.state.recipe_name}")
+                if recipe_library:
+                    recipe_library.ingest(inputs)
+                events.emit_recipe("recipe_completed", inputs, source="cache")
+                return
+            if recipe_library and recipe_library.restore(inputs):
+                logger.info(f"Recette restaurée depuis la bibliothèque: {self.state.recipe_name}")
+                events.emit_recipe("recipe_completed", inputs, source="library")
+                return
+            
             try:
-                # Lancer la génération de recette
-                recipe_expert_crew = RecipeExpertCrew()
-                result = recipe_expert_crew.crew().kickoff(inputs=inputs)
-                
-                # Accès aux résultats selon les conventions CrewAI
+                # Lancer la génération de recette (fichiers dérivés selon le mode)
+                result = self.generate_recipe(inputs)
                 logger.debug(f"Recipe generation result type: {type(result)}")
                 logger.info(f"Recette générée avec succès: {self.state.recipe_name}")
+                if recipe_cache:
+                    recipe_cache.store(inputs)
+                if recipe_library:
+                    recipe_library.ingest(inputs, nutrition_notes_from_output(result))
+                events.emit_recipe("recipe_completed", inputs, source="generated")
                 
             except Exception as e:
                 logger.error(f"Erreur lors de la génération de la recette {self.state.recipe_name}: {str(e)}")
+                events.emit_recipe("recipe_failed", inputs, error=str(e))
 
     @router(and_("generate_menu"))
     def check_state(self):
@@ -283,7 +363,28 @@ class MenuFlow(Flow[MenuState]):
         # Continuer vers la préparation des recettes
         return self.prepare_recipe_inputs
 
+    @router(check_state)
+    def start_menu_html(self):
+        """
+        Lance le rendu de la page du menu en arrière-plan, dès que le menu est validé.
+        
+        La page ne dépend que de `menu_json` et `recipe_list`: elle est produite
+        dans son propre thread pendant la génération des recettes, puis attendue
+        par `collect_menu_html`. Les routeurs CrewAI s'exécutent avant les
+        écouteurs de `check_state`, ce qui garantit que le rendu démarre avant
+        la chaîne des recettes.
+        
+        Returns:
+            None: Aucun chemin supplémentaire
+        """
+        if MaRecette:
+            return None
+        logger.info("Starting menu HTML rendering alongside recipe generation")
+        self.menu_html_future = run_in_background(self.generate_html_output, name="menu-html")
+        
     @listen(check_state)
+    @checkpointed
+    @timed_step
     def prepare_recipe_inputs(self):
         """
         Prépare les entrées standardisées pour le traitement des recettes.
@@ -302,7 +403,7 @@ class MenuFlow(Flow[MenuState]):
             logger.info("Menu data loaded from state")
         # Try to load from file if not in state
         else:
-            menu_file = "output/menu_designer_crew/menu.json"
+            menu_file = f"{self.state.output_dir}/menu_designer_crew/menu.json"
             if os.path.exists(menu_file):
                 try:
                     with open(menu_file, 'r', encoding='utf-8') as f:
@@ -324,19 +425,21 @@ class MenuFlow(Flow[MenuState]):
                 if meal and "title" in meal and meal["title"]:
                     all_recipes.append(meal["title"])
         
-        # Remove duplicates while preserving order
+        # Remove duplicates while preserving order: titles with the same canonical identity
+        # ("Tarte aux pommes" / "Tarte à la pomme") are the same recipe
         unique_recipes = []
         seen = set()
         for recipe in all_recipes:
-            if recipe not in seen:
-                seen.add(recipe)
+            recipe_id = identity.recipe_id(recipe)
+            if recipe_id not in seen:
+                seen.add(recipe_id)
                 unique_recipes.append(recipe)
         
         # Update recipe_list in state to match the menu
         self.state.recipe_list = {"recipes": unique_recipes}
         
         # Save the updated recipe list to file
-        with open("output/menu_designer_crew/liste_recettes.json", "w", encoding="utf-8") as f:
+        with open(f"{self.state.output_dir}/menu_designer_crew/liste_recettes.json", "w", encoding="utf-8") as f:
             json.dump({"recipes": unique_recipes}, f, ensure_ascii=False, indent=2)
         
         if not unique_recipes:
@@ -344,7 +447,24 @@ class MenuFlow(Flow[MenuState]):
             return self.route_after_recipes
             
         logger.info(f"Préparation de {len(unique_recipes)} recettes uniques à partir du menu")
-
+        recipe_inputs = self.build_recipe_inputs(unique_recipes)
+        
+        if not recipe_inputs:
+            logger.warning("No valid recipe inputs could be prepared")
+            return self.route_after_recipes
+            
+        return self.process_recipes
+        
+    def build_recipe_inputs(self, recipe_names):
+        """
+        Construit les entrées standardisées de RecipeExpertCrew pour une liste de recettes.
+        
+        Les chemins de sortie de chaque recette sont calculés et enregistrés
+        dans les listes de suivi de l'état.
+        
+        Returns:
+            list: Les entrées préparées, également stockées dans self.state.recipe_inputs
+        """
         # Initialize tracking for recipe files
         self.state.recipe_ids = []
         self.state.recipe_htmls = []
@@ -354,12 +474,12 @@ class MenuFlow(Flow[MenuState]):
         # Prepare input list for processing
         recipe_inputs = []
         
-        for recipe_name in unique_recipes:
+        for recipe_name in recipe_names:
             # Prepare standardized file paths
-            recipe_id = recipe_name.lower().replace(" ", "_").replace("'", "").replace("é", "e").replace("è", "e")
-            recipe_html_path = f"output/recipe_expert_crew/{recipe_id}.html"
-            recipe_yaml_path = f"output/recipe_expert_crew/{recipe_id}.yaml"
-            recipe_ingredients_path = f"output/recipe_expert_crew/{recipe_id}_ingredients.json"
+            recipe_id = identity.recipe_id(recipe_name)
+            recipe_html_path = f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}.html"
+            recipe_yaml_path = f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}.yaml"
+            recipe_ingredients_path = f"{self.state.output_dir}/recipe_expert_crew/{recipe_id}_ingredients.json"
             
             # Add to state tracking
             self.state.recipe_ids.append(recipe_id)
@@ -386,92 +506,160 @@ class MenuFlow(Flow[MenuState]):
         self.state.recipe_inputs = recipe_inputs
         logger.info(f"Préparé les entrées pour {len(recipe_inputs)} recettes")
         
-        if not recipe_inputs:
-            logger.warning("No valid recipe inputs could be prepared")
-            return self.route_after_recipes
-            
-        return self.process_recipes
+        return recipe_inputs
         
     @listen(prepare_recipe_inputs)
+    @checkpointed
+    @timed_step
     def process_recipes(self):
         """
-        Traite les recettes en utilisant kickoff_for_each ou en séquentiel.
+        Traite les recettes de manière concurrente, avec délai et reprises par recette.
+        
+        Lors d'une reprise, les recettes déjà terminées dont les fichiers sont
+        valides sont conservées. Les recettes présentes dans le cache ou dans
+        la bibliothèque sont ensuite restaurées sans appel au crew. Les autres sont générées en
+        parallèle (concurrence bornée); seules les recettes en échec sont relancées.
         
-        Cette méthode tente d'abord un traitement parallèle des recettes, puis
-        revient à un traitement séquentiel en cas d'échec.
+        Les ingrédients de chaque recette terminée alimentent aussitôt l'agrégat
+        de la liste de courses (voir `add_to_shopping_list`).
         
         Returns:
             Callable: La méthode suivante à exécuter dans le flux
         """
         recipe_inputs = self.state.recipe_inputs
         logger.info(f"Processing {len(recipe_inputs)} recipes")
+        self.start_shopping_aggregate(recipe_inputs)
+        
+        # Keep recipes completed by a previous (interrupted) run
+        candidate_inputs = []
+        for recipe_input in recipe_inputs:
+            if recipe_input["recipe_id"] not in self.state.completed_recipes or not recipe_artifacts_valid(recipe_input):
+                candidate_inputs.append(recipe_input)
+            else:
+                events.emit_recipe("recipe_completed", recipe_input, source="checkpoint")
+                self.add_to_shopping_list(recipe_input)
+        if len(candidate_inputs) < len(recipe_inputs):
+            logger.info(f"Resuming: {len(recipe_inputs) - len(candidate_inputs)} recipes already completed")
+        
+        # Restore cached or library recipes and only generate the remaining ones
+        recipe_cache = get_recipe_cache()
+        recipe_library = get_recipe_library()
+        pending_inputs = []
+        for recipe_input in candidate_inputs:
+            if recipe_cache and recipe_cache.restore(recipe_input):
+                if recipe_library:
+                    recipe_library.ingest(recipe_input)
+                mark_recipe_completed(self.state, recipe_input["recipe_id"])
+                events.emit_recipe("recipe_completed", recipe_input, source="cache")
+                self.add_to_shopping_list(recipe_input)
+            elif recipe_library and recipe_library.restore(recipe_input):
+                mark_recipe_completed(self.state, recipe_input["recipe_id"])
+                events.emit_recipe("recipe_completed", recipe_input, source="library")
+                self.add_to_shopping_list(recipe_input)
+            else:
+                pending_inputs.append(recipe_input)
+        if recipe_cache or recipe_library:
+            logger.info(f"Recipe cache and library: {len(candidate_inputs) - len(pending_inputs)} hits, "
+                        f"{len(pending_inputs)} recipes to generate")
         
-        # Try parallel processing first
-        parallel_successful = self.process_recipes_parallel()
+        if not pending_inputs:
+            self.state.parallel_results = ["restored"] * len(recipe_inputs)
+            self.state.processing_mode = "cache"
+            return self.route_after_recipes
+        
+        generated = self.process_recipes_concurrent(pending_inputs)
         
-        # Fall back to sequential if parallel failed
-        if not parallel_successful:
-            sequential_successful = self.process_recipes_sequential()
-            if not sequential_successful:
-                logger.error("Both parallel and sequential processing failed")
+        # Realign results with recipe_inputs (restored recipes count as successes)
+        generated_by_id = dict(zip((i["recipe_id"] for i in pending_inputs), generated))
+        self.state.parallel_results = [
+            generated_by_id[i["recipe_id"]] if i["recipe_id"] in generated_by_id else "restored"
+            for i in recipe_inputs
+        ]
+        self.state.processing_mode = "concurrent"
                 
         return self.route_after_recipes
         
-    def process_recipes_parallel(self):
-        """Process recipes in parallel using kickoff_for_each."""
-        recipe_inputs = self.state.recipe_inputs
-        try:
-            # Process recipes in parallel
-            logger.info(f"Attempting parallel processing of {len(recipe_inputs)} recipes")
-            recipe_expert_crew = RecipeExpertCrew().crew()
-            results = recipe_expert_crew.kickoff_for_each(inputs=recipe_inputs)
-            
-            # Store results for tracking step
-            self.state.parallel_results = results
-            self.state.processing_mode = "parallel"
-            logger.info(f"Completed parallel processing with {len(results)} results")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error in parallel recipe processing: {str(e)}")
-            return False
+    def process_recipes_concurrent(self, recipe_inputs):
+        """
+        Génère les recettes dans un pool de threads borné.
+        
+        Chaque recette dispose de son propre crew, d'un délai maximal et d'un
+        nombre de tentatives (voir `config.execution`). Une recette réussie est
+        immédiatement ajoutée au cache et à la bibliothèque, enregistrée
+        dans le checkpoint et ajoutée à l'agrégat de la liste de courses.
+        
+        Returns:
+            list: Résultats alignés sur recipe_inputs, None pour les échecs
+        """
+        execution = config.execution
+        recipe_cache = get_recipe_cache()
+        recipe_library = get_recipe_library()
+        logger.info(f"Generating {len(recipe_inputs)} recipes with concurrency {execution.max_concurrency}")
+        
+        def on_recipe_complete(recipe_input, result):
+            if recipe_cache:
+                recipe_cache.store(recipe_input)
+            if recipe_library:
+                recipe_library.ingest(recipe_input, nutrition_notes_from_output(result))
+            mark_recipe_completed(self.state, recipe_input["recipe_id"])
+            events.emit_recipe("recipe_completed", recipe_input, source="generated")
+            self.add_to_shopping_list(recipe_input)
+        
+        results = run_concurrently(
+            self.generate_recipe,
+            recipe_inputs,
+            max_concurrency=execution.max_concurrency,
+            timeout=execution.recipe_timeout,
+            max_retries=execution.max_retries,
+            retry_backoff=execution.retry_backoff,
+            label=lambda recipe_input: recipe_input["recipe_name"],
+            on_complete=on_recipe_complete,
+        )
+        for recipe_input, result in zip(recipe_inputs, results):
+            if result is None:
+                events.emit_recipe("recipe_failed", recipe_input)
+        failed = sum(1 for result in results if result is None)
+        logger.info(f"Completed concurrent processing: {len(results) - failed} succeeded, {failed} failed")
+        return results
     
-    def process_recipes_sequential(self):
-        """Process recipes sequentially as a fallback."""
-        recipe_inputs = self.state.recipe_inputs
-        results = []
+    @staticmethod
+    def generate_recipe(recipe_input):
+        """
+        Génère une recette avec une copie dédiée du gabarit RecipeExpertCrew.
         
+        En mode `structured`, les fichiers HTML, YAML et JSON sont dérivés de la
+        recette structurée retournée par le crew. Sinon, avec le rendu local, la
+        page HTML est produite à partir du YAML et des ingrédients générés.
+        Une sortie inexploitable fait échouer la tentative.
+        """
+        started = time.monotonic()
+        success = False
+        events.emit_recipe("recipe_started", recipe_input)
         try:
-            logger.info("Falling back to sequential processing")
-            
-            for recipe_input in recipe_inputs:
-                try:
-                    recipe_expert_crew = RecipeExpertCrew().crew()
-                    result = recipe_expert_crew.kickoff(inputs=recipe_input)
-                    results.append(result)
-                    
-                except Exception as e:
-                    logger.error(f"Error processing recipe {recipe_input['recipe_name']}: {str(e)}")
-                    results.append(None)
-            
-            # Store results for tracking step
-            self.state.parallel_results = results
-            self.state.processing_mode = "sequential"
-            logger.info(f"Completed sequential processing with {len(results)} results")
-            return len(results) > 0
-            
-        except Exception as e:
-            logger.error(f"Sequential processing also failed: {str(e)}")
-            # Ensure parallel_results exists even if processing failed
-            self.state.parallel_results = []
-            return False
+            with events.recipe_scope(recipe_input):
+                result = create_crew("RecipeExpertCrew").kickoff(inputs=recipe_input)
+            if config.recipe_mode == "structured":
+                recipe = structured_recipe_from_output(result)
+                if recipe is None:
+                    raise ValueError(f"invalid structured recipe for {recipe_input['recipe_name']}")
+                write_recipe_files(nutrition.with_computed_nutrition(recipe, recipe_input), recipe_input)
+            elif config.local_rendering and not render_recipe_file(
+                recipe_input, task_output_text(result, "nutrition_evaluation")
+            ):
+                raise ValueError(f"could not render {recipe_input['recipe_name']}")
+            success = True
+            return result
+        finally:
+            get_metrics().record_recipe(recipe_input["recipe_name"], time.monotonic() - started, success)
             
     @router(process_recipes)
+    @checkpointed
+    @timed_step
     def track_recipe_results(self):
         """
         Enregistre les résultats des recettes traitées avec succès.
         
-        Cette méthode analyse les résultats du traitement (parallèle ou séquentiel)
+        Cette méthode analyse les résultats du traitement (cache ou génération concurrente)
         et met à jour l'état avec les chemins des fichiers générés pour chaque recette.
         
         Returns:
@@ -493,6 +681,12 @@ class MenuFlow(Flow[MenuState]):
             
         successful_recipes = 0
         
+        # Only keep successfully processed recipes in the tracking arrays
+        self.state.recipe_ids = []
+        self.state.recipe_htmls = []
+        self.state.recipe_yamls = []
+        self.state.recipe_ingredients_files = []
+        
         # Track successful recipes
         for i, result in enumerate(results):
             if result is not None and i < len(recipe_inputs):  # Successfully processed
@@ -516,29 +710,86 @@ class MenuFlow(Flow[MenuState]):
     @router(track_recipe_results)
     def route_after_recipes(self):
         """
-        Route le flux vers la génération de la liste de courses et du HTML.
+        Route le flux vers la liste de courses et la récupération de la page du menu.
         
-        Cette méthode permet d'exécuter en parallèle les deux tâches finales
-        du processus: la génération de la liste de courses et la génération
-        du HTML du menu.
+        La page du menu est déjà en cours de rendu depuis `start_menu_html`;
+        seule la liste de courses dépend encore des recettes.
         
         Returns:
-            Tuple: Les méthodes à exécuter en parallèle
+            Tuple: Les méthodes finales du flux
         """
         logger.info("Routing to final output generation steps")
-        return self.prepare_shopping_list, self.generate_html_output
+        return self.prepare_shopping_list, self.collect_menu_html
+    
+    def start_shopping_aggregate(self, recipe_inputs):
+        """
+        Ouvre l'agrégat courant des ingrédients pour les recettes de l'exécution.
+        
+        L'agrégat est alimenté recette par recette pendant `process_recipes`,
+        si bien que la liste de courses n'attend pas la fin de toutes les
+        générations pour être agrégée.
+        """
+        self.shopping_aggregate = ShoppingAggregator(
+            recipe_input["recipe_ingredients_path"] for recipe_input in recipe_inputs
+        )
+        self.shopping_lock = threading.Lock()
+    
+    def add_to_shopping_list(self, recipe_input):
+        """
+        Ajoute les ingrédients d'une recette terminée à l'agrégat courant.
+        
+        Appelée depuis les threads de génération. L'agrégat partiel est écrit
+        dans `ingredients_agreges.json` et publié (événement `artifact`,
+        `partial`). À l'arrivée de la dernière recette, la liste de courses est
+        rendue immédiatement avec le rendu local, sans attendre la fin du pool.
+        """
+        aggregate = getattr(self, "shopping_aggregate", None)
+        if aggregate is None or not aggregate.add(recipe_input["recipe_ingredients_path"]):
+            return
+        try:
+            with self.shopping_lock:
+                aggregated = aggregate.ingredients()
+                done, total = aggregate.progress()
+                path = self.write_aggregated_ingredients(aggregated)
+                events.emit("artifact", kind="shopping_ingredients", path=path, output_dir=self.state.output_dir,
+                            partial=done < total, recipes=done, total=total)
+                if done == total and config.local_rendering:
+                    self.publish_shopping_list(aggregated)
+        except OSError as e:
+            logger.error(f"Could not update the shopping list with {recipe_input['recipe_name']}: {str(e)}")
+    
+    def write_aggregated_ingredients(self, aggregated):
+        """Écrit les ingrédients agrégés de l'exécution et retourne le chemin du fichier."""
+        path = f"{self.state.output_dir}/shopping_crew/ingredients_agreges.json"
+        write_output(path, json.dumps([item.model_dump() for item in aggregated], ensure_ascii=False, indent=2))
+        return path
+    
+    def publish_shopping_list(self, aggregated):
+        """Rend la liste de courses localement (HTML, Markdown, JSON) et publie ses fichiers."""
+        self.state.shopping_list_result = render_shopping_list(aggregated, self.state.output_dir)
+        logger.info(f"Shopping list rendered locally ({len(aggregated)} distinct ingredients)")
+        for kind, path in self.state.shopping_list_result.items():
+            events.emit("artifact", kind=f"shopping_list_{kind}", path=path, output_dir=self.state.output_dir)
     
     @listen(route_after_recipes)
+    @checkpointed
+    @timed_step
     def prepare_shopping_list(self):
         """
         Prépare la liste de courses en utilisant ShoppingCrew.
         
-        Cette méthode collecte toutes les recettes traitées et leurs ingrédients
-        et utilise ShoppingCrew pour générer une liste de courses organisée.
+        Cette méthode reprend l'agrégat tenu à jour pendant la génération des
+        recettes (ou agrège les fichiers d'ingrédients lors d'une reprise). Avec
+        le rendu local, la liste est déjà classée par rayon et mise en forme
+        (HTML, Markdown) dès la dernière recette; sinon ShoppingCrew s'en charge.
         
         Returns:
             None: Génère les fichiers de liste de courses spécifiés
         """
+        if "prepare_shopping_list" in self.state.completed_steps:
+            logger.info("Reprise: liste de courses déjà générée, étape ignorée")
+            return True
+        
         logger.info("Preparing shopping list from processed recipes")
         
         try:
@@ -546,9 +797,29 @@ class MenuFlow(Flow[MenuState]):
             if not hasattr(self.state, 'recipe_ids') or not self.state.recipe_ids:
                 logger.warning("No recipe IDs available for shopping list generation")
                 return
+            
+            # Liste déjà rendue à l'arrivée de la dernière recette
+            if config.local_rendering and self.state.shopping_list_result:
+                logger.info("Shopping list already rendered while recipes completed")
+                return True
+            
+            # Agrégat courant s'il couvre exactement les recettes réussies, sinon agrégation complète (reprise)
+            aggregate = getattr(self, "shopping_aggregate", None)
+            if aggregate is not None and aggregate.covers(self.state.recipe_ingredients_files):
+                aggregated = aggregate.ingredients()
+            else:
+                aggregated = aggregate_ingredient_files(self.state.recipe_ingredients_files)
+            self.write_aggregated_ingredients(aggregated)
+            aggregated_json = json.dumps([item.model_dump() for item in aggregated], ensure_ascii=False, indent=2)
+            logger.info(f"Aggregated {len(aggregated)} distinct ingredients")
+            
+            if config.local_rendering:
+                self.publish_shopping_list(aggregated)
+                return True
                 
             # Préparation des inputs pour ShoppingCrew
             inputs = {
+                "aggregated_ingredients": aggregated_json,
                 "recipe_list": self.state.recipe_list.model_dump() if hasattr(self.state.recipe_list, 'model_dump') else self.state.recipe_list,
                 "adults": self.state.adults,
                 "children": self.state.children,
@@ -556,17 +827,19 @@ class MenuFlow(Flow[MenuState]):
                 "recipe_ids": self.state.recipe_ids,
                 "recipe_htmls": self.state.recipe_htmls,
                 "recipe_yamls": self.state.recipe_yamls,
-                "recipe_ingredients_files": self.state.recipe_ingredients_files
+                "recipe_ingredients_files": self.state.recipe_ingredients_files,
+                "output_dir": self.state.output_dir,
             }
             
             # Lancement de ShoppingCrew
             logger.info(f"Starting ShoppingCrew with {len(self.state.recipe_ids)} recipes")
-            shopping_crew = ShoppingCrew()
-            result = shopping_crew.crew().kickoff(inputs=inputs)
+            result = create_crew("ShoppingCrew").kickoff(inputs=inputs)
             
             # Store result in state but don't return CrewOutput directly
             self.state.shopping_list_result = result
             logger.info("Shopping list generation complete")
+            events.emit("artifact", kind="shopping_list_html", path=f"{self.state.output_dir}/shopping_crew/liste_courses.html",
+                        output_dir=self.state.output_dir)
             return True
             
         except Exception as e:
@@ -574,16 +847,91 @@ class MenuFlow(Flow[MenuState]):
             return False
             
     @listen(route_after_recipes)
+    def collect_menu_html(self):
+        """
+        Attend la page du menu lancée par `start_menu_html`.
+        
+        Sans rendu en cours (étape appelée isolément), la page est produite ici.
+        
+        Returns:
+            bool: False si la génération de la page a échoué
+        """
+        future = getattr(self, "menu_html_future", None)
+        if future is None:
+            html_ok = self.generate_html_output()
+        else:
+            try:
+                html_ok = future.result()
+            except Exception as e:
+                logger.error(f"Menu HTML rendering failed: {str(e)}")
+                html_ok = False
+        if config.nutrition.enabled:
+            self.compute_menu_nutrition()
+        return html_ok
+    
+    def compute_menu_nutrition(self):
+        """
+        Calcule localement la nutrition du menu à partir des ingrédients des recettes générées.
+        
+        Le détail par recette, repas, jour et semaine est écrit dans
+        `menu_designer_crew/nutrition.json`. Les calories calculées remplacent
+        les estimations du menu (`menu.json`), et la page du menu est rendue à
+        nouveau avec le rendu local.
+        
+        Returns:
+            bool: True si au moins un repas a été calculé
+        """
+        completed = set(self.state.recipe_ids or [])
+        recipe_inputs = [recipe_input for recipe_input in self.state.recipe_inputs or []
+                         if recipe_input["recipe_id"] in completed]
+        menu_dir = f"{self.state.output_dir}/menu_designer_crew"
+        try:
+            menu_data = self.state.menu_json
+            if not menu_data:
+                with open(f"{menu_dir}/menu.json", "r", encoding="utf-8") as f:
+                    menu_data = f.read()
+            report = nutrition.compute_menu(menu_data, nutrition.load_recipes(recipe_inputs))
+            write_output(f"{menu_dir}/nutrition.json", json.dumps(report, ensure_ascii=False, indent=2))
+            events.emit("artifact", kind="nutrition", path=f"{menu_dir}/nutrition.json",
+                        output_dir=self.state.output_dir)
+            week = report["week"]
+            logger.info(f"Nutrition computed locally for {week['meals_computed']}/{week['meals']} meals: "
+                        f"{week['kcal']:.0f} kcal per person for the week")
+            if not week["meals_computed"]:
+                return False
+            
+            menu_data = nutrition.apply_calories(menu_data, report)
+            self.state.menu_json = menu_data
+            write_output(f"{menu_dir}/menu.json", json.dumps(menu_data, ensure_ascii=False, indent=2))
+            if config.local_rendering:
+                write_output(f"{menu_dir}/menu.html", render_menu_html(
+                    menu_data, self.state.adults, self.state.children, self.state.children_age
+                ))
+                events.emit("artifact", kind="menu_html", path=f"{menu_dir}/menu.html",
+                            output_dir=self.state.output_dir)
+            return True
+        except Exception as e:
+            logger.error(f"Error in nutrition computation: {str(e)}")
+            return False
+        
+    @checkpointed
+    @timed_step
     def generate_html_output(self):
         """
-        Génère le HTML du menu en utilisant HtmlDesignCrew.
+        Génère le HTML du menu, une seule fois par exécution.
         
-        Cette méthode collecte les informations du menu et des recettes
-        et utilise HtmlDesignCrew pour générer une présentation HTML complète.
+        Cette méthode produit la page `menu_designer_crew/menu.html` à partir du
+        menu, localement à partir du template ou via HtmlDesignCrew si le rendu
+        local est désactivé. Elle s'exécute dans un thread dédié, en parallèle
+        des recettes (voir `start_menu_html`).
         
         Returns:
-            None: Génère les fichiers HTML spécifiés
+            bool: True si la page est disponible, False en cas d'échec
         """
+        if "generate_html_output" in self.state.completed_steps:
+            logger.info("Reprise: HTML du menu déjà généré, étape ignorée")
+            return True
+        
         logger.info("Generating HTML output for menu")
         
         # Initialize tracking arrays if they don't exist yet
@@ -597,34 +945,105 @@ class MenuFlow(Flow[MenuState]):
             self.state.recipe_ingredients_files = []
         
         try:
+            if config.local_rendering:
+                menu_data = self.state.menu_json
+                if not menu_data:
+                    with open(f"{self.state.output_dir}/menu_designer_crew/menu.json", "r", encoding="utf-8") as f:
+                        menu_data = f.read()
+                html_path = f"{self.state.output_dir}/menu_designer_crew/menu.html"
+                write_output(html_path, render_menu_html(
+                    menu_data, self.state.adults, self.state.children, self.state.children_age
+                ))
+                self.state.html_result = html_path
+                logger.info(f"Menu HTML rendered locally to {html_path}")
+                events.emit("artifact", kind="menu_html", path=html_path, output_dir=self.state.output_dir)
+                return True
+            
             # Préparation des inputs pour HtmlDesignCrew
             inputs = {
                 "menu_json": self.state.menu_json,
                 "recipe_list": self.state.recipe_list,
-                "html_output_path": "output/html_design_crew/menu.html",
+                "html_output_path": f"{self.state.output_dir}/html_design_crew/menu.html",
                 "adults": self.state.adults,
                 "children": self.state.children,
                 "children_age": self.state.children_age,
-                "send_to": getattr(self.state, 'send_to', config.family.email)
+                "send_to": getattr(self.state, 'send_to', config.family.email),
+                "output_dir": self.state.output_dir,
             }
             
             # Lancement de HtmlDesignCrew
             logger.info("Starting HtmlDesignCrew to generate HTML presentation")
-            html_design_crew = HtmlDesignCrew()
-            result = html_design_crew.crew().kickoff(inputs=inputs)
+            result = create_crew("HtmlDesignCrew").kickoff(inputs=inputs)
             
             # Store result in state but don't return CrewOutput directly
             self.state.html_result = result
             logger.info("HTML generation complete")
+            events.emit("artifact", kind="menu_html", path=f"{self.state.output_dir}/menu_designer_crew/menu.html",
+                        output_dir=self.state.output_dir)
             return True
             
         except Exception as e:
             logger.error(f"Error in HTML generation: {str(e)}")
             return False
 
+def run_flow(menu_flow):
+    """
+    Exécute le flow en collectant et exportant les mesures de l'exécution.
+
+    Les dossiers de sortie, le monitoring et le flux d'événements sont
+    préparés ici, au lancement, et non à l'import du module.
+    """
+    logger.info(f"Recipe generation mode: {'Single recipe: ' + MaRecette if MaRecette else 'Full menu'}")
+    ensure_output_dirs(menu_flow.state.output_dir)
+    init_monitoring()
+    metrics = reset_metrics()
+    metrics.step_dependencies = STEP_DEPENDENCIES
+    install_hooks()
+    memory.begin_run()
+    events.start_event_stream(metrics.run_id, menu_flow.state.output_dir)
+    events.emit("run_started", mode="single_recipe" if MaRecette else "menu", output_dir=menu_flow.state.output_dir)
+    success = False
+    try:
+        menu_flow.kickoff()
+        success = True
+    finally:
+        events.emit("run_finished", success=success, seconds=round(time.time() - metrics.started_at, 3))
+        events.stop_event_stream()
+        memory.end_run()
+        report = metrics.critical_path()
+        if report and report["path"]:
+            logger.info(format_critical_path(report))
+        try:
+            get_metrics().export()
+        except OSError as e:
+            logger.error(f"Could not export run metrics: {str(e)}")
+
+
 def kickoff():
+    # Nouvelle exécution: l'ancien checkpoint ne doit pas être repris
+    menu_flow = MenuFlow()
+    clear_checkpoint(checkpoint_path(menu_flow.state.output_dir))
+    run_flow(menu_flow)
+
+
+def resume():
+    """
+    Reprend la dernière exécution interrompue à partir de son checkpoint.
+
+    L'état sauvegardé est rechargé dans un nouveau MenuFlow: les étapes déjà
+    terminées sont ignorées et seules les recettes manquantes ou invalides
+    sont générées.
+    """
     menu_flow = MenuFlow()
-    menu_flow.kickoff()
+    checkpoint = load_checkpoint(checkpoint_path(menu_flow.state.output_dir))
+    if checkpoint is None:
+        logger.warning("No checkpoint found, starting a new run")
+        return kickoff()
+
+    restore_state(menu_flow.state, checkpoint)
+    logger.info(f"Resuming run: steps completed {checkpoint.get('completed_steps', [])}, "
+                f"{len(checkpoint.get('completed_recipes', []))} recipes completed")
+    run_flow(menu_flow)
 
 
 def plot():
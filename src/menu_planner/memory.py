@@ -0,0 +1,352 @@
+"""
+Memory - Mémoire d'agents partagée et bornée pour RecipeExpertCrew
+
+Avec `memory=True`, CrewAI crée pour chaque crew sa propre mémoire : une base
+Chroma sur disque pour la mémoire court terme et une pour les entités (un
+client et une collection par crew), plus une base SQLite long terme. Avec une
+copie de crew par recette, et par famille en mode batch, ces mémoires ne sont
+jamais partagées, ni bornées, ni nettoyées.
+
+Ce module fournit, selon `config.memory.backend` :
+- `shared` : une mémoire unique pour tout le processus, branchée sur chaque
+  copie de RecipeExpertCrew (`attach`). Les entrées (court terme, entités,
+  long terme) sont gardées en mémoire vive, limitées en nombre (les moins
+  récemment utilisées sont évincées) et en durée de vie ; la recherche compare
+  les embeddings par similarité cosinus
+- `crewai` : le comportement d'origine de CrewAI (une mémoire sur disque par crew)
+- `off` : aucune mémoire, donc aucun appel d'embedding
+
+Les appels d'embedding (nombre, textes, durée) et la croissance du dossier de
+stockage CrewAI pendant l'exécution sont reportés dans les mesures de l'exécution.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from menu_planner.config import config
+from menu_planner.metrics import get_metrics
+
+logger = logging.getLogger("menu_planner.memory")
+
+MEMORY_BACKENDS = ("shared", "crewai", "off")
+
+
+class MemoryConfigurationError(RuntimeError):
+    """Embedder de la mémoire partagée impossible à construire."""
+
+
+def _embedder_factory() -> Optional[Callable[[dict], Any]]:
+    """`build_embedder` des versions de CrewAI qui le fournissent, None pour les versions 0.1xx."""
+    try:
+        from crewai.rag.embeddings.factory import build_embedder
+    except ImportError:
+        return None
+    return build_embedder
+
+
+def embedder_config() -> dict:
+    """Configuration d'embedder au format de la version de CrewAI installée (`provider` et modèle)."""
+    settings = config.memory
+    if _embedder_factory() is None:
+        return {"provider": settings.embedder_provider, "config": {"model": settings.embedder_model}}
+    embedder = {"model_name": settings.embedder_model}
+    # Les anciennes versions lisaient OPENAI_API_KEY d'elles-mêmes, build_embedder attend la clé
+    if settings.embedder_provider == "openai" and os.getenv("OPENAI_API_KEY"):
+        embedder["api_key"] = os.getenv("OPENAI_API_KEY")
+    return {"provider": settings.embedder_provider, "config": embedder}
+
+
+def build_embedding_function() -> Callable[[List[str]], List[Any]]:
+    """
+    Fonction d'embedding configurée (`config.memory.embedder_*`).
+
+    Returns:
+        Callable[[List[str]], List[Any]]: Textes -> un vecteur par texte
+
+    Raises:
+        MemoryConfigurationError: Si l'embedder ne peut pas être construit
+    """
+    build_embedder = _embedder_factory()
+    try:
+        if build_embedder is not None:
+            return build_embedder(embedder_config())
+        from crewai.utilities import EmbeddingConfigurator
+
+        return EmbeddingConfigurator().configure_embedder(embedder_config())
+    except Exception as e:
+        raise MemoryConfigurationError(
+            f"Could not build the {config.memory.embedder_provider} embedder "
+            f"({config.memory.embedder_model}): {str(e)}"
+        ) from e
+
+
+class MemoryStore:
+    """
+    Entrées de mémoire partagées par tous les crews du processus, bornées en nombre et en âge.
+
+    Attributs:
+        max_entries: Nombre maximal d'entrées, toutes catégories confondues
+        ttl: Durée de vie d'une entrée en secondes (0 pour aucune limite)
+    """
+
+    def __init__(self, max_entries: int = 500, ttl: int = 3600,
+                 embed: Optional[Callable[[List[str]], List[Any]]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._embed = embed
+        self._lock = threading.Lock()
+        # id -> {"kind", "text", "metadata", "vector", "created"}, du moins au plus récemment utilisé
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _embedding_function(self) -> Callable[[List[str]], List[Any]]:
+        if self._embed is None:
+            self._embed = build_embedding_function()
+        return self._embed
+
+    def embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embeddings normalisés des textes, mesurés dans les métriques de l'exécution.
+
+        Returns:
+            Optional[np.ndarray]: Une ligne par texte, None si l'appel a échoué
+        """
+        started = time.monotonic()
+        try:
+            vectors = np.asarray(self._embedding_function()(texts), dtype=np.float32)
+        except Exception as e:
+            get_metrics().record_embedding(len(texts), time.monotonic() - started, success=False)
+            logger.error(f"Memory embedding failed: {str(e)}")
+            return None
+        get_metrics().record_embedding(len(texts), time.monotonic() - started)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    def _expire(self, now: float) -> None:
+        """Retire les entrées trop anciennes (verrou tenu par l'appelant)."""
+        if not self.ttl:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry["created"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def _insert(self, entry: dict) -> None:
+        with self._lock:
+            self._expire(entry["created"])
+            self._entries[uuid.uuid4().hex] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def save(self, kind: str, text: str, metadata: Optional[dict] = None) -> None:
+        """Ajoute un texte (mémoire court terme ou entité) avec son embedding."""
+        vectors = self.embed([text])
+        if vectors is None:
+            return
+        self._insert({"kind": kind, "text": text, "metadata": metadata or {}, "vector": vectors[0],
+                      "created": time.time()})
+
+    def search(self, kind: str, query: str, limit: int = 3, score_threshold: float = 0.35) -> List[dict]:
+        """
+        Entrées les plus proches de la requête, au format des résultats CrewAI.
+
+        Returns:
+            List[dict]: `id`, `metadata`, `context` et `score` (similarité cosinus), du plus proche au moins proche
+        """
+        with self._lock:
+            self._expire(time.time())
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry["kind"] == kind]
+        if not candidates:
+            return []
+        vectors = self.embed([query])
+        if vectors is None:
+            return []
+        scores = np.stack([entry["vector"] for _, entry in candidates]) @ vectors[0]
+        results = []
+        with self._lock:
+            for index in np.argsort(-scores)[:limit]:
+                key, entry = candidates[index]
+                if scores[index] < score_threshold:
+                    break
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                results.append({"id": key, "metadata": entry["metadata"], "context": entry["text"],
+                                "score": float(scores[index])})
+        return results
+
+    def save_task(self, task_description: str, metadata: dict, datetime: str, score: float) -> None:
+        """Ajoute une évaluation de tâche (mémoire long terme, sans embedding)."""
+        self._insert({"kind": "long_term", "text": task_description, "metadata": metadata, "vector": None,
+                      "created": time.time(), "datetime": datetime, "score": score})
+
+    def load_tasks(self, task_description: str, latest_n: int) -> Optional[List[dict]]:
+        """Dernières évaluations de la même tâche, au format de `LTMSQLiteStorage.load`."""
+        with self._lock:
+            self._expire(time.time())
+            matches = [entry for entry in self._entries.values()
+                       if entry["kind"] == "long_term" and entry["text"] == task_description]
+        matches.sort(key=lambda entry: entry["datetime"], reverse=True)
+        return [{"metadata": entry["metadata"], "datetime": entry["datetime"], "score": entry["score"]}
+                for entry in matches[:latest_n]] or None
+
+    def reset(self, kind: Optional[str] = None) -> None:
+        """Vide une catégorie d'entrées, ou toute la mémoire."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if kind is None or entry["kind"] == kind]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre d'entrées par catégorie, évictions et expirations."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for entry in self._entries.values():
+                counts[entry["kind"]] = counts.get(entry["kind"], 0) + 1
+            return {"entries": len(self._entries), **{f"{kind}_entries": n for kind, n in counts.items()},
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+
+class SharedRAGStorage:
+    """Stockage court terme ou entités de CrewAI (`save`/`search`/`reset`) adossé au `MemoryStore`."""
+
+    def __init__(self, store: MemoryStore, kind: str):
+        self.store = store
+        self.type = kind
+
+    def save(self, value: Any, metadata: Dict[str, Any]) -> None:
+        self.store.save(self.type, str(value), metadata)
+
+    def search(self, query: str, limit: int = 3, filter: Optional[dict] = None,
+               score_threshold: float = 0.35) -> List[Any]:
+        return self.store.search(self.type, query, limit, score_threshold)
+
+    def reset(self) -> None:
+        self.store.reset(self.type)
+
+
+class SharedLTMStorage:
+    """Stockage long terme de CrewAI (`save`/`load`/`reset`) adossé au `MemoryStore`."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def save(self, task_description: str, metadata: Dict[str, Any], datetime: str, score: float) -> None:
+        self.store.save_task(task_description, metadata, datetime, score)
+
+    def load(self, task_description: str, latest_n: int) -> Optional[List[Dict[str, Any]]]:
+        return self.store.load_tasks(task_description, latest_n)
+
+    def reset(self) -> None:
+        self.store.reset("long_term")
+
+
+_store: Optional[MemoryStore] = None
+_memories: Optional[tuple] = None
+_store_lock = threading.Lock()
+_storage_baseline: Optional[int] = None
+
+
+def get_memory_store() -> Optional[MemoryStore]:
+    """
+    Mémoire partagée du processus, créée au premier appel.
+
+    Returns:
+        Optional[MemoryStore]: None si le backend n'est pas `shared`
+    """
+    global _store
+    if config.memory.backend != "shared":
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MemoryStore(config.memory.max_entries, config.memory.ttl)
+    return _store
+
+
+def _shared_memories() -> tuple:
+    """Objets mémoire CrewAI (court terme, long terme, entités) partagés par toutes les copies."""
+    global _memories
+    if _memories is None:
+        from crewai.memory import EntityMemory, LongTermMemory, ShortTermMemory
+
+        store = get_memory_store()
+        with _store_lock:
+            if _memories is None:
+                _memories = (ShortTermMemory(storage=SharedRAGStorage(store, "short_term")),
+                             LongTermMemory(storage=SharedLTMStorage(store)),
+                             EntityMemory(storage=SharedRAGStorage(store, "entities")))
+    return _memories
+
+
+def attach(crew):
+    """
+    Branche la mémoire partagée sur une copie de crew construite sans mémoire.
+
+    Sans effet si le backend n'est pas `shared`.
+
+    Returns:
+        Crew: Le crew, modifié sur place
+    """
+    if config.memory.backend != "shared":
+        return crew
+    short_term, long_term, entities = _shared_memories()
+    crew.memory = True
+    crew._short_term_memory = short_term
+    crew._long_term_memory = long_term
+    crew._entity_memory = entities
+    return crew
+
+
+def crewai_storage_dir() -> Optional[Path]:
+    """Dossier de stockage de la mémoire CrewAI (`CREWAI_STORAGE_DIR`), None si CrewAI est absent."""
+    try:
+        from crewai.utilities.paths import db_storage_path
+    except ImportError:
+        return None
+    return Path(db_storage_path())
+
+
+def storage_bytes() -> int:
+    """Taille sur disque de la mémoire CrewAI (0 pour les backends `shared` et `off`)."""
+    if config.memory.backend != "crewai":
+        return 0
+    directory = crewai_storage_dir()
+    if directory is None or not directory.exists():
+        return 0
+    return sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+
+
+def begin_run() -> None:
+    """
+    Prépare la mémoire d'une exécution et mémorise la taille du stockage.
+
+    Si l'embedder de la mémoire partagée ne peut pas être construit, la
+    mémoire est désactivée (backend `off`) au lieu d'échouer à chaque sauvegarde.
+    """
+    global _storage_baseline
+    if config.memory.backend not in MEMORY_BACKENDS:
+        logger.warning(f"Unknown memory backend {config.memory.backend!r}, agent memory disabled")
+    elif config.memory.backend == "shared":
+        try:
+            get_memory_store()._embedding_function()
+        except MemoryConfigurationError as e:
+            logger.error(f"{str(e).rstrip('.')}; agent memory disabled for this run (RECIPE_MEMORY_BACKEND=off)")
+            config.memory.backend = "off"
+    _storage_baseline = storage_bytes()
+
+
+def end_run() -> None:
+    """Reporte la croissance du stockage et l'état de la mémoire partagée dans les mesures."""
+    size = storage_bytes()
+    baseline = _storage_baseline if _storage_baseline is not None else size
+    store = get_memory_store() if _store is not None else None
+    get_metrics().record_memory(config.memory.backend, size - baseline, size, store.stats() if store else {})
@@ -0,0 +1,496 @@
+"""
+Metrics - Mesures de temps, d'appels LLM et d'outils pour une exécution de MenuFlow
+
+Ce module collecte, pour chaque exécution :
+- la durée de chaque étape du flow (`generate_menu`, `process_recipes`...) et
+  le chemin critique de l'exécution : la chaîne d'étapes dépendantes qui fixe
+  sa durée, les autres étapes s'étant déroulées en parallèle
+- la durée de chaque génération de recette et de chaque tâche CrewAI
+- le nombre d'appels LLM et les tokens d'entrée (dont ceux servis par le cache
+  de préfixe du fournisseur) / de sortie, par modèle
+- le nombre d'appels, d'erreurs et la latence des outils (`search_internet`, `ScrapeNinja`)
+- le coût de la mémoire des agents : appels d'embedding et croissance du stockage sur disque
+
+Les mesures sont exportées à la fin de l'exécution en une ligne JSON
+(`runs.jsonl`, historique) et en fichier texte Prometheus (`menu_planner.prom`,
+pour le textfile collector de node_exporter).
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from menu_planner import events
+from menu_planner.config import config
+
+logger = logging.getLogger("menu_planner.metrics")
+
+
+class _Timing:
+    """Agrégat simple de durées: nombre, somme et maximum."""
+
+    __slots__ = ("count", "errors", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float, success: bool = True) -> None:
+        self.count += 1
+        self.errors += 0 if success else 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "errors": self.errors, "total_seconds": round(self.total, 3),
+                "max_seconds": round(self.max, 3)}
+
+
+class RunMetrics:
+    """
+    Mesures d'une exécution, alimentées depuis plusieurs threads.
+
+    Attributs:
+        run_id: Identifiant unique de l'exécution
+        started_at: Horodatage (epoch) du début de l'exécution
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.steps: Dict[str, _Timing] = {}
+        self.step_spans: list = []
+        # Étapes dont dépend chaque étape mesurée (graphe du flow), pour `critical_path`
+        self.step_dependencies: Dict[str, list] = {}
+        self.recipes: Dict[str, _Timing] = {}
+        self.tasks: Dict[str, _Timing] = {}
+        self.tools: Dict[str, _Timing] = {}
+        # Sorties de tâches acceptées ou rejetées par leur garde-fou (voir menu_planner.validation)
+        self.validations: Dict[str, dict] = {}
+        # Appels passés par chaque limiteur de débit (voir menu_planner.ratelimit)
+        self.rate_limits: Dict[str, dict] = {}
+        # Pages réduites par l'extraction locale, par source (voir menu_planner.tools.recipe_extractor)
+        self.extractions: Dict[str, dict] = {}
+        # Appels d'outils servis de mémoire, partagés ou lancés (voir menu_planner.tools.singleflight)
+        self.tool_cache: Dict[str, dict] = {}
+        self.llm: Dict[str, dict] = {}
+        self.memory: dict = {"backend": None, "embedding_calls": 0, "embedding_errors": 0, "embedded_texts": 0,
+                             "embedding_seconds": 0.0, "disk_bytes": 0, "disk_growth_bytes": 0, "store": {}}
+
+    def record_step(self, step: str, started: float, ended: float, success: bool = True) -> None:
+        with self._lock:
+            self.steps.setdefault(step, _Timing()).add(ended - started, success)
+            self.step_spans.append({"step": step, "start": started - self.started_at,
+                                    "end": ended - self.started_at})
+
+    def record_recipe(self, recipe: str, seconds: float, success: bool = True) -> None:
+        with self._lock:
+            self.recipes.setdefault(recipe, _Timing()).add(seconds, success)
+
+    def record_task(self, task: str, seconds: float, success: bool = True) -> None:
+        with self._lock:
+            self.tasks.setdefault(task, _Timing()).add(seconds, success)
+
+    def record_tool(self, tool: str, seconds: float, success: bool = True) -> None:
+        with self._lock:
+            self.tools.setdefault(tool, _Timing()).add(seconds, success)
+
+    def record_validation(self, task: str, success: bool = True) -> None:
+        with self._lock:
+            stats = self.validations.setdefault(task, {"passed": 0, "rejected": 0})
+            stats["passed" if success else "rejected"] += 1
+
+    def record_rate_limit(self, limiter: str, waited: float, throttled: bool, concurrency_limit: float) -> None:
+        with self._lock:
+            stats = self.rate_limits.setdefault(limiter, {"calls": 0, "throttled": 0, "wait_seconds": 0.0,
+                                                          "max_wait_seconds": 0.0, "concurrency_limit": 0.0})
+            stats["calls"] += 1
+            stats["throttled"] += 1 if throttled else 0
+            stats["wait_seconds"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+            stats["concurrency_limit"] = concurrency_limit
+
+    def record_extraction(self, source: str, input_chars: int, output_chars: int) -> None:
+        with self._lock:
+            stats = self.extractions.setdefault(source, {"pages": 0, "input_chars": 0, "output_chars": 0})
+            stats["pages"] += 1
+            stats["input_chars"] += input_chars
+            stats["output_chars"] += output_chars
+
+    def record_tool_cache(self, tool: str, outcome: str) -> None:
+        with self._lock:
+            stats = self.tool_cache.setdefault(tool, {"hits": 0, "misses": 0, "coalesced": 0})
+            stats[{"hit": "hits", "miss": "misses"}.get(outcome, outcome)] += 1
+
+    def record_llm_call(self, model: str, prompt_tokens: int, completion_tokens: int,
+                        seconds: float, success: bool = True, cached_tokens: int = 0) -> None:
+        with self._lock:
+            stats = self.llm.setdefault(model, {"calls": 0, "errors": 0, "prompt_tokens": 0, "cached_tokens": 0,
+                                                "completion_tokens": 0, "total_seconds": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += 0 if success else 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["cached_tokens"] += cached_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["total_seconds"] += seconds
+
+    def critical_path(self) -> Optional[dict]:
+        """Chemin critique de l'exécution, None sans graphe des étapes."""
+        if not self.step_dependencies:
+            return None
+        with self._lock:
+            spans = list(self.step_spans)
+        return critical_path(spans, self.step_dependencies)
+
+    def record_embedding(self, texts: int, seconds: float, success: bool = True) -> None:
+        with self._lock:
+            self.memory["embedding_calls"] += 1
+            self.memory["embedding_errors"] += 0 if success else 1
+            self.memory["embedded_texts"] += texts
+            self.memory["embedding_seconds"] += seconds
+
+    def record_memory(self, backend: str, disk_growth_bytes: int, disk_bytes: int, store: dict) -> None:
+        with self._lock:
+            self.memory.update(backend=backend, disk_growth_bytes=disk_growth_bytes, disk_bytes=disk_bytes,
+                               store=dict(store))
+
+    def to_dict(self) -> dict:
+        """Représentation JSON des mesures de l'exécution."""
+        path = self.critical_path()
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "steps": {name: t.to_dict() for name, t in self.steps.items()},
+                "step_spans": list(self.step_spans),
+                "critical_path": path,
+                "recipes": {name: t.to_dict() for name, t in self.recipes.items()},
+                "tasks": {name: t.to_dict() for name, t in self.tasks.items()},
+                "tools": {name: t.to_dict() for name, t in self.tools.items()},
+                "validations": {name: dict(stats) for name, stats in self.validations.items()},
+                "rate_limits": {name: dict(stats, wait_seconds=round(stats["wait_seconds"], 3),
+                                           max_wait_seconds=round(stats["max_wait_seconds"], 3),
+                                           concurrency_limit=round(stats["concurrency_limit"], 2))
+                                for name, stats in self.rate_limits.items()},
+                "tool_cache": {name: dict(stats) for name, stats in self.tool_cache.items()},
+                "extractions": {source: dict(stats, reduction=round(stats["input_chars"]
+                                                                    / max(stats["output_chars"], 1), 1))
+                                for source, stats in self.extractions.items()},
+                "llm": {model: dict(stats, total_seconds=round(stats["total_seconds"], 3),
+                                    cache_hit_ratio=round(stats["cached_tokens"] / max(stats["prompt_tokens"], 1), 3))
+                        for model, stats in self.llm.items()},
+                "memory": dict(self.memory, embedding_seconds=round(self.memory["embedding_seconds"], 3)),
+            }
+
+    def to_prometheus(self) -> str:
+        """Mesures au format texte Prometheus (valeurs de la dernière exécution)."""
+        data = self.to_dict()
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP menu_planner_{name} {help_text}")
+            lines.append(f"# TYPE menu_planner_{name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"menu_planner_{name}{{{label_text}}} {value}" if label_text
+                             else f"menu_planner_{name} {value}")
+
+        metric("run_duration_seconds", "Wall time of the last run.", [({}, data["duration_seconds"])])
+        metric("run_timestamp_seconds", "Start time of the last run.", [({}, data["started_at"])])
+        metric("step_duration_seconds", "Wall time of each flow step.",
+               [({"step": k}, v["total_seconds"]) for k, v in data["steps"].items()])
+        if data["critical_path"]:
+            metric("critical_path_seconds", "Duration of the chain of dependent steps that set the run time.",
+                   [({}, data["critical_path"]["seconds"])])
+            metric("parallel_saving_seconds", "Step time hidden by running independent steps concurrently.",
+                   [({}, data["critical_path"]["parallel_saving_seconds"])])
+        metric("recipe_duration_seconds", "Time spent generating each recipe (all attempts).",
+               [({"recipe": k}, v["total_seconds"]) for k, v in data["recipes"].items()])
+        metric("recipe_attempts", "Generation attempts per recipe.",
+               [({"recipe": k}, v["count"]) for k, v in data["recipes"].items()])
+        metric("task_duration_seconds_sum", "Cumulated execution time per CrewAI task.",
+               [({"task": k}, v["total_seconds"]) for k, v in data["tasks"].items()])
+        metric("task_executions", "Executions per CrewAI task.",
+               [({"task": k}, v["count"]) for k, v in data["tasks"].items()])
+        metric("task_output_rejections", "Task outputs rejected by validation, each one re-running the task.",
+               [({"task": k}, v["rejected"]) for k, v in data["validations"].items()])
+        metric("llm_calls", "LLM calls per model.",
+               [({"model": k}, v["calls"]) for k, v in data["llm"].items()])
+        metric("llm_tokens", "LLM tokens per model and kind.",
+               [({"model": k, "kind": kind}, v[f"{kind}_tokens"])
+                for k, v in data["llm"].items() for kind in ("prompt", "cached", "completion")])
+        metric("llm_cache_hit_ratio", "Share of prompt tokens served from the provider prefix cache.",
+               [({"model": k}, v["cache_hit_ratio"]) for k, v in data["llm"].items()])
+        metric("memory_embedding_calls", "Embedding calls made by the agent memory.",
+               [({}, data["memory"]["embedding_calls"])])
+        metric("memory_embedding_seconds_sum", "Cumulated latency of the agent memory embedding calls.",
+               [({}, data["memory"]["embedding_seconds"])])
+        metric("memory_disk_growth_bytes", "Growth of the on-disk agent memory during the run.",
+               [({}, data["memory"]["disk_growth_bytes"])])
+        metric("rate_limit_wait_seconds_sum", "Time calls spent waiting for their rate limiter.",
+               [({"limiter": k}, v["wait_seconds"]) for k, v in data["rate_limits"].items()])
+        metric("rate_limit_throttled", "Calls rejected by the provider with a rate-limit error.",
+               [({"limiter": k}, v["throttled"]) for k, v in data["rate_limits"].items()])
+        metric("rate_limit_concurrency", "Adaptive concurrency limit at the end of the run.",
+               [({"limiter": k}, v["concurrency_limit"]) for k, v in data["rate_limits"].items()])
+        metric("tool_cache_requests", "Tool requests answered from memory, joined to an identical call or sent.",
+               [({"tool": k, "outcome": outcome}, v[outcome])
+                for k, v in data["tool_cache"].items() for outcome in ("hits", "misses", "coalesced")])
+        metric("scrape_input_chars", "Characters of the scraped pages before local extraction.",
+               [({"source": k}, v["input_chars"]) for k, v in data["extractions"].items()])
+        metric("scrape_output_chars", "Characters of the extracted results given to the agents.",
+               [({"source": k}, v["output_chars"]) for k, v in data["extractions"].items()])
+        metric("tool_calls", "Tool calls per tool and status.",
+               [({"tool": k, "status": status}, v["errors"] if status == "error" else v["count"] - v["errors"])
+                for k, v in data["tools"].items() for status in ("ok", "error")])
+        metric("tool_duration_seconds_sum", "Cumulated latency per tool.",
+               [({"tool": k}, v["total_seconds"]) for k, v in data["tools"].items()])
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Optional[Path] = None) -> None:
+        """Ajoute l'exécution à `runs.jsonl` et réécrit le fichier Prometheus."""
+        directory = Path(directory or config.metrics_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / "runs.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False) + "\n")
+        prom_path = directory / "menu_planner.prom"
+        tmp_path = prom_path.with_suffix(".prom.tmp")
+        tmp_path.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp_path, prom_path)
+        logger.info(f"Run metrics exported to {directory}")
+
+
+def critical_path(spans: list, dependencies: Dict[str, list]) -> dict:
+    """
+    Chemin critique d'une exécution, d'après les intervalles mesurés des étapes.
+
+    Depuis l'étape terminée en dernier, le chemin remonte à chaque fois vers la
+    dépendance terminée le plus tard : c'est elle qui a retardé l'étape
+    suivante. Les étapes hors du chemin se sont déroulées en parallèle ; leur
+    recouvrement avec le chemin est le temps gagné sur une exécution en série.
+    Une étape mesurée plusieurs fois (mode batch) est représentée par son
+    dernier intervalle.
+
+    Args:
+        spans: `step_spans` de l'exécution (début et fin relatifs, en secondes)
+        dependencies: Étapes dont dépend chaque étape
+
+    Returns:
+        dict: Étapes du chemin, sa durée, la durée cumulée des étapes, le temps
+              gagné et, pour chaque étape hors du chemin, sa durée masquée
+    """
+    latest = {}
+    for span in spans:
+        if span["step"] not in latest or span["end"] > latest[span["step"]]["end"]:
+            latest[span["step"]] = span
+    if not latest:
+        return {"path": [], "seconds": 0.0, "serial_seconds": 0.0, "parallel_saving_seconds": 0.0, "off_path": {}}
+
+    path = []
+    step = max(latest, key=lambda name: latest[name]["end"])
+    while step is not None:
+        path.append(step)
+        predecessors = [name for name in dependencies.get(step, ()) if name in latest and name not in path]
+        step = max(predecessors, key=lambda name: latest[name]["end"], default=None)
+    path.reverse()
+
+    path_start, path_end = latest[path[0]]["start"], latest[path[-1]]["end"]
+    durations = {name: span["end"] - span["start"] for name, span in latest.items()}
+    off_path = {
+        name: {"seconds": round(durations[name], 3),
+               "hidden_seconds": round(max(0.0, min(span["end"], path_end) - max(span["start"], path_start)), 3)}
+        for name, span in latest.items() if name not in path
+    }
+    serial = sum(durations.values())
+    return {
+        "path": [{"step": name, "seconds": round(durations[name], 3)} for name in path],
+        "seconds": round(path_end - path_start, 3),
+        "serial_seconds": round(serial, 3),
+        "parallel_saving_seconds": round(sum(item["hidden_seconds"] for item in off_path.values()), 3),
+        "off_path": off_path,
+    }
+
+
+def format_critical_path(report: dict) -> str:
+    """Résumé d'une ligne du chemin critique, pour les logs."""
+    steps = " -> ".join(f"{item['step']} ({item['seconds']:.1f}s)" for item in report["path"])
+    hidden = ", ".join(f"{name} {item['hidden_seconds']:.1f}s" for name, item in report["off_path"].items())
+    return (f"Critical path {report['seconds']:.1f}s: {steps}; "
+            f"{report['parallel_saving_seconds']:.1f}s hidden by parallel steps ({hidden or 'none'})")
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_metrics = RunMetrics()
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+def get_metrics() -> RunMetrics:
+    """Mesures de l'exécution courante."""
+    return _metrics
+
+
+def reset_metrics() -> RunMetrics:
+    """Démarre une nouvelle série de mesures (nouvelle exécution)."""
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
+
+
+@contextmanager
+def track_tool(tool: str):
+    """
+    Mesure un appel d'outil. Le bloc peut signaler un échec géré via `status["ok"] = False`.
+
+    Exemple:
+        with track_tool("search_internet") as status:
+            ...
+    """
+    status = {"ok": True}
+    started = time.monotonic()
+    try:
+        yield status
+    except Exception:
+        status["ok"] = False
+        raise
+    finally:
+        get_metrics().record_tool(tool, time.monotonic() - started, status["ok"])
+
+
+def timed_step(method):
+    """
+    Décorateur de méthode de flow: mesure la durée de l'étape et publie ses
+    événements de début et de fin (voir `menu_planner.events`).
+
+    À placer sous les décorateurs CrewAI (`@start`, `@listen`, `@router`).
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        output_dir = getattr(getattr(self, "state", None), "output_dir", None)
+        events.emit("step_started", step=method.__name__, output_dir=output_dir)
+        started = time.time()
+        success = True
+        try:
+            result = method(self, *args, **kwargs)
+            success = result is not False
+            return result
+        except Exception:
+            success = False
+            raise
+        finally:
+            ended = time.time()
+            get_metrics().record_step(method.__name__, started, ended, success)
+            events.emit("step_finished", step=method.__name__, output_dir=output_dir,
+                        seconds=round(ended - started, 3), success=success)
+
+    return wrapper
+
+
+def _usage_field(usage, name: str):
+    """Champ d'un objet `usage` LiteLLM, qu'il soit un objet ou un dict."""
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get(name)
+    return getattr(usage, name, None)
+
+
+def cached_prompt_tokens(usage) -> int:
+    """
+    Tokens d'entrée servis par le cache de préfixe du fournisseur.
+
+    OpenAI (et LiteLLM, qui normalise les autres fournisseurs) les expose dans
+    `prompt_tokens_details.cached_tokens`, Anthropic dans `cache_read_input_tokens`.
+    """
+    cached = _usage_field(_usage_field(usage, "prompt_tokens_details"), "cached_tokens")
+    if cached is None:
+        cached = _usage_field(usage, "cache_read_input_tokens")
+    return int(cached or 0)
+
+
+def _on_llm_success(kwargs, completion_response, start_time, end_time):
+    usage = getattr(completion_response, "usage", None)
+    model = kwargs.get("model", "unknown")
+    prompt_tokens = _usage_field(usage, "prompt_tokens") or 0
+    cached_tokens = cached_prompt_tokens(usage)
+    completion_tokens = _usage_field(usage, "completion_tokens") or 0
+    logger.debug(f"LLM call {model}: {prompt_tokens} input tokens ({cached_tokens} cached, "
+                 f"{prompt_tokens - cached_tokens} uncached), {completion_tokens} output tokens")
+    get_metrics().record_llm_call(
+        model=model,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        seconds=(end_time - start_time).total_seconds(),
+        cached_tokens=cached_tokens,
+    )
+
+
+def _on_llm_failure(kwargs, completion_response, start_time, end_time):
+    get_metrics().record_llm_call(
+        model=kwargs.get("model", "unknown"), prompt_tokens=0, completion_tokens=0,
+        seconds=(end_time - start_time).total_seconds(), success=False,
+    )
+
+
+def install_hooks() -> None:
+    """
+    Branche la collecte sur LiteLLM (appels et tokens) et sur le bus d'événements
+    CrewAI (durée des tâches). Sans effet si déjà installé.
+    """
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        _hooks_installed = True
+
+    import litellm
+
+    litellm.success_callback.append(_on_llm_success)
+    litellm.failure_callback.append(_on_llm_failure)
+
+    try:
+        from crewai.utilities.events import (
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+    except ImportError:
+        logger.warning("CrewAI event bus unavailable, task latency will not be recorded")
+        return
+
+    task_starts = {}
+
+    def task_name(task) -> str:
+        return getattr(task, "name", None) or str(getattr(task, "description", "task"))[:40]
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        task_starts[id(source)] = time.monotonic()
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        started = task_starts.pop(id(source), None)
+        if started is not None:
+            get_metrics().record_task(task_name(source), time.monotonic() - started)
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        started = task_starts.pop(id(source), None)
+        if started is not None:
+            get_metrics().record_task(task_name(source), time.monotonic() - started, success=False)
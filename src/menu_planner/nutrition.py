@@ -0,0 +1,364 @@
+"""
+Nutrition - Calcul local et reproductible de la nutrition des recettes et du menu
+
+Les calories venaient jusqu'ici d'estimations du LLM : `Meal.calories` dans le
+menu, `nutritional_info` des recettes et la tâche `nutrition_evaluation`.
+Lentes et variables d'une exécution à l'autre, elles sont remplacées par un
+calcul local à partir des ingrédients structurés (`RecipeIngredient`) :
+
+- une table de composition embarquée (`data/food_composition.csv`, valeurs
+  pour 100 g) chargée en une matrice aliments x nutriments
+- chaque ingrédient est rapproché d'un aliment (nom normalisé, alias, puis
+  plus long alias contenu dans le nom) et sa quantité convertie en grammes
+  (unités normalisées comme pour la liste de courses, densité et poids à la
+  pièce de l'aliment)
+- les valeurs par portion, par repas, par jour et pour la semaine sont
+  obtenues pour tout le menu par des produits matriciels NumPy
+
+Une recette dont trop peu d'ingrédients sont reconnus
+(`config.nutrition.min_coverage`) garde l'estimation du LLM.
+"""
+
+import csv
+import functools
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from menu_planner import identity
+from menu_planner.config import config
+from menu_planner.identity import strip_accents
+from menu_planner.ingredients import ingredient_key, load_ingredients_file, normalize_unit, strip_code_fences
+from menu_planner.schemas import RecipeIngredient, StructuredRecipe
+
+logger = logging.getLogger("menu_planner.nutrition")
+
+NUTRIENTS = ["kcal", "protein_g", "carbs_g", "fat_g", "fiber_g"]
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MEALS = ["lunch", "dinner"]
+
+# Unités non convertibles par normalize_unit : (unité de base, quantité par unité)
+UNIT_AMOUNTS = {
+    "pincee": ("g", 0.5),
+    "gousse": ("g", 5.0),
+    "tranche": ("g", 30.0),
+    "botte": ("g", 50.0),
+    "brin": ("g", 2.0),
+    "feuille": ("g", 2.0),
+    "poignee": ("g", 30.0),
+    "sachet": ("g", 10.0),
+    "cube": ("g", 10.0),
+    "noix": ("g", 10.0),
+    "noisette": ("g", 5.0),
+    "pot": ("g", 125.0),
+    "boite": ("g", 400.0),
+    "verre": ("ml", 200.0),
+    "tasse": ("ml", 250.0),
+    "bol": ("ml", 350.0),
+    "filet": ("ml", 5.0),
+    "trait": ("ml", 5.0),
+}
+# Quantités négligeables : l'ingrédient est reconnu mais ne compte pas
+NEGLIGIBLE_UNITS = {"au gout", "a volonte", "selon gout", "facultatif"}
+
+
+class FoodTable:
+    """
+    Table de composition des aliments.
+
+    Attributs:
+        names: Nom de chaque aliment
+        per_gram: Matrice (aliments x nutriments) des valeurs pour un gramme
+        piece_grams: Poids d'une pièce en grammes (NaN si inconnu)
+        density: Grammes par millilitre (1 par défaut)
+    """
+
+    def __init__(self, names: List[str], aliases: Dict[str, int], per_100g: np.ndarray,
+                 piece_grams: np.ndarray, density: np.ndarray):
+        self.names = names
+        self.aliases = aliases
+        self.per_gram = per_100g / 100.0
+        self.piece_grams = piece_grams
+        self.density = density
+        # Alias du plus long au plus court, pour que "pomme de terre" l'emporte sur "pomme"
+        self._by_length = sorted(aliases, key=lambda alias: (-len(alias.split()), -len(alias)))
+
+    @classmethod
+    def load(cls, path: Path) -> "FoodTable":
+        """
+        Charge une table CSV (`name`, `aliases`, nutriments pour 100 g, `piece_g`, `density`).
+
+        Returns:
+            FoodTable: Table prête pour le rapprochement des ingrédients
+        """
+        with open(path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(line for line in f if line.strip() and not line.startswith("#")))
+        names, aliases, values, pieces, densities = [], {}, [], [], []
+        for index, row in enumerate(rows):
+            names.append(row["name"])
+            for alias in [row["name"]] + (row.get("aliases") or "").split("|"):
+                if alias.strip():
+                    aliases.setdefault(ingredient_key(alias), index)
+            values.append([float(row[nutrient] or 0) for nutrient in NUTRIENTS])
+            pieces.append(float(row["piece_g"]) if row.get("piece_g") else np.nan)
+            densities.append(float(row["density"]) if row.get("density") else 1.0)
+        return cls(names, aliases, np.array(values, dtype=np.float64), np.array(pieces), np.array(densities))
+
+    @functools.lru_cache(maxsize=4096)
+    def match(self, name: str) -> Optional[int]:
+        """
+        Aliment correspondant à un nom d'ingrédient.
+
+        Returns:
+            Optional[int]: Indice de l'aliment, None s'il n'est pas reconnu
+        """
+        key = ingredient_key(name)
+        if key in self.aliases:
+            return self.aliases[key]
+        padded = f" {key} "
+        for alias in self._by_length:
+            if f" {alias} " in padded:
+                return self.aliases[alias]
+        return None
+
+    def grams(self, food: int, quantity: float, unit: str) -> Optional[float]:
+        """
+        Quantité d'un ingrédient en grammes.
+
+        Returns:
+            Optional[float]: Grammes, None si l'unité ne peut pas être convertie pour cet aliment
+        """
+        base_unit, factor = normalize_unit(unit)
+        amount = quantity * factor
+        key = strip_accents(base_unit)
+        if key in NEGLIGIBLE_UNITS:
+            return 0.0
+        if key in UNIT_AMOUNTS:
+            base_unit, per_unit = UNIT_AMOUNTS[key]
+            amount *= per_unit
+        if base_unit == "g":
+            return amount
+        if base_unit == "ml":
+            return amount * self.density[food]
+        if base_unit == "pièce" and not np.isnan(self.piece_grams[food]):
+            return amount * self.piece_grams[food]
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_table(path: str) -> FoodTable:
+    table = FoodTable.load(Path(path))
+    logger.debug(f"Loaded {len(table.names)} foods from {path}")
+    return table
+
+
+def get_food_table() -> FoodTable:
+    """Table de composition configurée (`config.nutrition.table_path`), chargée une seule fois."""
+    return _load_table(str(config.nutrition.table_path))
+
+
+def parse_servings(value, default: int) -> int:
+    """Nombre de portions à partir d'un texte libre ("4 portions", "4-6 personnes")."""
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group()) if match and int(match.group()) > 0 else max(default, 1)
+
+
+def _facts(values: np.ndarray) -> Dict[str, float]:
+    return {nutrient: round(float(value), 1) for nutrient, value in zip(NUTRIENTS, values)}
+
+
+def recipe_rows(ingredients: Iterable[RecipeIngredient],
+                table: FoodTable) -> Tuple[List[int], List[float], List[str]]:
+    """
+    Aliments et grammes des ingrédients d'une recette.
+
+    Returns:
+        Tuple: Indices des aliments, grammes, et noms des ingrédients non reconnus ou non convertibles
+    """
+    foods, grams, unmatched = [], [], []
+    for ingredient in ingredients:
+        food = table.match(ingredient.name)
+        amount = table.grams(food, ingredient.quantity, ingredient.unit) if food is not None else None
+        if amount is None:
+            unmatched.append(ingredient.name)
+            continue
+        foods.append(food)
+        grams.append(amount)
+    return foods, grams, unmatched
+
+
+def compute_recipes(recipes: Dict[str, dict],
+                    table: Optional[FoodTable] = None) -> Tuple[List[str], np.ndarray, Dict[str, dict]]:
+    """
+    Valeurs nutritionnelles par portion de plusieurs recettes, en un produit matriciel.
+
+    Les lignes de tous les ingrédients sont réunies ; la matrice de répartition
+    (recettes x ingrédients, 1/portions par cellule) multiplie la matrice
+    (ingrédients x nutriments) des grammes par les valeurs des aliments.
+
+    Args:
+        recipes: `recipe_id` -> `ingredients` (RecipeIngredient) et `servings` (int)
+        table: Table de composition (par défaut celle de la configuration)
+
+    Returns:
+        Tuple: Identifiants des recettes retenues, matrice (recettes x nutriments) par portion,
+        et détail par recette (`servings`, `coverage`, `unmatched`, `per_serving` ou None)
+    """
+    table = table or get_food_table()
+    ids, details, foods, grams, owners = [], {}, [], [], []
+    for recipe_id, recipe in recipes.items():
+        ingredients = list(recipe["ingredients"])
+        rows, amounts, unmatched = recipe_rows(ingredients, table)
+        coverage = len(rows) / len(ingredients) if ingredients else 0.0
+        details[recipe_id] = {"name": recipe.get("name", recipe_id), "servings": recipe["servings"],
+                              "coverage": round(coverage, 2), "unmatched": unmatched, "per_serving": None}
+        if coverage < config.nutrition.min_coverage:
+            logger.warning(f"Nutrition of {recipe_id} not computed: {len(unmatched)}/{len(ingredients)} "
+                           f"ingredients unknown ({', '.join(unmatched[:5])})")
+            continue
+        owners.extend([len(ids)] * len(rows))
+        ids.append(recipe_id)
+        foods.extend(rows)
+        grams.extend(amounts)
+
+    if not ids:
+        return [], np.zeros((0, len(NUTRIENTS))), details
+    nutrients = np.asarray(grams)[:, None] * table.per_gram[np.asarray(foods, dtype=np.int64)]
+    servings = np.array([recipes[recipe_id]["servings"] for recipe_id in ids], dtype=np.float64)
+    split = np.zeros((len(ids), len(foods)))
+    split[owners, np.arange(len(foods))] = 1.0 / servings[owners]
+    per_serving = split @ nutrients
+    for recipe_id, values in zip(ids, per_serving):
+        details[recipe_id]["per_serving"] = _facts(values)
+    return ids, per_serving, details
+
+
+def menu_dict(menu_json) -> dict:
+    """Menu au format `MenuJson` (modèle, dict ou texte JSON) sous forme de dict, clé "menu" retirée."""
+    if isinstance(menu_json, str):
+        menu_json = json.loads(strip_code_fences(menu_json))
+    data = menu_json.model_dump() if hasattr(menu_json, "model_dump") else dict(menu_json or {})
+    return data.get("menu", data)
+
+
+def compute_menu(menu_json, recipes: Dict[str, dict], table: Optional[FoodTable] = None) -> dict:
+    """
+    Nutrition du menu par portion : par repas, par jour et pour la semaine.
+
+    Les repas sont reliés à leur recette par l'identité du titre. Une matrice
+    d'agrégation (repas, jours et semaine x recettes) appliquée à la matrice
+    des valeurs par portion donne tous les totaux en un seul produit.
+
+    Args:
+        menu_json: Menu de la semaine
+        recipes: Ingrédients et portions des recettes (voir `compute_recipes`)
+
+    Returns:
+        dict: `recipes`, `meals`, `days` et `week`, avec le nombre de repas calculés
+    """
+    ids, per_serving, details = compute_recipes(recipes, table)
+    index = {recipe_id: position for position, recipe_id in enumerate(ids)}
+    menu = menu_dict(menu_json)
+
+    slots = [(day, meal, (menu.get(day) or {}).get(meal) or {}) for day in DAYS for meal in MEALS]
+    meal_recipes = np.zeros((len(slots), len(ids)))
+    computed = np.zeros(len(slots), dtype=bool)
+    for position, (_, _, meal) in enumerate(slots):
+        recipe = index.get(identity.recipe_id(meal["title"])) if meal.get("title") else None
+        if recipe is not None:
+            meal_recipes[position, recipe] = 1.0
+            computed[position] = True
+    # Repas -> jours (deux repas par jour) -> semaine
+    day_meals = np.kron(np.eye(len(DAYS)), np.ones((1, len(MEALS))))
+    day_recipes = day_meals @ meal_recipes
+    aggregation = np.vstack([meal_recipes, day_recipes, day_recipes.sum(axis=0, keepdims=True)])
+    values = aggregation @ per_serving
+
+    meals = [{"day": day, "meal": meal_name, "title": meal.get("title", ""),
+              "per_serving": _facts(values[position]) if computed[position] else None}
+             for position, (day, meal_name, meal) in enumerate(slots)]
+    day_computed = computed.reshape(len(DAYS), len(MEALS)).sum(axis=1)
+    days = {day: dict(_facts(values[len(slots) + position]), meals_computed=int(day_computed[position]))
+            for position, day in enumerate(DAYS)}
+    return {
+        "recipes": details,
+        "meals": meals,
+        "days": days,
+        "week": dict(_facts(values[-1]), meals_computed=int(computed.sum()), meals=len(slots)),
+    }
+
+
+def apply_calories(menu_json, report: dict) -> dict:
+    """
+    Menu dont les calories des repas calculés remplacent l'estimation du LLM.
+
+    Returns:
+        dict: Menu au format `MenuJson` (clé "menu")
+    """
+    menu = menu_dict(menu_json)
+    for meal in report["meals"]:
+        if meal["per_serving"] and (menu.get(meal["day"]) or {}).get(meal["meal"]):
+            menu[meal["day"]][meal["meal"]]["calories"] = int(round(meal["per_serving"]["kcal"]))
+    return {"menu": menu}
+
+
+def load_recipes(recipe_inputs: Iterable[dict]) -> Dict[str, dict]:
+    """
+    Ingrédients et portions des recettes générées, lus dans leurs fichiers.
+
+    Les portions viennent du YAML Paprika (`servings`), sinon de la taille du foyer.
+
+    Returns:
+        Dict[str, dict]: `recipe_id` -> `name`, `ingredients` et `servings`
+    """
+    recipes = {}
+    for recipe_input in recipe_inputs:
+        ingredients = load_ingredients_file(recipe_input["recipe_ingredients_path"])
+        if not ingredients:
+            continue
+        household = int(recipe_input.get("adults") or 0) + int(recipe_input.get("children") or 0)
+        servings = None
+        try:
+            text = Path(recipe_input["recipe_yaml_path"]).read_text(encoding="utf-8")
+            data = yaml.safe_load(strip_code_fences(text))
+            servings = data.get("servings") if isinstance(data, dict) else None
+        except (OSError, yaml.YAMLError):
+            pass
+        recipes[recipe_input["recipe_id"]] = {"name": recipe_input["recipe_name"], "ingredients": ingredients,
+                                              "servings": parse_servings(servings, household)}
+    return recipes
+
+
+def nutritional_info(values: Dict[str, float]) -> str:
+    """Résumé par portion au format de `nutritional_info` ("412 kcal par portion, ...")."""
+    return (f"{values['kcal']:.0f} kcal par portion (protéines {values['protein_g']:.0f} g, "
+            f"glucides {values['carbs_g']:.0f} g, lipides {values['fat_g']:.0f} g, fibres {values['fiber_g']:.0f} g)")
+
+
+def with_computed_nutrition(recipe: StructuredRecipe, recipe_input: dict) -> StructuredRecipe:
+    """
+    Recette structurée dont `nutritional_info` est calculé à partir de ses ingrédients.
+
+    Returns:
+        StructuredRecipe: Recette mise à jour, ou inchangée si le calcul est désactivé ou trop incomplet
+    """
+    if not config.nutrition.enabled:
+        return recipe
+    household = int(recipe_input.get("adults") or 0) + int(recipe_input.get("children") or 0)
+    recipe_id = recipe_input["recipe_id"]
+    try:
+        _, _, details = compute_recipes({recipe_id: {"name": recipe.name, "ingredients": recipe.ingredients,
+                                                     "servings": parse_servings(recipe.servings, household)}})
+    except (OSError, ValueError) as e:
+        logger.error(f"Nutrition computation failed for {recipe_id}: {str(e)}")
+        return recipe
+    values = details[recipe_id]["per_serving"]
+    if values is None:
+        return recipe
+    return recipe.model_copy(update={"nutritional_info": nutritional_info(values)})
@@ -0,0 +1,82 @@
+"""
+Prompts - Mise en page des descriptions de tâches pour le cache de préfixe
+
+Les fournisseurs (OpenAI, Anthropic...) mettent en cache le début commun des
+prompts : tant que deux appels partagent le même préfixe, ce préfixe est
+facturé et traité comme "cached". CrewAI envoie le prompt système de l'agent
+(rôle, objectif, outils), puis la description de la tâche et le résultat
+attendu. Une variable (`{recipe_name}`, `{adults}`...) placée en tête de
+description rend donc chaque prompt différent dès ses premières lignes.
+
+Les tâches des `tasks.yaml` décrivent leurs variables dans une clé `inputs`
+(libellé -> valeur) au lieu de les interpoler dans le texte. `task_config`
+reconstruit la description : instructions statiques d'abord, puis un bloc
+"Données de la demande" identique d'une tâche à l'autre, en dernier.
+"""
+
+import logging
+import re
+from typing import Dict, List
+
+logger = logging.getLogger("menu_planner.prompts")
+
+INPUTS_HEADER = "Données de la demande :"
+
+# Même motif que l'interpolation de CrewAI: les exemples JSON ({"name": ...}) ne sont pas des variables
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def placeholders(text: str) -> List[str]:
+    """Variables interpolées par CrewAI dans un texte, dans l'ordre d'apparition."""
+    return _PLACEHOLDER.findall(text or "")
+
+
+def static_prefix(text: str) -> str:
+    """Début du texte identique pour tous les inputs (avant la première variable)."""
+    match = _PLACEHOLDER.search(text or "")
+    return text[:match.start()] if match else (text or "")
+
+
+def inputs_block(inputs: Dict[str, str]) -> str:
+    """Bloc final listant les variables de la tâche, une par ligne."""
+    lines = [f"- {label} : {value}" for label, value in inputs.items()]
+    return "\n".join([INPUTS_HEADER] + lines)
+
+
+def task_config(raw_config: dict) -> dict:
+    """
+    Configuration de tâche avec les variables regroupées en fin de description.
+
+    Args:
+        raw_config: Entrée d'un `tasks.yaml`, avec une clé `inputs` optionnelle
+
+    Returns:
+        dict: Configuration à passer à `Task(config=...)`, sans la clé `inputs`
+    """
+    result = {key: value for key, value in raw_config.items() if key != "inputs"}
+    description = str(raw_config.get("description", "")).rstrip()
+    misplaced = placeholders(description)
+    if misplaced:
+        logger.warning(f"Task prompt interpolates {', '.join(misplaced)} before its inputs block, "
+                       f"provider prompt caching will not apply")
+    inputs = raw_config.get("inputs") or {}
+    if inputs:
+        description = f"{description}\n\n{inputs_block(inputs)}"
+    result["description"] = description + "\n"
+    return result
+
+
+def layout_report(tasks_config: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Part statique (commune à tous les inputs) de chaque description de tâche.
+
+    Returns:
+        dict: Par tâche, le nombre de caractères statiques, total et leur ratio
+    """
+    report = {}
+    for name, raw_config in tasks_config.items():
+        description = task_config(raw_config)["description"]
+        static = len(static_prefix(description))
+        report[name] = {"static_chars": static, "total_chars": len(description),
+                        "static_ratio": round(static / max(len(description), 1), 3)}
+    return report
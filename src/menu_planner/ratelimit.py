@@ -0,0 +1,325 @@
+"""
+Rate limit - Ordonnancement partagé des appels LLM et des API des outils
+
+Avec les recettes générées en parallèle, tous les crews utilisent la même clé
+d'API sans coordination : les rafales déclenchent des erreurs 429, des
+recettes en échec et des relances complètes. Ce module tient, pour tout le
+processus, un limiteur par fournisseur LLM (`openai`, `gemini`, `ollama`...)
+et par outil (`serper`, `rapidapi`) qui combine :
+- des seaux à jetons : requêtes par minute, et tokens par minute pour les LLM
+  (prompt estimé à partir de sa longueur, plus une réserve pour la réponse)
+- une concurrence adaptative (AIMD) : le nombre d'appels simultanés augmente
+  d'une unité par fenêtre d'appels réussis, et diminue de moitié sur une
+  erreur 429 (d'un dixième sur une latence anormale)
+- une pause commune à tous les appels du limiteur quand le fournisseur
+  indique `Retry-After`
+
+Les appels attendent leur tour (`slot` / `aslot`) au lieu d'échouer, ce qui
+approche le débit maximal permis par le quota sans erreur. Les attentes, les
+rejets 429 et la concurrence atteinte sont reportés dans les mesures.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+
+from menu_planner.config import config
+from menu_planner.metrics import get_metrics
+
+logger = logging.getLogger("menu_planner.ratelimit")
+
+TOOL_LIMITERS = ("serper", "rapidapi")
+
+# Au-delà de LATENCY_FACTOR fois la latence habituelle, un appel compte comme un signe de saturation
+LATENCY_FACTOR = 3.0
+LATENCY_WARMUP = 5
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Délai `Retry-After` en secondes, None s'il est absent ou n'est pas un nombre."""
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Backoff exponentiel avec gigue complète."""
+    return random.uniform(0, min(base * (2 ** attempt), cap))
+
+
+class TokenBucket:
+    """
+    Seau à jetons par réservation : chaque demande est servie dans l'ordre d'arrivée.
+
+    Attributs:
+        rate: Jetons ajoutés par seconde
+        capacity: Jetons accumulables (rafale autorisée), dix secondes de quota par défaut
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(1.0, per_minute / 6.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """
+        Réserve des jetons, quitte à s'endetter sur les prochains.
+
+        Returns:
+            float: Secondes à attendre avant de pouvoir les utiliser
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    Nombre d'appels simultanés ajusté par AIMD (augmentation additive, diminution multiplicative).
+
+    Attributs:
+        limit: Limite courante (fractionnaire), entre `min_limit` et `max_limit`
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._latency: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """Libère un appel et ajuste la limite selon son issue."""
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            slow = (self._samples >= LATENCY_WARMUP and self._latency is not None
+                    and latency > LATENCY_FACTOR * self._latency)
+            if throttled or slow:
+                # Une seule diminution par fenêtre : les appels déjà partis signalent la même saturation
+                if now - self._last_decrease > (self._latency or 1.0):
+                    self.limit = max(float(self.min_limit), self.limit * (0.5 if throttled else 0.9))
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            if not throttled:
+                self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+                self._samples += 1
+            self._condition.notify_all()
+
+
+class CallSlot:
+    """Appel en cours dans un limiteur, pour signaler un rejet 429 (sans effet hors limiteur)."""
+
+    def __init__(self, limiter: Optional["RateLimiter"] = None):
+        self.limiter = limiter
+        self.is_throttled = False
+        self.waited = 0.0
+
+    def throttled(self, retry_after=None) -> None:
+        """Signale un rejet du fournisseur; `retry_after` (secondes) suspend tout le limiteur."""
+        self.is_throttled = True
+        if self.limiter is not None:
+            self.limiter.pause(parse_retry_after(retry_after))
+
+
+class RateLimiter:
+    """
+    Quotas d'un fournisseur ou d'un outil partagés par tous les threads.
+
+    Attributs:
+        name: Nom du limiteur (fournisseur LLM ou outil)
+        requests: Seau des requêtes par minute
+        tokens: Seau des tokens par minute (None sans quota de tokens)
+        concurrency: Concurrence adaptative
+    """
+
+    def __init__(self, name: str, rpm: float, tpm: float = 0, max_concurrency: int = 8):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: Optional[float]) -> None:
+        """Suspend les prochains appels pendant `seconds` (Retry-After)."""
+        if not seconds:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now + seconds <= self._paused_until:
+                return
+            already_paused = self._paused_until > now
+            self._paused_until = now + seconds
+        if not already_paused:
+            logger.warning(f"{self.name} rate limited, pausing calls for {seconds:.1f}s")
+
+    def reserve(self, tokens: float = 0) -> float:
+        """
+        Réserve une requête (et ses tokens) dans les seaux.
+
+        Returns:
+            float: Secondes à attendre avant l'appel
+        """
+        wait = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._lock:
+            return max(wait, self._paused_until - time.monotonic())
+
+    def _finish(self, call: CallSlot, started: float) -> None:
+        self.concurrency.release(time.monotonic() - started, call.is_throttled)
+        get_metrics().record_rate_limit(self.name, call.waited, call.is_throttled, self.concurrency.limit)
+
+    @contextmanager
+    def slot(self, tokens: float = 0):
+        """Attend le tour de l'appel (quotas puis concurrence), puis le mesure."""
+        started = time.monotonic()
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self.concurrency.acquire()
+        call = CallSlot(self)
+        call_started = time.monotonic()
+        call.waited = call_started - started
+        try:
+            yield call
+        finally:
+            self._finish(call, call_started)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: float = 0):
+        """Variante asynchrone de `slot`, sans bloquer la boucle d'événements."""
+        started = time.monotonic()
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(0.05)
+        call = CallSlot(self)
+        call_started = time.monotonic()
+        call.waited = call_started - started
+        try:
+            yield call
+        finally:
+            self._finish(call, call_started)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def parse_overrides(value: str) -> Dict[str, Tuple[float, float]]:
+    """Quotas `nom=rpm[/tpm]` séparés par des virgules (`config.rate_limit.overrides`)."""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, quota = item.partition("=")
+        rpm, _, tpm = quota.partition("/")
+        try:
+            overrides[name.strip().lower()] = (float(rpm), float(tpm) if tpm else 0.0)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit {item!r} (expected name=rpm[/tpm])")
+    return overrides
+
+
+def provider_of(model: str) -> str:
+    """Fournisseur d'un modèle LiteLLM (`gemini/gemini-2.0-flash` -> `gemini`, `openai` par défaut)."""
+    return model.split("/", 1)[0].lower() if "/" in model else "openai"
+
+
+def get_limiter(name: str) -> Optional[RateLimiter]:
+    """
+    Limiteur partagé d'un fournisseur LLM ou d'un outil, créé au premier appel.
+
+    Returns:
+        Optional[RateLimiter]: None si l'ordonnancement est désactivé
+    """
+    settings = config.rate_limit
+    if not settings.enabled:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            if name in TOOL_LIMITERS:
+                rpm = settings.serper_rpm if name == "serper" else settings.rapidapi_rpm
+                tpm, concurrency = 0.0, settings.tool_max_concurrency
+            else:
+                rpm, tpm, concurrency = settings.llm_rpm, settings.llm_tpm, settings.llm_max_concurrency
+            rpm, tpm = parse_overrides(settings.overrides).get(name, (rpm, tpm))
+            limiter = _limiters[name] = RateLimiter(name, rpm, tpm, concurrency)
+    return limiter
+
+
+@contextmanager
+def slot(name: Optional[str], tokens: float = 0):
+    """Tour d'appel dans le limiteur `name` (appel direct si `name` est None ou l'ordonnancement désactivé)."""
+    limiter = get_limiter(name) if name else None
+    if limiter is None:
+        yield CallSlot()
+        return
+    with limiter.slot(tokens) as call:
+        yield call
+
+
+@asynccontextmanager
+async def aslot(name: Optional[str], tokens: float = 0):
+    """Variante asynchrone de `slot`."""
+    limiter = get_limiter(name) if name else None
+    if limiter is None:
+        yield CallSlot()
+        return
+    async with limiter.aslot(tokens) as call:
+        yield call
+
+
+def estimate_tokens(messages) -> int:
+    """Estimation grossière des tokens d'un prompt (environ quatre caractères par token)."""
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Erreur LiteLLM ou HTTP signalant un dépassement de quota (429)."""
+    if getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__:
+        return True
+    message = str(error).lower()
+    return "rate limit" in message or "ratelimit" in message or "429" in message
+
+
+def error_retry_after(error: Exception) -> Optional[float]:
+    """Délai `Retry-After` porté par l'exception d'un fournisseur, s'il existe."""
+    for headers in (getattr(getattr(error, "response", None), "headers", None),
+                    getattr(error, "litellm_response_headers", None)):
+        if headers:
+            delay = parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+            if delay is not None:
+                return delay
+    return None
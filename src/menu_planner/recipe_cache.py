@@ -0,0 +1,269 @@
+"""
+Recipe Cache - Cache persistant des artefacts générés par RecipeExpertCrew
+
+Ce module conserve sur disque (SQLite) les fichiers HTML, YAML et JSON produits
+pour chaque recette, afin qu'une recette déjà générée pour la même famille, avec
+le même modèle et les mêmes prompts, ne repasse pas par le crew.
+
+La clé de cache combine:
+- l'identité de la recette (son titre canonique, voir `menu_planner.identity`)
+- la composition de la famille (`adults`, `children`, `children_age`)
+- le nom du modèle défini dans `LLMConfig`
+- une empreinte des fichiers `tasks.yaml` et `agents.yaml` de
+  `recipe_expert_crew/config` et du gabarit HTML des recettes
+- les réglages nutritionnels (`config.nutrition`, empreinte de la table comprise)
+
+L'éviction se fait par âge puis par taille (nombre d'entrées et octets), en
+supprimant d'abord les recettes les moins récemment utilisées.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from menu_planner.config import BASE_DIR, config
+from menu_planner.identity import canonical_title
+
+logger = logging.getLogger("menu_planner.recipe_cache")
+
+RECIPE_TASKS_PATH = BASE_DIR / "crews" / "recipe_expert_crew" / "config" / "tasks.yaml"
+RECIPE_AGENTS_PATH = BASE_DIR / "crews" / "recipe_expert_crew" / "config" / "agents.yaml"
+RECIPE_TEMPLATE_PATH = BASE_DIR / "crews" / "recipe_expert_crew" / "template.html"
+
+# Correspondance entre les colonnes du cache et les chemins des inputs de recette
+ARTIFACT_PATHS = {
+    "html": "recipe_html_path",
+    "yaml": "recipe_yaml_path",
+    "ingredients": "recipe_ingredients_path",
+}
+
+
+@lru_cache(maxsize=None)
+def prompts_fingerprint(path: Path = RECIPE_TASKS_PATH) -> str:
+    """Empreinte SHA-256 d'un fichier de prompts, de template ou de données du RecipeExpertCrew."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        logger.warning(f"Could not read {path} for the recipe cache key")
+        return ""
+
+
+def models_identity():
+    """Modèle des agents, ou modèle de chaque niveau quand ils diffèrent (voir `config.llm.tiers`)."""
+    models = {tier: settings.model for tier, settings in config.llm.tiers.items()}
+    return config.llm.model_name if set(models.values()) == {config.llm.model_name} else models
+
+
+def recipe_cache_key(recipe_input: dict, model_name: Optional[str] = None) -> str:
+    """
+    Calcule la clé de cache d'une recette à partir de ses inputs.
+
+    Args:
+        recipe_input: Dictionnaire d'inputs tel que préparé pour RecipeExpertCrew
+        model_name: Modèle utilisé (par défaut ceux des niveaux de `config.llm`)
+
+    Returns:
+        str: Clé hexadécimale stable
+    """
+    identity = {
+        "recipe": canonical_title(recipe_input["recipe_name"]),
+        "adults": int(recipe_input.get("adults", config.family.adults)),
+        "children": int(recipe_input.get("children", config.family.children)),
+        "children_age": str(recipe_input.get("children_age", config.family.children_age)),
+        "model": model_name or models_identity(),
+        "prompts": prompts_fingerprint(),
+        "agents": prompts_fingerprint(RECIPE_AGENTS_PATH),
+        "mode": config.recipe_mode,
+        "template": prompts_fingerprint(RECIPE_TEMPLATE_PATH),
+        # Les valeurs nutritionnelles calculées sont écrites dans les fichiers mis en cache
+        "nutrition": {
+            "enabled": config.nutrition.enabled,
+            "llm_evaluation": config.nutrition.llm_evaluation,
+            "table": prompts_fingerprint(config.nutrition.table_path) if config.nutrition.enabled else "",
+            "min_coverage": config.nutrition.min_coverage,
+        },
+    }
+    payload = json.dumps(identity, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecipeCache:
+    """
+    Cache SQLite des artefacts de recettes, sûr pour un usage multi-threads.
+
+    Attributs:
+        path: Chemin de la base SQLite
+        max_entries: Nombre maximal de recettes conservées
+        max_bytes: Taille maximale cumulée des artefacts
+        max_age_days: Âge maximal d'une entrée avant expiration
+    """
+
+    def __init__(self, path: Path, max_entries: int = 1000, max_bytes: int = 200 * 1024 * 1024,
+                 max_age_days: int = 90):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS recipes (
+                key TEXT PRIMARY KEY,
+                recipe_name TEXT NOT NULL,
+                html BLOB NOT NULL,
+                yaml BLOB NOT NULL,
+                ingredients BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_recipes_accessed ON recipes(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, bytes]]:
+        """Retourne les artefacts associés à la clé, ou None si absents ou expirés."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html, yaml, ingredients, created_at FROM recipes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            html, yaml, ingredients, created_at = row
+            if self._expired(created_at):
+                self._conn.execute("DELETE FROM recipes WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE recipes SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return {"html": bytes(html), "yaml": bytes(yaml), "ingredients": bytes(ingredients)}
+
+    def put(self, key: str, recipe_name: str, artifacts: Dict[str, bytes]) -> None:
+        """Enregistre (ou remplace) les artefacts d'une recette puis applique l'éviction."""
+        size = sum(len(artifacts[name]) for name in ARTIFACT_PATHS)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recipes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, recipe_name, artifacts["html"], artifacts["yaml"], artifacts["ingredients"],
+                 size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def restore(self, recipe_input: dict) -> bool:
+        """
+        Matérialise une recette en cache aux chemins attendus par le flow.
+
+        Returns:
+            bool: True si la recette était en cache et que les fichiers ont été écrits
+        """
+        artifacts = self.get(recipe_cache_key(recipe_input))
+        if artifacts is None:
+            return False
+        for name, path_key in ARTIFACT_PATHS.items():
+            target = Path(recipe_input[path_key])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(artifacts[name])
+        logger.info(f"Recipe cache hit: {recipe_input['recipe_name']}")
+        return True
+
+    def store(self, recipe_input: dict) -> bool:
+        """
+        Ajoute au cache les fichiers générés pour une recette.
+
+        Les recettes incomplètes (fichier manquant ou vide, JSON d'ingrédients
+        illisible) ne sont pas mises en cache pour ne pas propager d'erreur.
+
+        Returns:
+            bool: True si la recette a été mise en cache
+        """
+        artifacts = {}
+        for name, path_key in ARTIFACT_PATHS.items():
+            path = Path(recipe_input[path_key])
+            if not path.is_file() or path.stat().st_size == 0:
+                logger.debug(f"Not caching {recipe_input['recipe_name']}: missing {path}")
+                return False
+            artifacts[name] = path.read_bytes()
+        try:
+            json.loads(artifacts["ingredients"].decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            logger.warning(f"Not caching {recipe_input['recipe_name']}: invalid ingredients JSON")
+            return False
+        self.put(recipe_cache_key(recipe_input), recipe_input["recipe_name"], artifacts)
+        return True
+
+    def evict(self) -> None:
+        """Applique explicitement la politique d'éviction."""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.max_age_days > 0 and time.time() - created_at > self.max_age_days * 86400
+
+    def _evict(self) -> None:
+        # Expiration par âge
+        if self.max_age_days > 0:
+            cutoff = time.time() - self.max_age_days * 86400
+            self._conn.execute("DELETE FROM recipes WHERE created_at < ?", (cutoff,))
+
+        # Éviction LRU tant que les limites de taille sont dépassées
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM recipes").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM recipes ORDER BY accessed_at ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM recipes WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} recipes from cache")
+
+
+_recipe_cache: Optional[RecipeCache] = None
+_recipe_cache_lock = threading.Lock()
+
+
+def get_recipe_cache() -> Optional[RecipeCache]:
+    """
+    Retourne le cache de recettes partagé par le processus.
+
+    Returns:
+        Optional[RecipeCache]: None si le cache est désactivé ou inutilisable
+    """
+    global _recipe_cache
+    if not config.cache.enabled:
+        return None
+    with _recipe_cache_lock:
+        if _recipe_cache is None:
+            try:
+                _recipe_cache = RecipeCache(
+                    path=config.cache.path,
+                    max_entries=config.cache.max_entries,
+                    max_bytes=config.cache.max_bytes,
+                    max_age_days=config.cache.max_age_days,
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Recipe cache unavailable: {str(e)}")
+                return None
+    return _recipe_cache
@@ -0,0 +1,301 @@
+"""
+Rendering - Rendu local (Jinja) des pages HTML et de la liste de courses
+
+Les pages finales sont produites à partir de données structurées, sans appel LLM :
+- la fiche HTML d'une recette, à partir de son YAML Paprika et de ses
+  ingrédients JSON (`recipe_expert_crew/template.html`)
+- la page du menu de la semaine, à partir du menu JSON (`html_design_crew/template.html`)
+- la liste de courses HTML et Markdown, à partir des ingrédients agrégés et
+  classés par rayon (`shopping_crew/template.html`, `shopping_crew/template.md`)
+
+En mode recette structurée, les trois fichiers d'une recette (HTML, YAML
+Paprika, ingrédients JSON) sont dérivés d'un même `StructuredRecipe`.
+
+Le rendu est déterministe : les mêmes données produisent les mêmes octets.
+"""
+
+import functools
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import yaml
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from pydantic import ValidationError
+
+from menu_planner.ingredients import categorize_ingredients, load_ingredients_file, strip_code_fences
+from menu_planner.schemas import RecipeIngredient, StructuredRecipe
+
+logger = logging.getLogger("menu_planner.rendering")
+
+TEMPLATES_DIR = Path(__file__).parent / "crews"
+RECIPE_TEMPLATE = "recipe_expert_crew/template.html"
+MENU_TEMPLATE = "html_design_crew/template.html"
+SHOPPING_HTML_TEMPLATE = "shopping_crew/template.html"
+SHOPPING_MD_TEMPLATE = "shopping_crew/template.md"
+
+DAY_NAMES = {
+    "monday": "Lundi", "tuesday": "Mardi", "wednesday": "Mercredi", "thursday": "Jeudi",
+    "friday": "Vendredi", "saturday": "Samedi", "sunday": "Dimanche",
+}
+MEALS = ["lunch", "dinner"]
+
+# Couleurs des en-têtes de rayon de la liste de courses, attribuées dans l'ordre
+CATEGORY_COLORS = ["#6abf43", "#d9534f", "#4479a2", "#c8923a", "#5bc0de", "#9b6bb3", "#7f8c8d"]
+
+
+@functools.lru_cache(maxsize=1)
+def get_environment() -> Environment:
+    """Environnement Jinja partagé (templates compilés une seule fois)."""
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html"]),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+
+
+def render_template(name: str, **context) -> str:
+    """Rend un template du dossier des crews avec le contexte donné."""
+    return get_environment().get_template(name).render(**context)
+
+
+def write_output(path, content: str) -> None:
+    """Écrit un fichier de sortie en créant son dossier si nécessaire."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def format_quantity(ingredient: RecipeIngredient) -> str:
+    """Quantité lisible d'un ingrédient: `1.5 kg`, `2 pièces`, `au goût`..."""
+    quantity = f"{ingredient.quantity:g}"
+    unit = ingredient.unit.strip()
+    if unit == "pièce" and ingredient.quantity > 1:
+        unit = "pièces"
+    return f"{quantity} {unit}".strip()
+
+
+def _text_lines(text) -> List[str]:
+    """Lignes non vides d'un bloc de texte, sans puces ni numérotation."""
+    if isinstance(text, list):
+        lines = [str(item) for item in text]
+    else:
+        lines = str(text or "").splitlines()
+    cleaned = (re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip() for line in lines)
+    return [line for line in cleaned if line]
+
+
+def recipe_context(recipe: dict, ingredients: Iterable[RecipeIngredient], nutrition_notes: str = "") -> dict:
+    """
+    Contexte du template de recette à partir des données Paprika et des ingrédients.
+
+    Args:
+        recipe: Recette au format Paprika (voir `PaprikaRecipe`)
+        ingredients: Ingrédients structurés de la recette
+        nutrition_notes: Analyse nutritionnelle (optionnelle) affichée en conseils
+
+    Returns:
+        dict: Variables attendues par `recipe_expert_crew/template.html`
+    """
+    ingredients = list(ingredients)
+    ingredient_lines = [f"{ingredient.name} ({format_quantity(ingredient)})" for ingredient in ingredients]
+    if not ingredient_lines:
+        ingredient_lines = _text_lines(recipe.get("ingredients"))
+
+    nutrition = []
+    if recipe.get("nutritional_info"):
+        nutrition.append(("Énergie", str(recipe["nutritional_info"])))
+
+    categories = recipe.get("categories") or []
+    if isinstance(categories, str):
+        categories = [categories]
+
+    return {
+        "nom_recette": recipe.get("name") or "Recette",
+        "sous_titre": " · ".join(str(category) for category in categories),
+        "portions": recipe.get("servings") or "",
+        "temps_preparation": recipe.get("prep_time") or "—",
+        "temps_cuisson": recipe.get("cook_time") or "—",
+        "difficulte": recipe.get("difficulty") or "—",
+        "ingredients": ingredient_lines,
+        "etapes": [
+            {"numero": number, "titre_etape": "", "instructions": [step]}
+            for number, step in enumerate(_text_lines(recipe.get("directions")), start=1)
+        ],
+        "astuce_enfant": str(recipe.get("notes") or "").strip(),
+        "nutrition": nutrition,
+        "conseils": _text_lines(nutrition_notes),
+    }
+
+
+def render_recipe_html(recipe: dict, ingredients: Iterable[RecipeIngredient], nutrition_notes: str = "") -> str:
+    """HTML d'une recette à partir de ses données structurées."""
+    return render_template(RECIPE_TEMPLATE, **recipe_context(recipe, ingredients, nutrition_notes))
+
+
+def task_output_text(crew_output, task_name: str) -> str:
+    """Texte brut produit par une tâche nommée d'un CrewOutput ("" si absente)."""
+    for task_output in getattr(crew_output, "tasks_output", None) or []:
+        if getattr(task_output, "name", None) == task_name:
+            return task_output.raw or ""
+    return ""
+
+
+def nutrition_notes_from_output(crew_output) -> str:
+    """Analyse nutritionnelle d'un résultat de RecipeExpertCrew, quel que soit le mode."""
+    recipe = getattr(crew_output, "pydantic", None)
+    if isinstance(recipe, StructuredRecipe):
+        return "\n".join(recipe.nutrition_tips)
+    return task_output_text(crew_output, "nutrition_evaluation")
+
+
+def render_recipe_file(recipe_input: dict, nutrition_notes: str = "") -> bool:
+    """
+    Produit le fichier HTML d'une recette à partir de ses fichiers YAML et JSON.
+
+    Args:
+        recipe_input: Inputs de la recette (chemins `recipe_*_path`)
+        nutrition_notes: Analyse nutritionnelle du crew, si disponible
+
+    Returns:
+        bool: True si le fichier HTML a été écrit
+    """
+    try:
+        recipe = yaml.safe_load(strip_code_fences(Path(recipe_input["recipe_yaml_path"]).read_text(encoding="utf-8")))
+    except (OSError, yaml.YAMLError) as e:
+        logger.error(f"Cannot render {recipe_input['recipe_name']}: invalid recipe YAML ({str(e)})")
+        return False
+    if not isinstance(recipe, dict):
+        logger.error(f"Cannot render {recipe_input['recipe_name']}: unexpected recipe YAML format")
+        return False
+
+    recipe.setdefault("name", recipe_input["recipe_name"])
+    ingredients = load_ingredients_file(recipe_input["recipe_ingredients_path"])
+    write_output(recipe_input["recipe_html_path"], render_recipe_html(recipe, ingredients, nutrition_notes))
+    logger.debug(f"Rendered {recipe_input['recipe_html_path']}")
+    return True
+
+
+class _PaprikaDumper(yaml.SafeDumper):
+    """Dumper YAML écrivant les textes multi-lignes en blocs `|`, comme l'export Paprika."""
+
+
+def _represent_str(dumper, value):
+    style = "|" if "\n" in value else None
+    return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+
+_PaprikaDumper.add_representer(str, _represent_str)
+
+
+def structured_recipe_from_output(crew_output) -> Optional[StructuredRecipe]:
+    """
+    Recette structurée produite par la tâche `structured_recipe`.
+
+    Utilise la sortie pydantic de CrewAI, sinon valide le texte brut.
+
+    Returns:
+        Optional[StructuredRecipe]: None si la sortie est absente ou invalide
+    """
+    recipe = getattr(crew_output, "pydantic", None)
+    if isinstance(recipe, StructuredRecipe):
+        return recipe
+    raw = getattr(crew_output, "raw", None) or ""
+    try:
+        return StructuredRecipe.model_validate_json(strip_code_fences(raw))
+    except ValidationError as e:
+        logger.error(f"Invalid structured recipe output ({e.error_count()} errors)")
+        return None
+
+
+def write_recipe_files(recipe: StructuredRecipe, recipe_input: dict) -> None:
+    """
+    Écrit les trois fichiers d'une recette à partir de sa version structurée.
+
+    Args:
+        recipe: Recette structurée
+        recipe_input: Inputs de la recette (chemins `recipe_*_path`)
+    """
+    paprika = recipe.to_paprika().model_dump(mode="json")
+    write_output(recipe_input["recipe_yaml_path"],
+                 yaml.dump(paprika, Dumper=_PaprikaDumper, allow_unicode=True, sort_keys=False))
+    write_output(recipe_input["recipe_ingredients_path"],
+                 json.dumps([item.model_dump() for item in recipe.ingredients], ensure_ascii=False, indent=2))
+
+    context = recipe_context(paprika, recipe.ingredients, "\n".join(recipe.nutrition_tips))
+    if recipe.subtitle:
+        context["sous_titre"] = recipe.subtitle
+    write_output(recipe_input["recipe_html_path"], render_template(RECIPE_TEMPLATE, **context))
+    logger.debug(f"Wrote structured recipe files for {recipe_input['recipe_name']}")
+
+
+def render_menu_html(menu_json, adults: int, children: int, children_age) -> str:
+    """
+    Page HTML du menu de la semaine.
+
+    Args:
+        menu_json: Menu au format `MenuJson` (dict ou modèle), avec ou sans clé "menu"
+
+    Returns:
+        str: Page HTML complète
+    """
+    if isinstance(menu_json, str):
+        menu_json = json.loads(strip_code_fences(menu_json))
+    data = menu_json.model_dump() if hasattr(menu_json, "model_dump") else dict(menu_json or {})
+    menu = data.get("menu", data)
+
+    days = []
+    total_calories = 0
+    for day, name in DAY_NAMES.items():
+        meals = menu.get(day) or {}
+        day_meals = [meals.get(meal) or None for meal in MEALS]
+        total_calories += sum(int(meal.get("calories") or 0) for meal in day_meals if meal)
+        days.append({"nom": name, "repas": day_meals})
+
+    return render_template(MENU_TEMPLATE, jours=days, total_calories=total_calories,
+                           adults=adults, children=children, children_age=children_age)
+
+
+def shopping_list_context(categories) -> dict:
+    """Contexte des templates de liste de courses: rayons, couleurs et articles."""
+    return {
+        "rayons": [
+            {
+                "nom": category,
+                "couleur": CATEGORY_COLORS[index % len(CATEGORY_COLORS)],
+                "articles": [{"name": item.name, "quantite": format_quantity(item)} for item in items],
+            }
+            for index, (category, items) in enumerate(categories)
+        ]
+    }
+
+
+def render_shopping_list(ingredients: Iterable[RecipeIngredient], output_dir: str = "output") -> dict:
+    """
+    Écrit la liste de courses classée par rayon en HTML, Markdown et JSON.
+
+    Args:
+        ingredients: Ingrédients agrégés de la semaine
+        output_dir: Dossier de sortie de l'exécution
+
+    Returns:
+        dict: Chemins des fichiers écrits, par format
+    """
+    categories = categorize_ingredients(ingredients)
+    context = shopping_list_context(categories)
+    paths = {
+        "html": f"{output_dir}/shopping_crew/liste_courses.html",
+        "markdown": f"{output_dir}/shopping_crew/liste_courses.md",
+        "json": f"{output_dir}/shopping_crew/liste_courses.json",
+    }
+    write_output(paths["html"], render_template(SHOPPING_HTML_TEMPLATE, **context))
+    write_output(paths["markdown"], render_template(SHOPPING_MD_TEMPLATE, **context))
+    write_output(paths["json"], json.dumps(
+        [{"category": category, "ingredients": [item.model_dump() for item in items]} for category, items in categories],
+        ensure_ascii=False, indent=2,
+    ))
+    return paths
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, AnyHttpUrl
-from typing import Optional, List
+from pydantic import BaseModel, AnyHttpUrl, Field, TypeAdapter, ValidationError
+from typing import Any, Optional, List
 import os
 
 class RecipeList(BaseModel):
@@ -37,11 +37,21 @@ class RecipeOutput(BaseModel):
     recipe_html: str
     ingredients: list[RecipeIngredient]
 
+class FamilyProfile(BaseModel):
+    # One household of a batch run (see menu_planner.batch)
+    name: str
+    adults: int = 2
+    children: int = 0
+    children_age: int = 10
+    email: Optional[str] = None
+
 class MenuState(BaseModel):
     # Parameters
-    adults: int = int(os.getenv("ADULTS", "2"))
-    children_age: int = int(os.getenv("CHILDREN_AGE", "10"))
-    children: int = int(os.getenv("CHILDREN", "1"))
+    # Read when the state is created (after .env is loaded), not at import
+    adults: int = Field(default_factory=lambda: int(os.getenv("ADULTS", "2")))
+    children_age: int = Field(default_factory=lambda: int(os.getenv("CHILDREN_AGE", "10")))
+    children: int = Field(default_factory=lambda: int(os.getenv("CHILDREN", "1")))
+    output_dir: str = "output"
     menu_html: str = ""
     menu_json: Optional[MenuJson] = None
     # Recipe tracking lists
@@ -55,10 +65,14 @@ class MenuState(BaseModel):
     recipe_list: Optional[RecipeList] = None
     recipe_name: Optional[str] = None
     recipe_yamls: list[str] = []
-    send_to: str = os.getenv("MAILTO", "a@a.aa")
+    send_to: str = Field(default_factory=lambda: os.getenv("MAILTO", "a@a.aa"))
     sentence_count: int = 1
     # HTML generation result
     html_result: Optional[str] = None
+    shopping_list_result: Optional[Any] = None
+    # Checkpoint tracking (see menu_planner.checkpoint)
+    completed_steps: list[str] = []
+    completed_recipes: list[str] = []
 
 class PaprikaRecipe(BaseModel):
     name: str
@@ -75,4 +89,39 @@ class PaprikaRecipe(BaseModel):
     notes: Optional[str]
     photo: Optional[str]
     ingredients: str
-    directions: str
\ No newline at end of file
+    directions: str
+class StructuredRecipe(PaprikaRecipe):
+    # Complete recipe returned by a single task; the HTML page, the Paprika
+    # YAML and the ingredients JSON are derived from it (see menu_planner.rendering)
+    source: Optional[str] = None
+    # Kept as text so the task output stays JSON serializable; checked in to_paprika
+    source_url: Optional[str] = None
+    cook_time: Optional[str] = None
+    on_favorites: Optional[str] = None
+    categories: List[str] = []
+    nutritional_info: Optional[str] = None
+    rating: Optional[int] = None
+    notes: Optional[str] = None
+    photo: Optional[str] = None
+    subtitle: Optional[str] = None
+    ingredients: List[RecipeIngredient]
+    directions: List[str]
+    nutrition_tips: List[str] = []
+
+    def to_paprika(self) -> PaprikaRecipe:
+        """Version Paprika 3 (ingrédients et étapes en texte)."""
+        data = self.model_dump(exclude={"subtitle", "ingredients", "directions", "nutrition_tips"})
+        ingredients = "\n".join(
+            f"{item.quantity:g} {item.unit} {item.name}".replace("  ", " ").strip() for item in self.ingredients
+        )
+        directions = "\n".join(f"{number}. {step}" for number, step in enumerate(self.directions, start=1))
+        if data["source_url"]:
+            try:
+                TypeAdapter(AnyHttpUrl).validate_python(data["source_url"])
+            except ValidationError:
+                data["source_url"] = None
+        return PaprikaRecipe(**data, ingredients=ingredients, directions=directions)
+
+    def to_output(self, recipe_html: str) -> RecipeOutput:
+        """Version `RecipeOutput` (HTML rendu et ingrédients structurés)."""
+        return RecipeOutput(recipe_html=recipe_html, ingredients=self.ingredients)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+"""
+HTTP client - Couche HTTP partagée par les outils de recherche et de scraping
+
+Ce module fournit aux outils (SafeSerperTool, ScrapeNinjaTool) :
+- une session `requests` unique avec pool de connexions keep-alive
+- un client `httpx` asynchrone par boucle d'événements pour les variantes `_arun`
+- des reprises avec backoff exponentiel et gigue sur 429/5xx, en respectant `Retry-After`
+- l'ordonnancement des appels par API (quotas et concurrence partagés, voir menu_planner.ratelimit)
+- un cache disque (SQLite) des réponses avec durée de vie, indexé sur la requête normalisée
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from menu_planner import ratelimit
+from menu_planner.config import config
+
+logger = logging.getLogger("menu_planner.http")
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HttpStatusError(Exception):
+    """Erreur HTTP définitive (statut non récupérable ou reprises épuisées)."""
+
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+def normalize_query(query: str) -> str:
+    """Normalise une requête de recherche: minuscules et espaces condensés."""
+    return " ".join(str(query).lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalise une URL pour l'indexation du cache.
+
+    Le schéma et l'hôte sont mis en minuscules, le fragment et les paramètres
+    de suivi (`utm_*`) supprimés, et les paramètres restants triés.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def cache_key(url: str, payload: dict) -> str:
+    """Clé de cache d'une requête POST JSON (les en-têtes, dont les clés API, sont exclus)."""
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{url}\n{body}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Cache SQLite des corps de réponse HTTP avec expiration."""
+
+    def __init__(self, path: Path, ttl: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,))
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ? AND created_at >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, body: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, body, time.time()))
+            self._conn.commit()
+
+
+_session: Optional[requests.Session] = None
+_response_cache: Optional[ResponseCache] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_init_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Session `requests` partagée, avec pool de connexions keep-alive."""
+    global _session
+    with _init_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=config.http.pool_size, pool_maxsize=config.http.pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Client `httpx` asynchrone partagé pour la boucle d'événements courante."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(max_connections=config.http.pool_size, max_keepalive_connections=config.http.pool_size)
+        client = httpx.AsyncClient(limits=limits, timeout=config.http.timeout)
+        _async_clients[loop] = client
+    return client
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Cache de réponses partagé, ou None s'il est désactivé."""
+    global _response_cache
+    if not config.http.cache_enabled:
+        return None
+    with _init_lock:
+        if _response_cache is None:
+            try:
+                _response_cache = ResponseCache(config.http.cache_path, config.http.cache_ttl)
+            except sqlite3.Error as e:
+                logger.error(f"HTTP response cache unavailable: {str(e)}")
+                return None
+    return _response_cache
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Délai avant la prochaine tentative: `Retry-After` si fourni, sinon backoff exponentiel avec gigue."""
+    if retry_after:
+        try:
+            return min(float(retry_after), config.http.max_backoff)
+        except ValueError:
+            pass
+    base = config.http.backoff * (2 ** attempt)
+    return min(random.uniform(0, base), config.http.max_backoff)
+
+
+def post_json(url: str, headers: Dict[str, str], payload: dict, timeout: Optional[float] = None,
+              cache_key_payload: Optional[dict] = None, rate_limit: Optional[str] = None) -> str:
+    """
+    Envoie une requête POST JSON avec cache, pool de connexions et reprises.
+
+    Args:
+        url: URL de l'API
+        headers: En-têtes HTTP (non inclus dans la clé de cache)
+        payload: Corps JSON envoyé
+        timeout: Délai de la requête (par défaut `config.http.timeout`)
+        cache_key_payload: Version normalisée du corps utilisée pour la clé de cache
+        rate_limit: Limiteur de débit de l'API (`serper`, `rapidapi`), aucun si None
+
+    Returns:
+        str: Corps de la réponse
+
+    Raises:
+        HttpStatusError: Statut d'erreur définitif
+        requests.RequestException: Erreur réseau persistante
+    """
+    response_cache = get_response_cache()
+    key = cache_key(url, cache_key_payload or payload)
+    if response_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            logger.debug(f"HTTP cache hit for {url}")
+            return cached
+
+    session = get_session()
+    timeout = timeout or config.http.timeout
+    for attempt in range(config.http.max_retries + 1):
+        last_attempt = attempt == config.http.max_retries
+        try:
+            with ratelimit.slot(rate_limit) as call:
+                response = session.post(url, headers=headers, json=payload, timeout=timeout)
+                if response.status_code == 429:
+                    call.throttled(response.headers.get("Retry-After"))
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if last_attempt:
+                raise
+            logger.warning(f"HTTP error for {url} ({str(e)}), retrying")
+            time.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+            delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"HTTP {response.status_code} for {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if response.status_code >= 400:
+            raise HttpStatusError(response.status_code, url)
+        if response_cache:
+            response_cache.put(key, response.text)
+        return response.text
+    raise HttpStatusError(0, url)  # unreachable: the last attempt returns or raises
+
+
+async def apost_json(url: str, headers: Dict[str, str], payload: dict, timeout: Optional[float] = None,
+                     cache_key_payload: Optional[dict] = None, rate_limit: Optional[str] = None) -> str:
+    """Variante asynchrone de `post_json`, sans bloquer la boucle d'événements."""
+    response_cache = get_response_cache()
+    key = cache_key(url, cache_key_payload or payload)
+    if response_cache:
+        cached = await asyncio.to_thread(response_cache.get, key)
+        if cached is not None:
+            logger.debug(f"HTTP cache hit for {url}")
+            return cached
+
+    client = get_async_client()
+    timeout = timeout or config.http.timeout
+    for attempt in range(config.http.max_retries + 1):
+        last_attempt = attempt == config.http.max_retries
+        try:
+            async with ratelimit.aslot(rate_limit) as call:
+                response = await client.post(url, headers=headers, json=payload, timeout=timeout)
+                if response.status_code == 429:
+                    call.throttled(response.headers.get("Retry-After"))
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            logger.warning(f"HTTP error for {url} ({str(e)}), retrying")
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        if response.status_code in RETRY_STATUS_CODES and not last_attempt:
+            delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(f"HTTP {response.status_code} for {url}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        if response.status_code >= 400:
+            raise HttpStatusError(response.status_code, url)
+        if response_cache:
+            await asyncio.to_thread(response_cache.put, key, response.text)
+        return response.text
+    raise HttpStatusError(0, url)  # unreachable: the last attempt returns or raises
@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+"""
+Recipe extractor - Extraction locale des pages de recettes récupérées par ScrapeNinja
+
+ScrapeNinja renvoie une enveloppe JSON (`info`, `body`) contenant la page HTML
+complète : navigation, publicités, scripts... Passée telle quelle à l'agent,
+elle coûte des milliers de tokens par appel. Ce module en extrait, sans appel
+réseau ni dépendance supplémentaire (`html.parser`) :
+- la recette schema.org (`Recipe`) en JSON-LD, sinon en microdata :
+  ingrédients, étapes, temps, portions, nutrition
+- à défaut, le texte principal de la page, à la manière de readability
+  (`<article>`/`<main>`, blocs de navigation et liens écartés)
+
+Le résultat est un JSON compact, limité à `config.http.scrape_max_chars`
+caractères. Les tailles avant et après extraction sont reportées dans les mesures.
+"""
+
+import html
+import json
+import logging
+import re
+from html.parser import HTMLParser
+from typing import Any, List, Optional
+
+from menu_planner.config import config
+from menu_planner.metrics import get_metrics
+
+logger = logging.getLogger("menu_planner.recipe_extractor")
+
+_ISO_DURATION = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_BOILERPLATE = re.compile(r"comment|cookie|consent|footer|header|menu|nav|sidebar|share|social|advert|promo|"
+                          r"newsletter|related|breadcrumb|popup|banner", re.IGNORECASE)
+
+_SKIPPED_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe",
+                 "button", "select", "template"}
+_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "blockquote", "pre", "dt", "dd",
+               "div", "section", "article", "main", "tr", "ul", "ol", "table", "figcaption", "br"}
+# Balises refermées implicitement par l'ouverture d'une autre (`<li>` sans `</li>`...)
+_IMPLIED_END = {"li": {"li"}, "p": {"p"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"}, "tr": {"tr", "td", "th"},
+                "td": {"td", "th"}, "th": {"td", "th"}, "option": {"option"}}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Champs de la recette retenus, dans l'ordre de sortie
+_RECIPE_TEXT_FIELDS = ["name", "description", "recipeYield", "recipeCategory", "recipeCuisine", "keywords",
+                       "author", "datePublished"]
+_RECIPE_TIME_FIELDS = ["prepTime", "cookTime", "totalTime"]
+# Champs retirés, dans l'ordre, quand la recette dépasse encore la limite sans ingrédients ni étapes
+_CAP_DROPPED_FIELDS = ["rating", "datePublished", "author", "keywords", "recipeCuisine", "recipeCategory",
+                       "description", "nutrition", "totalTime", "cookTime", "prepTime", "recipeYield",
+                       "ingredients", "instructions"]
+
+# En-dessous de ce nombre de caractères, le contenu d'<article>/<main> ne suffit pas et toute la page est utilisée
+MIN_MAIN_CONTENT = 500
+
+
+def clean_text(value: Any) -> str:
+    """Texte sans balises ni entités HTML, espaces condensés."""
+    return " ".join(html.unescape(_TAG.sub(" ", str(value))).split())
+
+
+def format_duration(value: Any) -> str:
+    """
+    Durée ISO 8601 lisible (`PT1H30M` -> `1 h 30 min`).
+
+    Returns:
+        str: Durée formatée, ou la valeur d'origine si elle n'est pas au format ISO 8601
+    """
+    text = clean_text(value)
+    match = _ISO_DURATION.match(text)
+    if not match or not any(match.groups()):
+        return text
+    days, hours, minutes, seconds = (float(part or 0) for part in match.groups())
+    total = int(days * 1440 + hours * 60 + minutes + seconds / 60)
+    hours, minutes = divmod(total, 60)
+    if hours and minutes:
+        return f"{hours} h {minutes:02d} min"
+    return f"{hours} h" if hours else f"{minutes} min"
+
+
+def _types(node: dict) -> List[str]:
+    value = node.get("@type") or node.get("type") or []
+    return [str(item).rsplit("/", 1)[-1].lower() for item in (value if isinstance(value, list) else [value])]
+
+
+def find_recipe(data: Any) -> Optional[dict]:
+    """Premier objet schema.org `Recipe` d'un document JSON-LD (listes, `@graph` et `mainEntity` compris)."""
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_recipe(item)
+            if recipe is not None:
+                return recipe
+    elif isinstance(data, dict):
+        if "recipe" in _types(data):
+            return data
+        for key in ("@graph", "mainEntity", "mainEntityOfPage", "itemListElement", "item"):
+            if key in data:
+                recipe = find_recipe(data[key])
+                if recipe is not None:
+                    return recipe
+    return None
+
+
+def _name(value: Any) -> str:
+    """Nom d'une valeur schema.org (texte, objet `Person`/`Thing` ou liste)."""
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_name(item) for item in value)))
+    if isinstance(value, dict):
+        return clean_text(value.get("name") or value.get("text") or "")
+    return clean_text(value)
+
+
+def _instructions(value: Any) -> List[str]:
+    """Étapes à plat d'un `recipeInstructions` (texte, `HowToStep`, `HowToSection`)."""
+    if isinstance(value, list):
+        return [step for item in value for step in _instructions(item)]
+    if isinstance(value, dict):
+        if "itemListElement" in value:
+            steps = _instructions(value["itemListElement"])
+            section = clean_text(value.get("name") or "")
+            return [f"{section} : {steps[0]}"] + steps[1:] if section and steps else steps
+        return _instructions(value.get("text") or value.get("name") or "")
+    text = html.unescape(str(value))
+    # Étapes regroupées dans un seul texte, séparées par des paragraphes ou des retours à la ligne
+    parts = re.split(r"<(?:br|/p|/li)[^>]*>|\n+", text, flags=re.IGNORECASE)
+    return [step for step in (clean_text(part) for part in parts) if step]
+
+
+def normalize_recipe(data: dict) -> dict:
+    """
+    Recette schema.org réduite aux champs utiles à l'agent.
+
+    Returns:
+        dict: Champs texte, temps lisibles, `ingredients`, `instructions` et `nutrition`
+    """
+    recipe = {}
+    for field in _RECIPE_TEXT_FIELDS:
+        value = data.get(field)
+        if isinstance(value, list) and field not in ("author", "keywords"):
+            value = value[0] if value else None
+        text = _name(value) if value not in (None, "") else ""
+        if text:
+            recipe[field] = text
+    for field in _RECIPE_TIME_FIELDS:
+        if data.get(field):
+            recipe[field] = format_duration(data[field])
+    ingredients = data.get("recipeIngredient") or data.get("ingredients") or []
+    recipe["ingredients"] = [text for text in (clean_text(item) for item in
+                                               (ingredients if isinstance(ingredients, list) else [ingredients]))
+                             if text]
+    recipe["instructions"] = _instructions(data.get("recipeInstructions") or [])
+    nutrition = data.get("nutrition")
+    if isinstance(nutrition, list):
+        nutrition = nutrition[0] if nutrition else None
+    if isinstance(nutrition, dict):
+        recipe["nutrition"] = {key: clean_text(value) for key, value in nutrition.items()
+                               if not key.startswith("@") and key != "type" and value not in (None, "", [])}
+    rating = data.get("aggregateRating")
+    if isinstance(rating, dict) and rating.get("ratingValue"):
+        count = rating.get("ratingCount") or rating.get("reviewCount") or "?"
+        recipe["rating"] = f"{clean_text(rating['ratingValue'])} ({clean_text(count)} avis)"
+    return recipe
+
+
+class _PageParser(HTMLParser):
+    """
+    Lecture en une passe d'une page : titre, scripts JSON-LD, items microdata et blocs de texte.
+
+    Attributs:
+        json_ld: Contenu des balises `<script type="application/ld+json">`
+        items: Items microdata racines (`type`, `properties`)
+        blocks: Blocs de texte (`text`, `in_main`, `link_chars`) hors navigation et scripts
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.description = ""
+        self.json_ld: List[str] = []
+        self.items: List[dict] = []
+        self.blocks: List[dict] = []
+        # Éléments ouverts : (balise, effets à annuler à la fermeture)
+        self._stack: List[tuple] = []
+        self._scopes: List[dict] = []
+        self._captures: List[list] = []
+        self._skip = 0
+        self._main = 0
+        self._link = 0
+        self._buffer: List[str] = []
+        self._link_chars = 0
+        self._in_title = False
+        self._script: Optional[List[str]] = None
+
+    def _flush(self) -> None:
+        for _, parts in self._captures:
+            parts.append("\n")
+        text = " ".join("".join(self._buffer).split())
+        if text:
+            self.blocks.append({"text": text, "in_main": self._main > 0, "link_chars": self._link_chars})
+        self._buffer, self._link_chars = [], 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {key: value or "" for key, value in attrs}
+        if tag == "meta" and attrs.get("name", "").lower() in ("description", "og:description") \
+                and not self.description:
+            self.description = clean_text(attrs.get("content", ""))
+        if self._stack and self._stack[-1][0] in _IMPLIED_END.get(tag, {"p"} if tag in _BLOCK_TAGS else ()):
+            self._close(*self._stack.pop())
+        effects = set()
+        if tag == "script" and "ld+json" in attrs.get("type", "").lower():
+            self._script = []
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        marker = f"{attrs.get('id', '')} {attrs.get('class', '')} {attrs.get('role', '')}"
+        if tag in _SKIPPED_TAGS or (tag in ("div", "section", "ul") and _BOILERPLATE.search(marker)
+                                    and not self._scopes):
+            self._skip += 1
+            effects.add("skip")
+        if tag in ("article", "main") or attrs.get("role") == "main":
+            self._main += 1
+            effects.add("main")
+        if tag == "a":
+            self._link += 1
+            effects.add("link")
+        if tag == "title":
+            self._in_title = True
+
+        prop = attrs.get("itemprop", "").split()[0] if attrs.get("itemprop", "").strip() else ""
+        if "itemscope" in attrs:
+            self._scopes.append({"type": attrs.get("itemtype", ""), "properties": {}, "prop": prop})
+            effects.add("scope")
+        elif prop and self._scopes:
+            value = next((attrs[key] for key in ("content", "datetime") if attrs.get(key)), None)
+            if value is None and tag in ("link", "img", "source"):
+                value = attrs.get("href") or attrs.get("src")
+            if value is not None or tag in _VOID_TAGS:
+                self._add_property(prop, clean_text(value or ""))
+            else:
+                self._captures.append([prop, []])
+                effects.add("capture")
+        if tag in _VOID_TAGS:
+            self._close(tag, effects)
+        else:
+            self._stack.append((tag, effects))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS and self._stack and self._stack[-1][0] == tag:
+            self._close(*self._stack.pop())
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            self.json_ld.append("".join(self._script))
+            self._script = None
+        if tag == "title":
+            self._in_title = False
+        # Les balises non fermées (<p>, <li>...) sont refermées avec leur parent
+        if not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, effects = self._stack.pop()
+            self._close(open_tag, effects)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag, effects):
+        if tag in _BLOCK_TAGS:
+            self._flush()
+        if "capture" in effects:
+            prop, parts = self._captures.pop()
+            lines = (" ".join(line.split()) for line in "".join(parts).splitlines())
+            self._add_property(prop, "\n".join(line for line in lines if line))
+        if "scope" in effects:
+            scope = self._scopes.pop()
+            item = {"type": scope["type"], "properties": scope["properties"]}
+            if scope["prop"] and self._scopes:
+                self._add_property(scope["prop"], item)
+            elif not self._scopes:
+                self.items.append(item)
+        if "skip" in effects:
+            self._skip -= 1
+        if "main" in effects:
+            self._main -= 1
+        if "link" in effects:
+            self._link -= 1
+
+    def _add_property(self, prop: str, value: Any) -> None:
+        if value in ("", None) or not self._scopes:
+            return
+        self._scopes[-1]["properties"].setdefault(prop, []).append(value)
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+            return
+        if self._in_title:
+            self.title += data
+            return
+        for _, parts in self._captures:
+            parts.append(data)
+        if not self._skip:
+            self._buffer.append(data)
+            if self._link:
+                self._link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _microdata_to_jsonld(item: dict) -> dict:
+    """Item microdata converti en dictionnaire au format JSON-LD (`@type`, propriétés)."""
+    data = {"@type": item["type"]}
+    for prop, values in item["properties"].items():
+        values = [_microdata_to_jsonld(value) if isinstance(value, dict) else value for value in values]
+        list_valued = prop in ("recipeIngredient", "ingredients", "recipeInstructions", "itemListElement")
+        data[prop] = values if list_valued or len(values) > 1 else values[0]
+    return data
+
+
+def main_content(blocks: List[dict]) -> str:
+    """
+    Texte principal de la page à partir de ses blocs, à la manière de readability.
+
+    Les blocs d'`<article>`/`<main>` sont préférés s'ils sont assez longs ; les
+    blocs composés surtout de liens et les doublons sont écartés.
+
+    Returns:
+        str: Paragraphes séparés par des retours à la ligne
+    """
+    main_blocks = [block for block in blocks if block["in_main"]]
+    if sum(len(block["text"]) for block in main_blocks) >= MIN_MAIN_CONTENT:
+        blocks = main_blocks
+    seen, lines = set(), []
+    for block in blocks:
+        text = block["text"]
+        if block["link_chars"] > 0.5 * len(text) or text in seen or len(text) < 3:
+            continue
+        seen.add(text)
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def extract_page(page: str, url: str = "") -> dict:
+    """
+    Recette schema.org d'une page HTML, sinon son texte principal.
+
+    Returns:
+        dict: `url`, `source` (`json-ld`, `microdata` ou `content`) et `recipe` ou `title`/`content`
+    """
+    parser = _PageParser()
+    try:
+        parser.feed(page)
+        parser.close()
+    except Exception as e:  # html.parser tolère presque tout, mais une page tronquée peut le faire échouer
+        logger.warning(f"HTML parsing of {url or 'page'} stopped early: {str(e)}")
+    for script in parser.json_ld:
+        try:
+            recipe = find_recipe(json.loads(script.strip().rstrip(";")))
+        except json.JSONDecodeError:
+            continue
+        if recipe is not None:
+            return {"url": url, "source": "json-ld", "recipe": normalize_recipe(recipe)}
+    for item in parser.items:
+        recipe = find_recipe(_microdata_to_jsonld(item))
+        if recipe is not None:
+            return {"url": url, "source": "microdata", "recipe": normalize_recipe(recipe)}
+    return {"url": url, "source": "content", "title": clean_text(parser.title),
+            "description": parser.description, "content": main_content(parser.blocks)}
+
+
+def _dumps(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def cap_payload(payload: dict, max_chars: int) -> str:
+    """
+    JSON compact du résultat, réduit à `max_chars` caractères au plus.
+
+    Les textes longs sont raccourcis, puis les dernières étapes et les derniers
+    ingrédients retirés, enfin les champs secondaires de la recette ; `truncated`
+    signale alors la réduction.
+
+    Returns:
+        str: Résultat au format JSON
+    """
+    text = _dumps(payload)
+    if not max_chars or len(text) <= max_chars:
+        return text
+    payload = json.loads(text)
+    payload["truncated"] = True
+    recipe = payload.get("recipe")
+    if recipe is None:
+        # Texte principal coupé à la place restante, puis la description et le titre si cela ne suffit pas
+        for field in ("content", "description", "title"):
+            excess = len(_dumps(payload)) - max_chars
+            if excess <= 0:
+                break
+            text = payload.get(field, "")
+            payload[field] = text[:max(0, len(text) - excess - 1)].rstrip() + "…" if len(text) > excess else ""
+        return _dumps(payload)
+    for field in ("description", "keywords"):
+        if len(recipe.get(field, "")) > 300:
+            recipe[field] = recipe[field][:300].rstrip() + "…"
+    recipe["instructions"] = [step if len(step) <= 400 else step[:400].rstrip() + "…"
+                              for step in recipe.get("instructions", [])]
+    for field in ("instructions", "ingredients"):
+        while len(_dumps(payload)) > max_chars and recipe.get(field):
+            recipe[field].pop()
+    # Limite très basse : les champs secondaires sont retirés à leur tour, le nom de la recette en dernier
+    for field in _CAP_DROPPED_FIELDS:
+        if len(_dumps(payload)) <= max_chars:
+            break
+        recipe.pop(field, None)
+    return _dumps(payload)
+
+
+def compact_scrape_response(body: str, url: str = "", max_chars: Optional[int] = None) -> str:
+    """
+    Réponse ScrapeNinja réduite à la recette ou au texte principal de la page.
+
+    Args:
+        body: Enveloppe JSON de ScrapeNinja (`info`, `body`), ou directement la page HTML
+        url: URL demandée, reprise dans le résultat
+        max_chars: Taille maximale du résultat (par défaut `config.http.scrape_max_chars`)
+
+    Returns:
+        str: Résultat au format JSON compact
+    """
+    max_chars = config.http.scrape_max_chars if max_chars is None else max_chars
+    page, status = body, None
+    try:
+        envelope = json.loads(body)
+    except (json.JSONDecodeError, TypeError):
+        envelope = None
+    if isinstance(envelope, dict) and "body" in envelope:
+        info = envelope.get("info") or {}
+        status = info.get("statusCode")
+        url = info.get("finalUrl") or url
+        if envelope.get("extractor") is not None:
+            # Extracteur JavaScript demandé par l'agent : son résultat est déjà structuré
+            payload = {"url": url, "source": "extractor", "result": envelope["extractor"]}
+            result = cap_payload(payload, max_chars)
+            get_metrics().record_extraction("extractor", len(body), len(result))
+            return result
+        page = envelope.get("body") or ""
+    payload = extract_page(page, url)
+    if status and status >= 400:
+        payload["status"] = status
+    result = cap_payload(payload, max_chars)
+    get_metrics().record_extraction(payload["source"], len(body), len(result))
+    logger.debug(f"Extracted {payload['source']} from {url}: {len(body)} -> {len(result)} chars")
+    return result
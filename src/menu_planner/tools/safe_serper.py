@@ -7,57 +7,97 @@ and ensure proper type conversion to prevent validation errors when used by AI a
 """
 
 from crewai.tools import BaseTool
-import requests
+import json
 import os
 
+from menu_planner.metrics import track_tool
+from menu_planner.tools import singleflight
+from menu_planner.tools.http_client import apost_json, normalize_query, post_json
+
+SERPER_URL = "https://google.serper.dev/search"
+
 
 class SafeSerperTool(BaseTool):
     """A robust web search tool with improved error handling"""
     name: str = "search_internet"
     description: str = "A tool to search the internet for up-to-date information on any topic. Use this tool when you need current data or facts about events, people, or concepts."
     
-    
-    def _run(self, search_query: str) -> str:
-        """Execute the search query with error handling"""
-        # Validation and normalization
+    @staticmethod
+    def _coerce_query(search_query) -> str:
+        """Convert the various input formats sent by agents to a plain query string"""
         if not search_query or not isinstance(search_query, str):
             if isinstance(search_query, dict) and 'search_query' in search_query:
-                search_query = search_query['search_query']
+                return search_query['search_query']
             elif isinstance(search_query, dict) and 'description' in search_query:
-                search_query = search_query['description']
-            else:
-                search_query = str(search_query)
+                return search_query['description']
+            return str(search_query)
+        return search_query
+    
+    @staticmethod
+    def _format_results(search_query: str, data: dict) -> str:
+        """Format the results in a user-friendly way"""
+        result = f"Search results for: {search_query}\n\n"
         
-        # API call
+        if 'organic' in data:
+            for i, item in enumerate(data['organic'][:5], 1):
+                result += f"{i}. {item.get('title', 'No title')}\n"
+                result += f"   {item.get('snippet', 'No description')}\n"
+                result += f"   URL: {item.get('link', 'No link')}\n\n"
+        
+        return result
+    
+    def _request(self, search_query: str):
+        """Build the request arguments shared by the sync and async versions"""
         api_key = os.getenv("SERPER_API_KEY")
         if not api_key:
+            return None
+        headers = {
+            'X-API-KEY': api_key,
+            'Content-Type': 'application/json'
+        }
+        payload = {"q": " ".join(search_query.split())}
+        return headers, payload, {"q": normalize_query(search_query)}
+    
+    def _run(self, search_query: str) -> str:
+        """Execute the search query with error handling"""
+        search_query = self._coerce_query(search_query)
+        request = self._request(search_query)
+        if request is None:
             return "Error: SERPER_API_KEY environment variable not set"
+        headers, payload, key_payload = request
         
-        try:
-            response = requests.post(
-                "https://google.serper.dev/search",
-                headers={
-                    'X-API-KEY': api_key,
-                    'Content-Type': 'application/json'
-                },
-                json={"q": search_query}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Format the results in a user-friendly way
-            result = f"Search results for: {search_query}\n\n"
-            
-            if 'organic' in data:
-                for i, item in enumerate(data['organic'][:5], 1):
-                    result += f"{i}. {item.get('title', 'No title')}\n"
-                    result += f"   {item.get('snippet', 'No description')}\n"
-                    result += f"   URL: {item.get('link', 'No link')}\n\n"
-            
-            return result
-        except Exception as e:
-            return f"Error performing search: {str(e)}"
+        with track_tool(self.name) as status:
+            try:
+                def search():
+                    body = post_json(SERPER_URL, headers, payload, cache_key_payload=key_payload,
+                                     rate_limit="serper")
+                    return json.loads(body)
+
+                # Identical or near-identical queries from concurrent agents share one call; each
+                # caller formats the shared results under its own query
+                data = singleflight.do("serper", singleflight.normalize_search_query(search_query), search)
+                return self._format_results(search_query, data)
+            except Exception as e:
+                status["ok"] = False
+                return f"Error performing search: {str(e)}"
     
     async def _arun(self, search_query: str) -> str:
-        """Async version of the run method"""
-        return self._run(search_query)
+        """Async version of the run method, using the shared async HTTP client"""
+        search_query = self._coerce_query(search_query)
+        request = self._request(search_query)
+        if request is None:
+            return "Error: SERPER_API_KEY environment variable not set"
+        headers, payload, key_payload = request
+        
+        with track_tool(self.name) as status:
+            try:
+                async def search():
+                    body = await apost_json(SERPER_URL, headers, payload, cache_key_payload=key_payload,
+                                            rate_limit="serper")
+                    return json.loads(body)
+
+                data = await singleflight.ado("serper", singleflight.normalize_search_query(search_query), search)
+                return self._format_results(search_query, data)
+            except Exception as e:
+                status["ok"] = False
+                return f"Error performing search: {str(e)}"
@@ -1,10 +1,16 @@
 from crewai.tools import BaseTool
 from typing import Type, List, Optional
 from pydantic import BaseModel, Field
-import requests
-import json
 import os
 
+from menu_planner.config import config
+from menu_planner.metrics import track_tool
+from menu_planner.tools import singleflight
+from menu_planner.tools.http_client import apost_json, normalize_url, post_json
+from menu_planner.tools.recipe_extractor import compact_scrape_response
+
+SCRAPENINJA_URL = "https://scrapeninja.p.rapidapi.com/scrape"
+
 
 class ScrapeNinjaInput(BaseModel):
     """Input schema for ScrapeNinja tool with advanced options"""
@@ -22,16 +28,16 @@ class ScrapeNinjaInput(BaseModel):
 
 class ScrapeNinjaTool(BaseTool):
     name: str = "ScrapeNinja"
-    description: str = "Scrapes website content using the ScrapeNinja API with advanced options"
+    description: str = ("Scrapes website content using the ScrapeNinja API with advanced options. "
+                        "Returns compact JSON: the schema.org recipe of the page (ingredients, instructions, "
+                        "times, yield, nutrition) when there is one, otherwise its main text.")
     args_schema: Type[BaseModel] = ScrapeNinjaInput
 
-    def _run(self, **kwargs) -> str:
-        """Scrape a website using ScrapeNinja API with advanced options"""
-        api_url = "https://scrapeninja.p.rapidapi.com/scrape"
+    def _request(self, **kwargs):
+        """Build headers and payload shared by the sync and async versions"""
         api_key = os.getenv("RAPIDAPI_KEY")
-        
         if not api_key:
-            return "Error: RAPIDAPI_KEY environment variable not set"
+            return None
             
         headers = {
             "Content-Type": "application/json",
@@ -61,12 +67,59 @@ class ScrapeNinjaTool(BaseTool):
         if "extractor" in kwargs and kwargs["extractor"]:
             payload["extractor"] = kwargs["extractor"]
         
-        try:
-            response = requests.post(api_url, headers=headers, data=json.dumps(payload))
-            response.raise_for_status()
-            return response.text
-        except Exception as e:
-            return f"Error scraping {kwargs['url']}: {str(e)}"
+        # The cache is keyed on the normalized URL plus the options that change the output
+        key_payload = {k: v for k, v in payload.items() if k not in ("retryNum", "timeout")}
+        key_payload["url"] = normalize_url(kwargs["url"])
+        
+        # ScrapeNinja retries and times out on its side; allow for it on ours
+        http_timeout = (payload["timeout"] or 8) * max(1, payload["retryNum"] or 1) + 5
+        return headers, payload, key_payload, http_timeout
+
+    @staticmethod
+    def _compact(body: str, url: str) -> str:
+        """Recipe or main text of the page instead of the raw ScrapeNinja envelope"""
+        if not config.http.scrape_extract:
+            return body
+        return compact_scrape_response(body, url)
+
+    def _run(self, **kwargs) -> str:
+        """Scrape a website using ScrapeNinja API with advanced options"""
+        request = self._request(**kwargs)
+        if request is None:
+            return "Error: RAPIDAPI_KEY environment variable not set"
+        headers, payload, key_payload, http_timeout = request
+        
+        with track_tool(self.name) as status:
+            try:
+                def scrape():
+                    body = post_json(SCRAPENINJA_URL, headers, payload, timeout=http_timeout,
+                                     cache_key_payload=key_payload, rate_limit="rapidapi")
+                    return self._compact(body, kwargs["url"])
+
+                # Concurrent agents scraping the same page share one call
+                return singleflight.do("scrapeninja", singleflight.request_key(key_payload), scrape)
+            except Exception as e:
+                status["ok"] = False
+                return f"Error scraping {kwargs['url']}: {str(e)}"
+
+    async def _arun(self, **kwargs) -> str:
+        """Async version of the run method, using the shared async HTTP client"""
+        request = self._request(**kwargs)
+        if request is None:
+            return "Error: RAPIDAPI_KEY environment variable not set"
+        headers, payload, key_payload, http_timeout = request
+        
+        with track_tool(self.name) as status:
+            try:
+                async def scrape():
+                    body = await apost_json(SCRAPENINJA_URL, headers, payload, timeout=http_timeout,
+                                            cache_key_payload=key_payload, rate_limit="rapidapi")
+                    return self._compact(body, kwargs["url"])
+
+                return await singleflight.ado("scrapeninja", singleflight.request_key(key_payload), scrape)
+            except Exception as e:
+                status["ok"] = False
+                return f"Error scraping {kwargs['url']}: {str(e)}"
 
 
 def test_scrapeninja():
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Single flight - Appels d'outils identiques partagés entre les crews
+
+Avec les recettes en parallèle, `culinary_expert`, `nutritionist` et
+`formatting_specialist` lancent souvent au même moment des recherches
+identiques ou presque (« Poulet basquaise recette » / « recette poulet
+basquaise »). Le cache disque (voir http_client) n'aide qu'une fois la
+première réponse reçue : d'ici là, chaque agent paie son propre appel.
+
+Ce module place devant `SafeSerperTool` et `ScrapeNinjaTool` :
+- un normaliseur de requêtes : casse, accents, ponctuation, mots vides,
+  ordre et répétition des mots sont ignorés (voir `normalize_search_query`)
+- une couche « single flight » : un seul appel en cours par clé, que les
+  demandes concurrentes attendent (`coalesced`)
+- une mémoire LRU des résultats, avec durée de vie, qui répond aux demandes
+  suivantes sans appel (`hit`)
+
+Deux requêtes de même forme canonique pouvant différer par leur texte, le
+résultat partagé ne doit pas le reprendre : `SafeSerperTool` partage les
+données décodées de la réponse et chaque appelant les présente sous sa propre
+requête. Les scrapes, eux, ne sont partagés que pour une URL et des options
+identiques.
+
+Les erreurs ne sont pas mémorisées : elles sont transmises aux demandes en
+attente, et la demande suivante relance l'appel. Les compteurs `hits`,
+`misses` et `coalesced` de chaque outil figurent dans les mesures de l'exécution.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from menu_planner.config import config
+from menu_planner.metrics import get_metrics
+
+logger = logging.getLogger("menu_planner.singleflight")
+
+# Mots sans effet sur les résultats d'une recherche de recettes
+STOPWORDS = {
+    "a", "au", "aux", "avec", "d", "de", "des", "du", "en", "et", "l", "la", "le", "les", "pour", "un", "une",
+    "an", "and", "for", "of", "the", "with",
+}
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    Forme canonique d'une requête de recherche, commune aux requêtes quasi identiques.
+
+    Les mots sont traités comme un ensemble : leur ordre et leurs répétitions
+    sont ignorés. « poulet au curry » et « curry au poulet » partagent donc
+    leurs résultats, comme « recette poulet basquaise » et « poulet basquaise
+    recette ». Pour des recherches de recettes, un moteur renvoie pour ces
+    variantes les mêmes pages ; le rare plat dont le sens dépend de l'ordre
+    reçoit les résultats de l'autre formulation, au profit d'appels économisés.
+
+    Returns:
+        str: Mots sans accents ni ponctuation, hors mots vides, dédoublonnés et triés
+    """
+    text = unicodedata.normalize("NFKD", str(query).lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    words = {word for word in re.findall(r"\w+", text) if word not in STOPWORDS}
+    return " ".join(sorted(words)) or " ".join(str(query).lower().split())
+
+
+def request_key(payload: dict) -> str:
+    """Clé d'une requête à partir de son corps normalisé (options comprises)."""
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+
+class SingleFlight:
+    """
+    Appels partagés d'un outil : un seul en cours par clé, résultats récents mémorisés.
+
+    Attributs:
+        name: Nom de l'outil, repris dans les mesures
+        max_entries: Nombre de résultats mémorisés (les moins récemment utilisés sont évincés)
+        ttl: Durée de vie d'un résultat en secondes (0 pour aucune limite)
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, ttl: int = 3600):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        # clé -> (horodatage, résultat), du moins au plus récemment utilisé
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def _lookup(self, key: str) -> Tuple[str, Any]:
+        """
+        Issue d'une demande : résultat mémorisé, appel en cours à attendre, ou appel à lancer.
+
+        Returns:
+            Tuple[str, Any]: (`hit`, résultat), (`coalesced`, Future) ou (`miss`, Future à compléter)
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                if not self.ttl or time.monotonic() - cached[0] <= self.ttl:
+                    self._results.move_to_end(key)
+                    outcome, value = "hit", cached[1]
+                else:
+                    del self._results[key]
+                    cached = None
+            if cached is None:
+                future = self._in_flight.get(key)
+                if future is not None:
+                    outcome, value = "coalesced", future
+                else:
+                    outcome, value = "miss", self._in_flight.setdefault(key, Future())
+        get_metrics().record_tool_cache(self.name, outcome)
+        return outcome, value
+
+    def _complete(self, key: str, future: Future, result: Any = None,
+                  error: Optional[BaseException] = None) -> None:
+        """Publie le résultat (ou l'erreur) aux demandes en attente, et mémorise un succès."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is None and self.max_entries > 0:
+                self._results[key] = (time.monotonic(), result)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        """
+        Résultat de `call()` pour cette clé, partagé avec les demandes identiques.
+
+        Returns:
+            Any: Résultat mémorisé, celui de l'appel en cours, ou celui d'un nouvel appel
+        """
+        outcome, value = self._lookup(key)
+        if outcome == "hit":
+            return value
+        if outcome == "coalesced":
+            logger.debug(f"{self.name}: waiting for the identical call in flight")
+            return value.result()
+        try:
+            result = call()
+        except BaseException as e:
+            self._complete(key, value, error=e)
+            raise
+        self._complete(key, value, result)
+        return result
+
+    async def ado(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Variante asynchrone de `do`, sans bloquer la boucle d'événements en attendant."""
+        outcome, value = self._lookup(key)
+        if outcome == "hit":
+            return value
+        if outcome == "coalesced":
+            logger.debug(f"{self.name}: waiting for the identical call in flight")
+            return await asyncio.wrap_future(value)
+        try:
+            result = await call()
+        except BaseException as e:
+            self._complete(key, value, error=e)
+            raise
+        self._complete(key, value, result)
+        return result
+
+    def clear(self) -> None:
+        """Oublie les résultats mémorisés (les appels en cours ne sont pas affectés)."""
+        with self._lock:
+            self._results.clear()
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name: str) -> Optional[SingleFlight]:
+    """
+    Couche single flight partagée d'un outil, créée au premier appel.
+
+    Returns:
+        Optional[SingleFlight]: None si le partage des appels est désactivé
+    """
+    if not config.http.singleflight:
+        return None
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight(name, config.http.memo_size, config.http.memo_ttl)
+    return flight
+
+
+def do(name: str, key: str, call: Callable[[], Any]) -> Any:
+    """Appel `call()` partagé dans la couche de l'outil `name` (appel direct si elle est désactivée)."""
+    flight = get_flight(name)
+    return call() if flight is None else flight.do(key, call)
+
+
+async def ado(name: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Variante asynchrone de `do`."""
+    flight = get_flight(name)
+    return await call() if flight is None else await flight.ado(key, call)
@@ -0,0 +1,223 @@
+"""
+Validation - Contrôle des sorties de tâches au moment où elles sont produites
+
+Les LLM entourent parfois leurs réponses de délimiteurs markdown (```yaml...)
+ou produisent un JSON/YAML invalide. Ces défauts n'étaient corrigés qu'après
+coup (script `bin/clean.sh`), et un `*_ingredients.json` mal formé cassait
+silencieusement la liste de courses.
+
+Chaque tâche qui produit un fichier reçoit ici un garde-fou CrewAI
+(`Task.guardrail`) qui, dès la fin de la tâche :
+- retire les délimiteurs markdown
+- analyse le texte (JSON, YAML ou HTML) et le valide avec son schéma
+  (`RecipeIngredient`, `MenuJson`, `PaprikaRecipe`, `StructuredRecipe`)
+- en cas d'échec, renvoie l'erreur à l'agent : CrewAI ne relance que cette
+  tâche, avec l'erreur et la sortie précédente en contexte, au plus
+  `config.execution.task_validation_retries` fois, au lieu de tout le crew
+
+`ValidatedTask` écrit dans `output_file` le texte nettoyé par le garde-fou
+(CrewAI y écrirait sinon la réponse brute du LLM).
+"""
+
+import json
+import logging
+import re
+from typing import Any, Callable, Tuple, get_args
+
+import yaml
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from pydantic import BaseModel, ValidationError
+
+from menu_planner.config import config
+from menu_planner.ingredients import strip_code_fences
+from menu_planner.metrics import get_metrics
+from menu_planner.schemas import MenuJson, PaprikaRecipe, RecipeIngredient, StructuredRecipe
+
+logger = logging.getLogger("menu_planner.validation")
+
+_OPTIONAL_PAPRIKA_FIELDS = [name for name, field in PaprikaRecipe.model_fields.items()
+                            if type(None) in get_args(field.annotation)]
+
+_HTML_TAG = re.compile(r"<(!doctype|html|body|div|section|article|table|ul|h1)\b", re.IGNORECASE)
+
+
+class OutputValidationError(ValueError):
+    """Sortie de tâche invalide; le message est renvoyé tel quel à l'agent."""
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Erreurs pydantic résumées (champ et problème), une par ligne."""
+    return "\n".join(
+        f"- {'.'.join(str(part) for part in item['loc']) or 'racine'} : {item['msg']}"
+        for item in error.errors()[:10]
+    )
+
+
+def _validate(model: type, data: Any) -> BaseModel:
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        raise OutputValidationError(
+            f"La sortie ne respecte pas le schéma {model.__name__} :\n{_validation_message(e)}"
+        ) from e
+
+
+def parse_json(text: str) -> Any:
+    """
+    Analyse une sortie JSON, délimiteurs markdown retirés.
+
+    Returns:
+        Any: Données JSON décodées
+    """
+    try:
+        return json.loads(strip_code_fences(text).strip())
+    except json.JSONDecodeError as e:
+        raise OutputValidationError(f"JSON invalide : {e.msg} (ligne {e.lineno}, colonne {e.colno})") from e
+
+
+def clean_ingredients(text: str) -> str:
+    """
+    Liste d'ingrédients validée avec `RecipeIngredient`.
+
+    Returns:
+        str: Tableau JSON des ingrédients, indenté
+    """
+    data = parse_json(text)
+    if isinstance(data, dict) and "ingredients" in data:
+        data = data["ingredients"]
+    if not isinstance(data, list) or not data:
+        raise OutputValidationError("La sortie doit être un tableau JSON non vide d'ingrédients.")
+    errors, ingredients = [], []
+    for index, item in enumerate(data):
+        try:
+            ingredients.append(RecipeIngredient.model_validate(item))
+        except ValidationError as e:
+            errors.append(f"Ingrédient {index + 1} ({item!r}) :\n{_validation_message(e)}")
+    if errors:
+        raise OutputValidationError("Ingrédients invalides (name, quantity numérique, unit) :\n" + "\n".join(errors))
+    return json.dumps([item.model_dump() for item in ingredients], ensure_ascii=False, indent=2)
+
+
+def clean_menu(text: str) -> str:
+    """
+    Menu de la semaine validé avec `MenuJson`.
+
+    Returns:
+        str: Menu au format JSON
+    """
+    return _validate(MenuJson, parse_json(text)).model_dump_json(indent=2)
+
+
+def clean_structured_recipe(text: str) -> str:
+    """
+    Recette complète validée avec `StructuredRecipe`.
+
+    Returns:
+        str: Recette au format JSON
+    """
+    return _validate(StructuredRecipe, parse_json(text)).model_dump_json()
+
+
+def clean_paprika_yaml(text: str) -> str:
+    """
+    Recette Paprika 3 validée avec `PaprikaRecipe`.
+
+    Le texte YAML est conservé tel quel (délimiteurs retirés) pour garder la
+    mise en forme produite par l'agent.
+
+    Returns:
+        str: Document YAML
+    """
+    cleaned = strip_code_fences(text).strip()
+    try:
+        data = yaml.safe_load(cleaned)
+    except yaml.YAMLError as e:
+        raise OutputValidationError(f"YAML invalide : {str(e)}") from e
+    if not isinstance(data, dict):
+        raise OutputValidationError("La sortie doit être un document YAML de type clé: valeur (format Paprika 3).")
+    # "servings: 4" ou "cook_time: 30" sont lus comme des nombres, que Paprika accepte
+    data = {key: str(value) if isinstance(value, float) or (
+        isinstance(value, int) and not isinstance(value, bool) and key != "rating") else value
+        for key, value in data.items()}
+    # Les champs facultatifs (photo, notes...) peuvent être omis du YAML
+    _validate(PaprikaRecipe, {**{key: None for key in _OPTIONAL_PAPRIKA_FIELDS}, **data})
+    return cleaned + "\n"
+
+
+def clean_html(text: str) -> str:
+    """
+    Page HTML, délimiteurs retirés.
+
+    Returns:
+        str: Document HTML
+    """
+    cleaned = strip_code_fences(text).strip()
+    if not _HTML_TAG.search(cleaned[:2000]):
+        raise OutputValidationError("La sortie doit être uniquement du HTML, sans texte ni commentaire autour.")
+    return cleaned + "\n"
+
+
+def clean_text(text: str) -> str:
+    """
+    Texte libre (Markdown), délimiteurs retirés.
+
+    Returns:
+        str: Texte non vide
+    """
+    cleaned = strip_code_fences(text).strip()
+    if not cleaned:
+        raise OutputValidationError("La sortie est vide.")
+    return cleaned + "\n"
+
+
+def output_guardrail(name: str, clean: Callable[[str], str]) -> Callable[[TaskOutput], Tuple[bool, Any]]:
+    """
+    Garde-fou CrewAI d'une tâche : nettoie et valide sa sortie.
+
+    CrewAI lit le code source du garde-fou pour ses événements : c'est donc
+    une fonction, et non une instance de classe appelable.
+
+    Args:
+        name: Nom de la tâche, repris dans les logs et les mesures
+        clean: Fonction texte -> texte nettoyé, qui lève `OutputValidationError`
+
+    Returns:
+        Callable[[TaskOutput], Tuple[bool, Any]]: (True, texte nettoyé) ou (False, erreur pour l'agent)
+    """
+    def guardrail(output: TaskOutput) -> Tuple[bool, Any]:
+        try:
+            cleaned = clean(output.raw or "")
+        except OutputValidationError as e:
+            get_metrics().record_validation(name, success=False)
+            logger.warning(f"Output of task {name} rejected, retrying the task: {str(e).splitlines()[0]}")
+            return False, f"{str(e)}\nCorrige la sortie et renvoie-la complète, sans délimiteur markdown."
+        get_metrics().record_validation(name)
+        return True, cleaned
+
+    return guardrail
+
+
+class ValidatedTask(Task):
+    """Tâche dont le fichier de sortie reçoit le texte nettoyé par son garde-fou."""
+
+    def _save_file(self, result: Any) -> None:
+        if isinstance(result, str) and self.output is not None:
+            result = self.output.raw
+        super()._save_file(result)
+
+
+def validated_task(name: str, clean: Callable[[str], str], **kwargs) -> ValidatedTask:
+    """
+    Tâche CrewAI dont la sortie est validée dès qu'elle est produite.
+
+    Args:
+        name: Nom de la tâche (logs et mesures)
+        clean: Fonction de nettoyage et de validation (`clean_menu`, `clean_html`...)
+        **kwargs: Arguments de `Task` (config, output_file...)
+
+    Returns:
+        ValidatedTask: Tâche avec son garde-fou et son nombre de relances
+    """
+    return ValidatedTask(guardrail=output_guardrail(name, clean),
+                         guardrail_max_retries=config.execution.task_validation_retries, **kwargs)
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from menu_planner import batch  # noqa: E402
+from menu_planner.checkpoint import checkpoint_path  # noqa: E402
+from menu_planner.config import config  # noqa: E402
+from menu_planner.schemas import FamilyProfile  # noqa: E402
+
+
+def profiles():
+    return [FamilyProfile(name="Martin", adults=2), FamilyProfile(name="Martin", adults=1, children=2),
+            FamilyProfile(name="Dupont", adults=2)]
+
+
+def test_each_family_gets_its_own_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "checkpoint_path", None)
+    flows = batch.create_family_flows(profiles(), tmp_path)
+    paths = [checkpoint_path(flow.state.output_dir) for flow in flows]
+    assert paths == [tmp_path / "martin" / "checkpoint.json", tmp_path / "martin_2" / "checkpoint.json",
+                     tmp_path / "dupont" / "checkpoint.json"]
+
+
+def test_a_global_checkpoint_path_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "checkpoint_path", tmp_path / "checkpoint.json")
+    monkeypatch.setattr(batch.menu_main, "MaRecette", "")
+    monkeypatch.setattr(batch, "create_family_flows", lambda *args: pytest.fail("flows should not be created"))
+    assert batch.run_batch(profiles(), tmp_path) == {}
+    assert not (tmp_path / "checkpoint.json").exists()
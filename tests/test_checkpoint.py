@@ -0,0 +1,91 @@
+import json
+
+from menu_planner.checkpoint import (
+    checkpoint_path,
+    checkpointed,
+    clear_checkpoint,
+    load_checkpoint,
+    mark_recipe_completed,
+    recipe_artifacts_valid,
+    restore_state,
+    save_checkpoint,
+)
+from menu_planner.config import config
+from menu_planner.schemas import MenuState
+
+
+def new_state(tmp_path, **fields):
+    return MenuState(output_dir=str(tmp_path / "output"), **fields)
+
+
+def test_path_follows_the_output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "checkpoint_path", None)
+    assert checkpoint_path(str(tmp_path)) == tmp_path / "checkpoint.json"
+    assert checkpoint_path() == checkpoint_path(MenuState().output_dir)
+    monkeypatch.setattr(config, "checkpoint_path", tmp_path / "elsewhere.json")
+    assert checkpoint_path(str(tmp_path / "output")) == tmp_path / "elsewhere.json"
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "checkpoint_path", None)
+    state = new_state(tmp_path, recipe_ids=["tarte_pomme_1234"], parallel_results=[object()],
+                      completed_steps=["generate_menu"])
+    save_checkpoint(state)
+    path = checkpoint_path(state.output_dir)
+    data = load_checkpoint(path)
+    assert data["recipe_ids"] == ["tarte_pomme_1234"]
+    assert "parallel_results" not in data
+
+    restored = new_state(tmp_path)
+    restore_state(restored, data)
+    assert restored.recipe_ids == ["tarte_pomme_1234"]
+    assert restored.completed_steps == ["generate_menu"]
+
+    clear_checkpoint(path)
+    assert load_checkpoint(path) is None
+
+
+def test_load_ignores_a_corrupt_checkpoint(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert load_checkpoint(path) is None
+
+
+def test_completed_steps_and_recipes_are_saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "checkpoint_path", None)
+
+    class Flow:
+        def __init__(self):
+            self.state = new_state(tmp_path)
+
+        @checkpointed
+        def generate_menu(self):
+            return "ok"
+
+        @checkpointed
+        def check_state(self):
+            return False
+
+    flow = Flow()
+    flow.generate_menu()
+    flow.check_state()
+    mark_recipe_completed(flow.state, "tarte_pomme_1234")
+    data = load_checkpoint(checkpoint_path(flow.state.output_dir))
+    assert data["completed_steps"] == ["generate_menu"]
+    assert data["completed_recipes"] == ["tarte_pomme_1234"]
+
+
+def test_recipe_artifacts_valid(tmp_path):
+    recipe_input = {
+        "recipe_html_path": str(tmp_path / "r.html"),
+        "recipe_yaml_path": str(tmp_path / "r.yaml"),
+        "recipe_ingredients_path": str(tmp_path / "r_ingredients.json"),
+    }
+    assert not recipe_artifacts_valid(recipe_input)
+    (tmp_path / "r.html").write_text("<html><body>Tarte</body></html>", encoding="utf-8")
+    (tmp_path / "r.yaml").write_text("name: Tarte\n", encoding="utf-8")
+    (tmp_path / "r_ingredients.json").write_text(
+        json.dumps([{"name": "pomme", "quantity": 4, "unit": ""}]), encoding="utf-8")
+    assert recipe_artifacts_valid(recipe_input)
+    (tmp_path / "r_ingredients.json").write_text(json.dumps([{"name": "pomme"}]), encoding="utf-8")
+    assert not recipe_artifacts_valid(recipe_input)
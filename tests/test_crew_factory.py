@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from menu_planner import crew_factory  # noqa: E402
+from menu_planner.config import config  # noqa: E402
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(config.memory, "backend", "off")
+    crew_factory.clear_templates()
+    yield crew_factory
+    crew_factory.clear_templates()
+
+
+@pytest.mark.parametrize("recipe_mode", ["tasks", "structured"])
+def test_copies_are_independent_and_share_the_llm(factory, monkeypatch, recipe_mode):
+    monkeypatch.setattr(config, "recipe_mode", recipe_mode)
+    first, second = factory.create_crew("RecipeExpertCrew"), factory.create_crew("RecipeExpertCrew")
+    template = factory.get_template("RecipeExpertCrew")
+
+    assert first is not second and first is not template
+    for crew in (first, second):
+        assert len(crew.agents) == len(template.agents) and len(crew.tasks) == len(template.tasks)
+    for agents in zip(first.agents, second.agents, template.agents):
+        assert len({id(agent) for agent in agents}) == 3
+        # Le LLM (limiteurs de débit et compteurs) est celui du gabarit
+        assert len({id(agent.llm) for agent in agents}) == 1
+    for tasks in zip(first.tasks, second.tasks, template.tasks):
+        assert len({id(task) for task in tasks}) == 3
+    # Les tâches d'une copie sont confiées aux agents de cette copie
+    for crew in (first, second):
+        assert all(any(task.agent is agent for agent in crew.agents) for task in crew.tasks if task.agent)
+
+    description = template.tasks[0].description
+    first.tasks[0].description = "Recette interpolée"
+    assert second.tasks[0].description == template.tasks[0].description == description
+
+
+def test_templates_follow_the_configuration(factory, monkeypatch):
+    monkeypatch.setattr(config, "recipe_mode", "tasks")
+    template = factory.get_template("RecipeExpertCrew")
+    assert factory.get_template("RecipeExpertCrew") is template
+    monkeypatch.setattr(config, "recipe_mode", "structured")
+    assert factory.get_template("RecipeExpertCrew") is not template
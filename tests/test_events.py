@@ -0,0 +1,103 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from menu_planner import events
+from menu_planner.config import config
+from menu_planner.events import EventStream
+
+
+@pytest.fixture
+def event_settings(monkeypatch):
+    monkeypatch.setattr(config.events, "enabled", True)
+    monkeypatch.setattr(config.events, "path", None)
+    monkeypatch.setattr(config.events, "sse_port", 0)
+    monkeypatch.setattr(config.events, "llm_stream", False)
+    yield config.events
+    events.stop_event_stream()
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_events_are_written_to_the_jsonl_as_they_are_published(tmp_path, event_settings):
+    assert events.emit("ignored") is None  # aucun flux ouvert
+    events.start_event_stream("run-1", str(tmp_path))
+    events.emit("run_started", mode="menu")
+    recipe_input = {"recipe_name": "Tarte aux pommes", "recipe_id": "tarte_pomme_1234",
+                    "recipe_html_path": "output/tarte.html", "recipe_yaml_path": "output/tarte.yaml"}
+    events.emit_recipe("recipe_completed", recipe_input, source="cache")
+
+    # Chaque événement est lisible dès sa publication, avant la fin de l'exécution
+    written = read_events(tmp_path / "events.jsonl")
+    assert [event["type"] for event in written] == ["run_started", "recipe_completed"]
+    assert [event["id"] for event in written] == [1, 2]
+    assert all(event["run_id"] == "run-1" for event in written)
+    assert written[1]["recipe"] == "Tarte aux pommes"
+    assert written[1]["recipe_id"] == "tarte_pomme_1234"
+    assert written[1]["artifacts"] == {"html": "output/tarte.html", "yaml": "output/tarte.yaml"}
+    assert written[1]["source"] == "cache"
+
+    events.stop_event_stream()
+    assert events.get_event_stream() is None
+    assert events.emit("run_finished") is None
+
+
+def test_disabled_events_open_no_stream(tmp_path, event_settings, monkeypatch):
+    monkeypatch.setattr(config.events, "enabled", False)
+    assert events.start_event_stream("run-1", str(tmp_path)) is None
+    assert not (tmp_path / "events.jsonl").exists()
+
+
+def test_subscribers_receive_the_history_then_new_events():
+    stream = EventStream("run-1")
+    stream.emit("run_started")
+    subscriber = stream.subscribe()
+    stream.emit("step_started", step="generate_menu")
+    stream.close()
+    received = [subscriber.get_nowait() for _ in range(3)]
+    assert [event and event["type"] for event in received] == ["run_started", "step_started", None]
+
+
+def test_recipe_scope_tags_llm_deltas_per_thread():
+    seen = {}
+
+    def worker(recipe_id):
+        with events.recipe_scope({"recipe_id": recipe_id}):
+            seen[recipe_id] = events._local.recipe_id
+        seen[f"{recipe_id} after"] = getattr(events._local, "recipe_id", None)
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in ("tarte", "soupe")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == {"tarte": "tarte", "soupe": "soupe", "tarte after": None, "soupe after": None}
+
+
+def test_sse_server_streams_events_and_serves_output_files(tmp_path):
+    (tmp_path / "menu.html").write_text("<html>Menu</html>", encoding="utf-8")
+    (tmp_path.parent / "secret.txt").write_text("secret", encoding="utf-8")
+    stream = EventStream("run-1", root=tmp_path)
+    server = stream.serve("127.0.0.1", 0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        stream.emit("artifact", name="menu_html", path=str(tmp_path / "menu.html"))
+        stream.emit("run_finished", success=True)
+        with urllib.request.urlopen(f"{base}/events", timeout=5) as response:
+            assert response.headers["Content-Type"] == "text/event-stream"
+            body = response.read().decode("utf-8")
+        assert "event: artifact" in body and "event: run_finished" in body
+
+        with urllib.request.urlopen(f"{base}/files/{tmp_path / 'menu.html'}", timeout=5) as response:
+            assert response.read() == b"<html>Menu</html>"
+        # Les fichiers hors du dossier de sortie ne sont pas servis
+        with pytest.raises(urllib.error.HTTPError) as info:
+            urllib.request.urlopen(f"{base}/files/{tmp_path.parent / 'secret.txt'}", timeout=5)
+        assert info.value.code == 404
+    finally:
+        stream.close()
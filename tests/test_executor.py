@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from menu_planner.executor import AttemptTimeout, call_with_timeout, run_concurrently, run_in_background
+
+
+class Flaky:
+    """Fonction de test: chaque appel suit le comportement suivant de la liste (valeur, exception ou attente)."""
+
+    def __init__(self, *behaviors):
+        self.behaviors = list(behaviors)
+        self.calls = 0
+        self.finished = []
+        self.lock = threading.Lock()
+
+    def __call__(self, item):
+        with self.lock:
+            behavior = self.behaviors[min(self.calls, len(self.behaviors) - 1)]
+            self.calls += 1
+        if isinstance(behavior, threading.Event):
+            behavior.wait(5)
+            self.finished.append(item)
+            return f"{item} late"
+        if isinstance(behavior, Exception):
+            raise behavior
+        return f"{item} {behavior}"
+
+
+def test_call_with_timeout_returns_or_raises():
+    assert call_with_timeout(lambda item: item * 2, 21, None) == 42
+    assert call_with_timeout(lambda item: item * 2, 21, 1) == 42
+    with pytest.raises(ValueError):
+        call_with_timeout(Flaky(ValueError("boom")), "tarte", 1)
+
+    release = threading.Event()
+    with pytest.raises(AttemptTimeout) as info:
+        call_with_timeout(Flaky(release), "tarte", 0.05)
+    release.set()
+    info.value.worker.join(1)
+    assert info.value.outcome == {"result": "tarte late"}
+
+
+def test_failed_items_are_retried_and_completed():
+    func = Flaky(ValueError("rate limit"), "ok")
+    completed = []
+    results = run_concurrently(func, ["tarte"], max_retries=1, on_complete=lambda item, result: completed.append(result))
+    assert results == ["tarte ok"]
+    assert func.calls == 2
+    assert completed == ["tarte ok"]
+
+
+def test_items_that_keep_failing_give_none():
+    func = Flaky(ValueError("boom"))
+    completed = []
+    results = run_concurrently(func, ["tarte", "soupe"], max_concurrency=2, max_retries=2,
+                               on_complete=lambda item, result: completed.append(item))
+    assert results == [None, None]
+    assert func.calls == 6
+    assert completed == []
+
+
+def test_a_timed_out_attempt_is_awaited_before_the_retry():
+    release = threading.Event()
+    func = Flaky(release, "ok")
+    threading.Timer(0.3, release.set).start()
+    results = run_concurrently(func, ["tarte"], timeout=0.2, max_retries=1)
+    # La tentative abandonnée a fini pendant l'attente: son résultat est retenu, sans nouvel appel
+    assert results == ["tarte late"]
+    assert func.calls == 1
+
+
+def test_the_final_timed_out_attempt_is_awaited_before_returning():
+    release = threading.Event()
+    func = Flaky(ValueError("boom"), release)
+    threading.Timer(0.3, release.set).start()
+    results = run_concurrently(func, ["tarte"], timeout=0.2, max_retries=1)
+    assert results == ["tarte late"]
+    assert func.finished == ["tarte"]
+
+
+def test_a_still_running_attempt_stops_the_retries():
+    release = threading.Event()
+    func = Flaky(release, "ok")
+    completed = []
+    results = run_concurrently(func, ["tarte"], timeout=0.05, max_retries=3,
+                               on_complete=lambda item, result: completed.append(item))
+    release.set()
+    assert results == [None]
+    assert func.calls == 1
+    assert completed == []
+
+
+def test_run_in_background():
+    assert run_in_background(lambda a, b: a + b, 1, 2).result(1) == 3
+    with pytest.raises(ValueError):
+        run_in_background(Flaky(ValueError("boom")), "menu").result(1)
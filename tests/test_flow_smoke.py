@@ -0,0 +1,20 @@
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from menu_planner.benchmarks.run import run_isolated  # noqa: E402
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_offline_flow_generates_every_recipe(monkeypatch):
+    # Le flow hors ligne s'exécute dans son propre processus, comme le benchmark
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(SRC), os.getenv("PYTHONPATH")])))
+    result = run_isolated(3, latency=0.0, concurrency=2, verbose=True)
+    assert "error" not in result
+    assert result["recipes_succeeded"] == result["recipes"] == 3
+    assert result["failed_steps"] == []
+    assert result["llm_calls"] > 0
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+requests = pytest.importorskip("requests")
+
+from menu_planner.config import config  # noqa: E402
+from menu_planner.tools import http_client  # noqa: E402
+
+URL = "https://api.example.com/search"
+
+
+class StubAdapter(requests.adapters.BaseAdapter):
+    """Transport `requests` de test: renvoie les réponses `(statut, en-têtes, corps)` dans l'ordre."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status, headers, body = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body.encode("utf-8")
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def http(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.http, "cache_enabled", True)
+    monkeypatch.setattr(config.http, "cache_path", tmp_path / "http.sqlite3")
+    monkeypatch.setattr(config.http, "max_retries", 2)
+    monkeypatch.setattr(config.http, "backoff", 0.0)
+    monkeypatch.setattr(config.http, "max_backoff", 30.0)
+    monkeypatch.setattr(http_client, "_response_cache", None)
+    delays = []
+    monkeypatch.setattr(http_client.time, "sleep", delays.append)
+
+    def stub(*responses):
+        adapter = StubAdapter(responses)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        monkeypatch.setattr(http_client, "_session", session)
+        return adapter
+
+    stub.delays = delays
+    return stub
+
+
+def test_responses_are_cached_on_the_normalized_payload(http):
+    adapter = http((200, {}, '{"organic": []}'))
+    payload = {"q": "Tarte aux pommes"}
+    normalized = {"q": http_client.normalize_query(payload["q"])}
+    assert http_client.post_json(URL, {"X-API-KEY": "a"}, payload, cache_key_payload=normalized) == '{"organic": []}'
+    # Même requête normalisée, autre clé API: servie par le cache sans appel réseau
+    assert http_client.post_json(URL, {"X-API-KEY": "b"}, {"q": "tarte  AUX pommes"},
+                                 cache_key_payload=normalized) == '{"organic": []}'
+    assert len(adapter.requests) == 1
+
+    http((200, {}, '{"organic": [1]}'))
+    assert http_client.post_json(URL, {}, {"q": "soupe"}) == '{"organic": [1]}'
+
+
+def test_429_and_5xx_are_retried_with_retry_after(http):
+    adapter = http((429, {"Retry-After": "2"}, ""), (503, {}, ""), (200, {}, "ok"))
+    assert http_client.post_json(URL, {}, {"q": "tarte"}) == "ok"
+    assert len(adapter.requests) == 3
+    assert http.delays == [2.0, 0.0]
+
+
+def test_errors_are_raised_once_retries_are_exhausted(http):
+    http((500, {}, ""), (500, {}, ""), (500, {}, ""))
+    with pytest.raises(http_client.HttpStatusError) as info:
+        http_client.post_json(URL, {}, {"q": "tarte"})
+    assert info.value.status_code == 500
+
+    adapter = http((404, {}, ""))
+    with pytest.raises(http_client.HttpStatusError):
+        http_client.post_json(URL, {}, {"q": "soupe"})
+    assert len(adapter.requests) == 1
+    assert http_client.get_response_cache().get(http_client.cache_key(URL, {"q": "soupe"})) is None
+
+
+def test_the_async_client_is_reused_per_event_loop():
+    async def two_clients():
+        return http_client.get_async_client(), http_client.get_async_client()
+
+    first, again = asyncio.run(two_clients())
+    other, _ = asyncio.run(two_clients())
+    assert first is again
+    assert other is not first
+
+
+def test_async_post_retries_and_caches(http, monkeypatch):
+    responses = [httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200, text="ok")]
+    sent = []
+    delays = []
+
+    def handler(request):
+        sent.append(request)
+        return responses.pop(0)
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(http_client.asyncio, "sleep", fake_sleep)
+
+    async def post_twice():
+        http_client._async_clients[asyncio.get_running_loop()] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+        return [await http_client.apost_json(URL, {}, {"q": "tarte"}) for _ in range(2)]
+
+    assert asyncio.run(post_twice()) == ["ok", "ok"]
+    assert len(sent) == 2
+    assert delays == [1.0]
@@ -0,0 +1,80 @@
+import re
+
+import pytest
+
+from menu_planner.identity import SLUG_MAX_LENGTH, canonical_title, recipe_id, singularize, slugify
+
+
+@pytest.mark.parametrize("title, expected", [
+    # Accents, ligatures et casse
+    ("Crème brûlée", "creme brulee"),
+    ("CRÈME BRÛLÉE", "creme brulee"),
+    ("Bœuf bourguignon", "boeuf bourguignon"),
+    ("Ｔａｒｔｅ ﬁne", "tarte fine"),
+    # Pluriels
+    ("Tarte aux pommes", "tarte pomme"),
+    ("Tarte à la pomme", "tarte pomme"),
+    ("Choux de Bruxelles", "chou bruxelle"),
+    ("Gâteaux aux noix", "gateau noix"),
+    ("Riz au jus", "riz jus"),
+    ("Couscous", "couscous"),
+    # Apostrophes, ponctuation et qualificatifs
+    ("Soupe à l'oignon", "soupe oignon"),
+    ("Soupe  à  l’oignon !", "soupe oignon"),
+    ("Poulet façon basquaise (maison)", "poulet basquaise"),
+    # Titres faits uniquement de mots vides ou sans lettres
+    ("De la", "de la"),
+    ("Les", "les"),
+    ("", "recette"),
+    ("?!", "recette"),
+])
+def test_canonical_title(title, expected):
+    assert canonical_title(title) == expected
+
+
+@pytest.mark.parametrize("same", [
+    ("Tarte aux pommes", "tarte à la pomme", "TARTE AUX POMMES", "Tarte aux pommes maison"),
+    ("Crème brûlée", "creme brulee", "Crèmes brûlées"),
+    ("Soupe à l'oignon", "Soupe a l oignon"),
+])
+def test_same_dish_same_id(same):
+    assert len({recipe_id(title) for title in same}) == 1
+
+
+@pytest.mark.parametrize("title, slug", [
+    ("Tarte aux pommes", "tarte_pomme"),
+    ("De la", "de_la"),
+    ("", "recette"),
+])
+def test_recipe_id_format(title, slug):
+    identifier = recipe_id(title)
+    assert re.fullmatch(rf"{slug}_[0-9a-f]{{8}}", identifier)
+
+
+def test_truncated_slugs_keep_distinct_ids():
+    prefix = "Gratin de " + " ".join(["pommes de terre courgettes aubergines"] * 3)
+    first, second = recipe_id(prefix + " au comté"), recipe_id(prefix + " au reblochon")
+    slug = first.rsplit("_", 1)[0]
+    assert len(slug) <= SLUG_MAX_LENGTH
+    # Les slugs tronqués coïncident, le suffixe de hachage les distingue
+    assert slug == second.rsplit("_", 1)[0]
+    assert first != second
+    assert not slug.endswith("_")
+
+
+def test_a_single_long_word_is_cut():
+    identifier = recipe_id("a" * 100)
+    assert len(identifier.rsplit("_", 1)[0]) == SLUG_MAX_LENGTH
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("pommes", "pomme"), ("gateaux", "gateau"), ("choux", "chou"), ("noix", "noix"), ("jus", "jus"),
+    ("ananas", "ananas"), ("riz", "riz"), ("os", "os"), ("pois", "pois"),
+])
+def test_singularize(word, expected):
+    assert singularize(word) == expected
+
+
+def test_slugify():
+    assert slugify("Famille Dupont-Martin") == "famille_dupont_martin"
+    assert slugify("***", default="famille") == "famille"
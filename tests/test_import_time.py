@@ -0,0 +1,29 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+from menu_planner.benchmarks.import_time import BUDGETS, check
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Les machines d'intégration continue lentes peuvent élargir les budgets (comme `import_budget --scale`)
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", "1.0"))
+
+
+@pytest.mark.parametrize("module", list(BUDGETS))
+def test_import_time_budget(module, monkeypatch):
+    if module == "menu_planner.main" and importlib.util.find_spec("crewai") is None:
+        pytest.skip("crewai is not installed")
+    # Chaque mesure se fait dans un interpréteur neuf qui doit trouver le paquet
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [str(SRC), os.getenv("PYTHONPATH")])))
+    budget_ms, forbidden = BUDGETS[module]
+    if budget_ms is not None:
+        budget_ms *= SCALE
+
+    result = check(module, budget_ms, forbidden)
+
+    assert "error" not in result, result.get("error")
+    assert result["forbidden_imports"] == []
+    assert result["ok"], f"{module} took {result['median_ms']} ms (budget {result['budget_ms']} ms)"
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from menu_planner.ingredients import (
+    ShoppingAggregator,
+    aggregate_ingredient_files,
+    aggregate_ingredients,
+    normalize_unit,
+)
+from menu_planner.schemas import RecipeIngredient
+
+
+@pytest.mark.parametrize("unit, expected", [
+    ("g", ("g", 1.0)),
+    ("kg", ("g", 1000.0)),
+    ("Kilogrammes", ("g", 1000.0)),
+    ("cl", ("ml", 10.0)),
+    ("Cuillères à soupe", ("ml", 15.0)),
+    ("c. à café", ("ml", 5.0)),
+    ("", ("pièce", 1.0)),
+    ("pièces", ("pièce", 1.0)),
+    ("gousses", ("gousse", 1.0)),
+])
+def test_normalize_unit(unit, expected):
+    assert normalize_unit(unit) == expected
+
+
+def ingredient(name, quantity, unit):
+    return RecipeIngredient(name=name, quantity=quantity, unit=unit)
+
+
+def test_aggregate_converts_and_sums_same_ingredients():
+    aggregated = aggregate_ingredients([
+        ingredient("Pommes de terre", 800, "g"),
+        ingredient("Lait", 20, "cl"),
+        ingredient("pomme de terre", 0.7, "kg"),
+        ingredient("lait", 1, "l"),
+        ingredient("Oeufs", 2, ""),
+    ])
+    assert aggregated == [
+        ingredient("pommes de terre", 1.5, "kg"),
+        ingredient("lait", 1.2, "l"),
+        ingredient("oeufs", 2, "pièce"),
+    ]
+
+
+def test_aggregate_keeps_unconvertible_units_apart():
+    aggregated = aggregate_ingredients([ingredient("ail", 2, "gousses"), ingredient("ail", 10, "g")])
+    assert [(item.quantity, item.unit) for item in aggregated] == [(2, "gousse"), (10, "g")]
+
+
+def test_aggregate_empty():
+    assert aggregate_ingredients([]) == []
+
+
+def write_ingredients(path, items):
+    path.write_text(json.dumps([item.model_dump() for item in items]), encoding="utf-8")
+    return str(path)
+
+
+def test_shopping_aggregator_matches_batch_aggregation(tmp_path):
+    first = write_ingredients(tmp_path / "a_ingredients.json",
+                              [ingredient("Carottes", 300, "g"), ingredient("beurre", 20, "g")])
+    second = write_ingredients(tmp_path / "b_ingredients.json",
+                               [ingredient("carotte", 0.9, "kg"), ingredient("Crème", 20, "cl")])
+    aggregator = ShoppingAggregator([first, second])
+    # Arrivée dans le désordre, avec un doublon
+    assert aggregator.add(second)
+    assert not aggregator.complete
+    assert aggregator.add(first)
+    assert not aggregator.add(first)
+    assert aggregator.complete
+    assert aggregator.ingredients() == aggregate_ingredient_files([first, second])
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from menu_planner.library import RecipeLibrary, family_signature, parse_calories, parse_minutes
+
+FAMILY = {"adults": 2, "children": 1, "children_age": 10}
+
+
+def write_recipe(directory, name, yaml_text, ingredients):
+    """Fichiers d'une recette terminée, comme les écrit le flow."""
+    stem = directory / name.replace(" ", "_")
+    recipe_input = {"recipe_name": name, **FAMILY, "recipe_html_path": f"{stem}.html",
+                    "recipe_yaml_path": f"{stem}.yaml", "recipe_ingredients_path": f"{stem}_ingredients.json"}
+    (directory / f"{stem.name}.html").write_text(f"<html><body>{name}</body></html>", encoding="utf-8")
+    (directory / f"{stem.name}.yaml").write_text(yaml_text, encoding="utf-8")
+    (directory / f"{stem.name}_ingredients.json").write_text(json.dumps(ingredients), encoding="utf-8")
+    return recipe_input
+
+
+@pytest.fixture
+def library(tmp_path):
+    recipes = tmp_path / "recipes"
+    recipes.mkdir()
+    library = RecipeLibrary(tmp_path / "library.sqlite3")
+    library.ingest(write_recipe(recipes, "Crème brûlée", "name: Crème brûlée\ncategories: [Dessert]\n"
+                                "prep_time: 20 min\nnutritional_info: 350 kcal par portion\n",
+                                [{"name": "crème", "quantity": 50, "unit": "cl"}, {"name": "œufs", "quantity": 6}]))
+    library.ingest(write_recipe(recipes, "Poulet basquaise", "name: Poulet basquaise\ncategories: Plat\n"
+                                "prep_time: 1 h 10\nnutritional_info: 520 calories\n",
+                                [{"name": "poulet", "quantity": 1}, {"name": "poivrons", "quantity": 3}]),
+                   nutrition_notes="Riche en protéines")
+    return library
+
+
+def names(results):
+    return [recipe["name"] for recipe in results]
+
+
+def test_full_text_search_ignores_accents_and_plurals(library):
+    assert library.fts_enabled
+    assert names(library.search("creme brulee")) == ["Crème brûlée"]
+    assert names(library.search("crèmes")) == ["Crème brûlée"]
+    assert names(library.search(ingredient="poivron")) == ["Poulet basquaise"]
+    assert names(library.search("dessert")) == ["Crème brûlée"]
+    assert names(library.search(ingredient="oeuf")) == ["Crème brûlée"]
+    assert library.search("pizza") == []
+
+
+def test_search_filters(library):
+    assert names(library.search(max_calories=400)) == ["Crème brûlée"]
+    assert names(library.search(max_prep_minutes=30)) == ["Crème brûlée"]
+    assert names(library.search("poulet", family=family_signature(2, 1, 10))) == ["Poulet basquaise"]
+    assert library.search("poulet", family=family_signature(4, 0, "")) == []
+    recipe = library.search("poulet")[0]
+    assert (recipe["calories"], recipe["prep_minutes"], recipe["categories"]) == (520, 70, ["Plat"])
+
+
+def test_restore_writes_the_files_for_the_same_dish_and_family(library, tmp_path):
+    target = tmp_path / "restored"
+    recipe_input = {"recipe_name": "Crèmes brûlées", **FAMILY, "recipe_html_path": str(target / "c.html"),
+                    "recipe_yaml_path": str(target / "c.yaml"),
+                    "recipe_ingredients_path": str(target / "c_ingredients.json")}
+    assert library.restore(recipe_input)
+    assert (target / "c.html").read_text(encoding="utf-8") == "<html><body>Crème brûlée</body></html>"
+    assert json.loads((target / "c_ingredients.json").read_text(encoding="utf-8"))[1]["name"] == "œufs"
+    assert library.search("creme")[0]["uses"] == 1
+
+    assert not library.restore({**recipe_input, "adults": 4})
+    assert not library.restore({**recipe_input, "recipe_name": "Tarte Tatin"})
+
+
+def test_ingest_updates_and_keeps_the_nutrition_notes(library, tmp_path):
+    recipe_input = write_recipe(tmp_path / "recipes", "Poulet basquaise", "name: Poulet basquaise\n"
+                                "categories: [Plat, Basque]\n", [{"name": "poulet", "quantity": 1}])
+    assert library.ingest(recipe_input)
+    assert library.stats() == {"recipes": 2, "families": 1}
+    assert names(library.search(ingredient="poivron")) == []
+    assert names(library.search("basque")) == ["Poulet basquaise"]
+    notes = library._conn.execute("SELECT nutrition_notes FROM recipes WHERE name = 'Poulet basquaise'").fetchone()
+    assert notes[0] == "Riche en protéines"
+
+
+def test_ingest_rejects_invalid_files(library, tmp_path):
+    recipe_input = write_recipe(tmp_path / "recipes", "Tarte Tatin", "- pas un dictionnaire\n", [])
+    assert not library.ingest(recipe_input)
+    assert not library.ingest({**recipe_input, "recipe_yaml_path": str(tmp_path / "missing.yaml")})
+    assert library.stats()["recipes"] == 2
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("15 min", 15), ("1 h 30", 90), ("1h30", 90), ("2 heures", 120), (45, 45), ("", None),
+])
+def test_parse_minutes(value, expected):
+    assert parse_minutes(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("350 calories par portion", 350), ("Environ 420 kcal", 420), ("12 g de lipides, 300 kcal", 300), (None, None),
+])
+def test_parse_calories(value, expected):
+    assert parse_calories(value) == expected
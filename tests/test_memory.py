@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from menu_planner import memory
+from menu_planner.config import config
+from menu_planner.memory import MemoryConfigurationError, MemoryStore, SharedLTMStorage, SharedRAGStorage
+
+VOCABULARY = ["poulet", "curry", "riz", "tarte", "pomme", "sucre", "enfant"]
+
+
+def stub_embedder(texts):
+    """Sac de mots sur un vocabulaire fixe : deux textes proches ont des vecteurs proches."""
+    return [[float(word in text.lower()) for word in VOCABULARY] + [0.01] for text in texts]
+
+
+@pytest.fixture
+def store():
+    return MemoryStore(max_entries=10, ttl=0, embed=stub_embedder)
+
+
+def test_shared_rag_storage_saves_and_searches(store):
+    short_term = SharedRAGStorage(store, "short_term")
+    short_term.save("Poulet au curry et riz basmati", {"agent": "culinary_expert"})
+    short_term.save("Tarte aux pommes peu sucrée", {"agent": "nutritionist"})
+
+    results = short_term.search("curry de poulet", limit=3)
+    assert [result["context"] for result in results] == ["Poulet au curry et riz basmati"]
+    assert results[0]["metadata"] == {"agent": "culinary_expert"}
+    assert 0.35 <= results[0]["score"] <= 1.0
+    assert short_term.search("tarte pomme")[0]["context"] == "Tarte aux pommes peu sucrée"
+
+
+def test_kinds_are_kept_apart(store):
+    SharedRAGStorage(store, "short_term").save("Poulet au curry", {})
+    assert SharedRAGStorage(store, "entities").search("poulet curry") == []
+    SharedRAGStorage(store, "short_term").reset()
+    assert store.stats()["entries"] == 0
+
+
+def test_entries_are_bounded(store):
+    storage = SharedRAGStorage(store, "short_term")
+    for index in range(15):
+        storage.save(f"Poulet n°{index}", {})
+    assert store.stats()["entries"] == 10
+    assert store.stats()["evictions"] == 5
+
+
+def test_long_term_storage_returns_the_latest_evaluations(store):
+    long_term = SharedLTMStorage(store)
+    long_term.save("Recette", {"quality": 6}, "2026-01-01", 6)
+    long_term.save("Recette", {"quality": 9}, "2026-02-01", 9)
+    assert [item["score"] for item in long_term.load("Recette", 1)] == [9]
+    assert long_term.load("Autre", 1) is None
+
+
+def test_failed_embedding_stores_nothing():
+    def failing(texts):
+        raise ConnectionError("offline")
+
+    store = MemoryStore(embed=failing)
+    SharedRAGStorage(store, "short_term").save("Poulet", {})
+    assert store.stats()["entries"] == 0
+
+
+def test_vectors_are_normalized(store):
+    vectors = store.embed(["poulet curry", "tarte"])
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+
+def test_missing_embedder_disables_the_shared_memory(monkeypatch):
+    def unavailable():
+        raise MemoryConfigurationError("no embedder")
+
+    monkeypatch.setattr(config.memory, "backend", "shared")
+    monkeypatch.setattr(memory, "_store", None)
+    monkeypatch.setattr(memory, "build_embedding_function", unavailable)
+    memory.begin_run()
+    assert config.memory.backend == "off"
+    assert memory.get_memory_store() is None
+
+
+def test_crewai_short_term_memory_uses_the_shared_storage(store):
+    pytest.importorskip("crewai")
+    from crewai.memory import ShortTermMemory
+
+    short_term = ShortTermMemory(storage=SharedRAGStorage(store, "short_term"))
+    short_term.save("Poulet au curry et riz", {"agent": "culinary_expert"})
+    assert short_term.search("poulet curry")[0]["context"] == "Poulet au curry et riz"
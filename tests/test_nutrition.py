@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from menu_planner import identity
+from menu_planner.config import config
+from menu_planner.nutrition import NUTRIENTS, FoodTable, compute_menu, compute_recipes, parse_servings
+from menu_planner.schemas import RecipeIngredient
+
+TABLE = """# Table réduite pour les tests
+name,aliases,kcal,protein_g,carbs_g,fat_g,fiber_g,piece_g,density
+farine,farine de ble,350,10.0,73.0,1.0,3.0,,0.5
+oeuf,oeufs,140,12.0,0.5,10.0,0.0,50,
+pomme,pommes,50,0.3,12.0,0.2,2.0,150,
+pomme de terre,patate,80,2.0,17.0,0.1,2.0,150,
+"""
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = tmp_path / "foods.csv"
+    path.write_text(TABLE, encoding="utf-8")
+    return FoodTable.load(path)
+
+
+@pytest.fixture(autouse=True)
+def min_coverage(monkeypatch):
+    monkeypatch.setattr(config.nutrition, "min_coverage", 0.6)
+
+
+def ingredient(name, quantity, unit):
+    return RecipeIngredient(name=name, quantity=quantity, unit=unit)
+
+
+def test_match_prefers_the_longest_alias(table):
+    assert table.names[table.match("Pommes de terre nouvelles")] == "pomme de terre"
+    assert table.names[table.match("pommes golden")] == "pomme"
+    assert table.match("truffe") is None
+
+
+def test_grams(table):
+    flour, egg = table.match("farine"), table.match("oeuf")
+    assert table.grams(flour, 0.2, "kg") == pytest.approx(200)
+    assert table.grams(flour, 10, "cl") == pytest.approx(50)
+    assert table.grams(egg, 2, "") == pytest.approx(100)
+    assert table.grams(flour, 1, "pièce") is None
+
+
+def test_compute_recipes_per_serving(table):
+    recipes = {
+        "crepes": {"ingredients": [ingredient("Farine de blé", 200, "g"), ingredient("Oeufs", 2, "")],
+                   "servings": 2},
+        "truffes": {"ingredients": [ingredient("farine", 100, "g"), ingredient("truffe", 10, "g")],
+                    "servings": 1},
+    }
+    ids, per_serving, details = compute_recipes(recipes, table)
+    assert ids == ["crepes"]
+    assert per_serving.shape == (1, len(NUTRIENTS))
+    # (200 g x 350 + 100 g x 140) / 100 / 2 portions
+    assert details["crepes"]["per_serving"]["kcal"] == pytest.approx(420)
+    assert details["crepes"]["coverage"] == 1.0
+    assert details["truffes"]["per_serving"] is None
+    assert details["truffes"]["unmatched"] == ["truffe"]
+
+
+def test_compute_recipes_without_any_recipe(table):
+    ids, per_serving, _ = compute_recipes({}, table)
+    assert ids == [] and per_serving.shape == (0, len(NUTRIENTS))
+
+
+def test_compute_menu_totals(table):
+    recipes = {
+        identity.recipe_id("Crêpes"): {"ingredients": [ingredient("farine", 100, "g")], "servings": 1},
+        identity.recipe_id("Purée"): {"ingredients": [ingredient("pomme de terre", 500, "g")], "servings": 2},
+    }
+    menu = {"menu": {
+        "monday": {"lunch": {"title": "Crêpes", "calories": 0}, "dinner": {"title": "Purée", "calories": 0}},
+        "tuesday": {"lunch": {"title": "Inconnue", "calories": 0}},
+    }}
+    report = compute_menu(menu, recipes, table)
+    assert report["days"]["monday"]["kcal"] == pytest.approx(350 + 200)
+    assert report["days"]["monday"]["meals_computed"] == 2
+    assert report["days"]["tuesday"]["meals_computed"] == 0
+    assert report["week"]["kcal"] == pytest.approx(550)
+    assert report["week"]["meals_computed"] == 2
+    assert np.isclose(sum(day["kcal"] for day in report["days"].values()), report["week"]["kcal"])
+
+
+@pytest.mark.parametrize("value, expected", [("4 portions", 4), ("4-6 personnes", 4), (None, 3), ("0", 3)])
+def test_parse_servings(value, expected):
+    assert parse_servings(value, 3) == expected
@@ -0,0 +1,109 @@
+import types
+
+import pytest
+
+from menu_planner import ratelimit
+from menu_planner.ratelimit import AdaptiveConcurrency, TokenBucket, is_rate_limit_error, parse_overrides
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge de test pour le module: `clock.now` avance à la main."""
+    clock = types.SimpleNamespace(now=100.0)
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(monotonic=lambda: clock.now, sleep=lambda s: None))
+    return clock
+
+
+def test_token_bucket_reserve(clock):
+    bucket = TokenBucket(60, capacity=2)  # un jeton par seconde, rafale de deux
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+    # Les réservations s'endettent sur les jetons suivants, servies dans l'ordre d'arrivée
+    assert bucket.reserve() == pytest.approx(2.0)
+    clock.now += 2
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now += 60
+    assert bucket.reserve(2) == 0.0
+    assert bucket.reserve(5) == pytest.approx(5.0)
+
+
+def test_default_capacity_is_ten_seconds_of_quota(clock):
+    assert TokenBucket(600).capacity == 100
+    assert TokenBucket(3).capacity == 1.0
+
+
+def acquire_and_release(concurrency, latency, throttled=False):
+    assert concurrency.try_acquire()
+    concurrency.release(latency, throttled)
+
+
+def test_a_429_halves_the_limit_once_per_window(clock):
+    concurrency = AdaptiveConcurrency(8)
+    acquire_and_release(concurrency, 0.5, throttled=True)
+    assert concurrency.limit == 4.0
+    # Les appels déjà partis signalent la même saturation: pas de nouvelle diminution tout de suite
+    acquire_and_release(concurrency, 0.5, throttled=True)
+    assert concurrency.limit == 4.0
+    for _ in range(3):
+        clock.now += 2
+        acquire_and_release(concurrency, 0.5, throttled=True)
+    assert concurrency.limit == 1.0
+    assert concurrency.in_flight == 0
+
+
+def test_successes_increase_the_limit_additively(clock):
+    concurrency = AdaptiveConcurrency(4)
+    concurrency.limit = 2.0
+    acquire_and_release(concurrency, 0.5)
+    assert concurrency.limit == pytest.approx(2.5)
+    acquire_and_release(concurrency, 0.5)
+    assert concurrency.limit == pytest.approx(2.9)
+    for _ in range(20):
+        acquire_and_release(concurrency, 0.5)
+    assert concurrency.limit == 4.0
+
+
+def test_slow_calls_decrease_the_limit_after_warmup(clock):
+    concurrency = AdaptiveConcurrency(10)
+    for _ in range(ratelimit.LATENCY_WARMUP):
+        acquire_and_release(concurrency, 0.1)
+    clock.now += 2
+    acquire_and_release(concurrency, 1.0)
+    assert concurrency.limit == pytest.approx(9.0)
+
+
+def test_try_acquire_respects_the_limit(clock):
+    concurrency = AdaptiveConcurrency(2)
+    assert concurrency.try_acquire() and concurrency.try_acquire()
+    assert not concurrency.try_acquire()
+    concurrency.release(0.1)
+    assert concurrency.try_acquire()
+
+
+def test_parse_overrides():
+    assert parse_overrides("") == {}
+    assert parse_overrides("OpenAI=500/200000, serper=30") == {"openai": (500.0, 200000.0), "serper": (30.0, 0.0)}
+    assert parse_overrides("gemini=fast,ollama=10") == {"ollama": (10.0, 0.0)}
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class ProviderError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ProviderError("quota", status_code=429), True),
+    (RateLimitError("slow down"), True),
+    (ProviderError("Rate limit reached for gpt-4o-mini"), True),
+    (ProviderError("HTTP 429 Too Many Requests"), True),
+    (ProviderError("server error", status_code=500), False),
+    (ValueError("invalid JSON"), False),
+])
+def test_is_rate_limit_error(error, expected):
+    assert is_rate_limit_error(error) is expected
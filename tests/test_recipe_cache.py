@@ -0,0 +1,46 @@
+from menu_planner import recipe_cache
+from menu_planner.config import config
+from menu_planner.recipe_cache import RecipeCache, recipe_cache_key
+
+RECIPE = {"recipe_name": "Tarte aux pommes", "adults": 2, "children": 1, "children_age": 10}
+
+
+def test_key_is_stable():
+    assert recipe_cache_key(RECIPE) == recipe_cache_key(dict(RECIPE))
+
+
+def test_key_uses_the_canonical_title():
+    assert recipe_cache_key(RECIPE) == recipe_cache_key({**RECIPE, "recipe_name": "Tarte à la pomme"})
+    assert recipe_cache_key(RECIPE) != recipe_cache_key({**RECIPE, "recipe_name": "Tarte aux poires"})
+
+
+def test_key_depends_on_the_family_and_model():
+    key = recipe_cache_key(RECIPE)
+    assert key != recipe_cache_key({**RECIPE, "adults": 3})
+    assert key != recipe_cache_key({**RECIPE, "children_age": 6})
+    assert key != recipe_cache_key(RECIPE, model_name="another-model")
+
+
+def test_key_depends_on_agents_yaml(tmp_path, monkeypatch):
+    key = recipe_cache_key(RECIPE)
+    agents = tmp_path / "agents.yaml"
+    agents.write_text("culinary_expert:\n  role: Chef\n", encoding="utf-8")
+    monkeypatch.setattr(recipe_cache, "RECIPE_AGENTS_PATH", agents)
+    assert recipe_cache_key(RECIPE) != key
+
+
+def test_key_depends_on_nutrition_settings(monkeypatch):
+    key = recipe_cache_key(RECIPE)
+    monkeypatch.setattr(config.nutrition, "min_coverage", config.nutrition.min_coverage / 2)
+    assert recipe_cache_key(RECIPE) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(config.nutrition, "enabled", not config.nutrition.enabled)
+    assert recipe_cache_key(RECIPE) != key
+
+
+def test_put_and_get(tmp_path):
+    cache = RecipeCache(tmp_path / "recipes.sqlite3")
+    artifacts = {"html": b"<html></html>", "yaml": b"name: Tarte\n", "ingredients": b"[]"}
+    cache.put("key", "Tarte aux pommes", artifacts)
+    assert cache.get("key") == artifacts
+    assert cache.get("missing") is None
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from menu_planner.tools.recipe_extractor import (
+    cap_payload,
+    compact_scrape_response,
+    extract_page,
+    format_duration,
+)
+
+PAGES = Path(__file__).resolve().parent / "fixtures" / "pages"
+
+
+def page(name):
+    return (PAGES / name).read_text(encoding="utf-8")
+
+
+def test_json_ld_recipe():
+    payload = extract_page(page("jsonld_recipe.html"), "https://example.com/poulet")
+    assert payload["source"] == "json-ld"
+    recipe = payload["recipe"]
+    assert recipe["name"] == "Poulet basquaise"
+    assert recipe["description"] == "Poulet mijoté aux poivrons & tomates."
+    assert recipe["author"] == "Marie Dupont"
+    assert (recipe["prepTime"], recipe["cookTime"], recipe["totalTime"]) == ("20 min", "1 h", "1 h 20 min")
+    assert recipe["ingredients"] == ["1 poulet coupé en morceaux", "3 poivrons", "4 tomates", "2 oignons"]
+    assert recipe["instructions"] == [
+        "Préparation : Couper les poivrons en lanières.",
+        "Émincer les oignons.",
+        "Faire dorer le poulet puis ajouter les légumes.",
+        "Laisser mijoter une heure.",
+    ]
+    assert recipe["nutrition"] == {"calories": "420 kcal", "proteinContent": "35 g"}
+    assert recipe["rating"] == "4.6 (128 avis)"
+
+
+def test_microdata_recipe():
+    payload = extract_page(page("microdata_recipe.html"))
+    assert payload["source"] == "microdata"
+    recipe = payload["recipe"]
+    assert recipe["name"] == "Tarte aux pommes"
+    assert recipe["recipeYield"] == "6 parts"
+    assert (recipe["prepTime"], recipe["cookTime"]) == ("30 min", "45 min")
+    assert recipe["ingredients"] == ["1 pâte brisée", "6 pommes", "50 g de sucre"]
+    assert recipe["instructions"] == ["Éplucher et couper les pommes.",
+                                      "Les disposer sur la pâte et saupoudrer de sucre.",
+                                      "Cuire 45 minutes à 180 °C."]
+    assert recipe["nutrition"] == {"calories": "310 kcal"}
+
+
+def test_page_without_schema_keeps_the_main_content():
+    payload = extract_page(page("article_page.html"))
+    assert payload["source"] == "content"
+    assert payload["title"] == "Bien choisir ses légumes de saison"
+    assert payload["description"] == "Nos conseils pour cuisiner de saison."
+    content = payload["content"]
+    assert content.startswith("Bien choisir ses légumes de saison\nLes légumes de saison")
+    assert "les asperges" in content
+    for boilerplate in ("Accueil", "cookies", "dataLayer", "Publicité", "Mentions légales", "Lire aussi"):
+        assert boilerplate not in content
+
+
+def test_scrape_envelope_is_compacted():
+    body = json.dumps({"info": {"statusCode": 200, "finalUrl": "https://example.com/tarte"},
+                       "body": page("microdata_recipe.html")})
+    result = compact_scrape_response(body, "https://example.com/t", max_chars=4000)
+    payload = json.loads(result)
+    assert payload["url"] == "https://example.com/tarte"
+    assert payload["recipe"]["name"] == "Tarte aux pommes"
+    assert len(result) < len(body)
+
+
+@pytest.mark.parametrize("name", ["jsonld_recipe.html", "microdata_recipe.html", "article_page.html"])
+@pytest.mark.parametrize("max_chars", [150, 250, 350])
+def test_results_respect_the_size_cap(name, max_chars):
+    result = compact_scrape_response(page(name), max_chars=max_chars)
+    assert len(result) <= max_chars
+    payload = json.loads(result)
+    assert payload["truncated"] is True
+
+
+def test_recipe_cap_drops_the_last_steps_first():
+    payload = extract_page(page("jsonld_recipe.html"))
+    capped = json.loads(cap_payload(payload, 520))
+    assert capped["truncated"] is True
+    assert capped["recipe"]["name"] == "Poulet basquaise"
+    steps = capped["recipe"]["instructions"]
+    assert steps == payload["recipe"]["instructions"][:len(steps)]
+    assert len(steps) < len(payload["recipe"]["instructions"])
+    assert json.loads(cap_payload(payload, 0)) == payload
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("PT1H30M", "1 h 30 min"), ("PT45M", "45 min"), ("PT2H", "2 h"), ("P1DT0H", "24 h"), ("20 minutes", "20 minutes"),
+])
+def test_format_duration(value, expected):
+    assert format_duration(value) == expected
@@ -0,0 +1,84 @@
+import json
+
+import yaml
+
+from menu_planner.checkpoint import recipe_artifacts_valid
+from menu_planner.ingredients import load_ingredients_file
+from menu_planner.rendering import render_recipe_file, structured_recipe_from_output, write_recipe_files
+from menu_planner.schemas import PaprikaRecipe, RecipeIngredient, StructuredRecipe
+
+
+def structured_recipe(**fields):
+    return StructuredRecipe(**{
+        "name": "Gratin dauphinois",
+        "servings": "4 personnes",
+        "prep_time": "20 min",
+        "cook_time": "1 h",
+        "difficulty": "Facile",
+        "categories": ["Plat", "Végétarien"],
+        "nutritional_info": "380 kcal par portion",
+        "source_url": "pas une URL",
+        "notes": "Les enfants peuvent disposer les rondelles.",
+        "ingredients": [RecipeIngredient(name="pommes de terre", quantity=1.2, unit="kg"),
+                        RecipeIngredient(name="crème & lait", quantity=50, unit="cl"),
+                        RecipeIngredient(name="gousse d'ail", quantity=2, unit="pièce")],
+        "directions": ["Éplucher et couper les pommes de terre.", "Cuire 1 h à 160 °C."],
+        "nutrition_tips": ["Servir avec une salade verte."],
+        **fields,
+    })
+
+
+def recipe_paths(tmp_path, name="gratin"):
+    return {"recipe_name": "Gratin dauphinois", "recipe_html_path": str(tmp_path / f"{name}.html"),
+            "recipe_yaml_path": str(tmp_path / f"{name}.yaml"),
+            "recipe_ingredients_path": str(tmp_path / f"{name}_ingredients.json")}
+
+
+def test_structured_recipe_writes_the_three_files(tmp_path):
+    recipe_input = recipe_paths(tmp_path)
+    write_recipe_files(structured_recipe(subtitle="Le classique du dimanche"), recipe_input)
+    assert recipe_artifacts_valid(recipe_input)
+
+    paprika = PaprikaRecipe(**yaml.safe_load((tmp_path / "gratin.yaml").read_text(encoding="utf-8")))
+    assert paprika.ingredients == "1.2 kg pommes de terre\n50 cl crème & lait\n2 pièce gousse d'ail"
+    assert paprika.directions == "1. Éplucher et couper les pommes de terre.\n2. Cuire 1 h à 160 °C."
+    assert paprika.source_url is None  # une URL invalide n'empêche pas l'export Paprika
+    assert "directions: |" in (tmp_path / "gratin.yaml").read_text(encoding="utf-8")
+
+    ingredients = load_ingredients_file(recipe_input["recipe_ingredients_path"])
+    assert [item.name for item in ingredients] == ["pommes de terre", "crème & lait", "gousse d'ail"]
+
+    page = (tmp_path / "gratin.html").read_text(encoding="utf-8")
+    for text in ("Gratin dauphinois", "Le classique du dimanche", "pommes de terre (1.2 kg)",
+                 "gousse d&#39;ail (2 pièces)", "crème &amp; lait (50 cl)", "Cuire 1 h à 160 °C.",
+                 "380 kcal par portion", "Servir avec une salade verte.",
+                 "Les enfants peuvent disposer les rondelles."):
+        assert text in page
+
+
+def test_rendering_is_deterministic(tmp_path):
+    first, second = recipe_paths(tmp_path, "first"), recipe_paths(tmp_path, "second")
+    write_recipe_files(structured_recipe(), first)
+    write_recipe_files(structured_recipe(), second)
+    for key in ("recipe_html_path", "recipe_yaml_path", "recipe_ingredients_path"):
+        with open(first[key], "rb") as a, open(second[key], "rb") as b:
+            assert a.read() == b.read()
+
+
+def test_html_rendered_from_the_files_matches_the_structured_rendering(tmp_path):
+    recipe_input = recipe_paths(tmp_path)
+    write_recipe_files(structured_recipe(), recipe_input)
+    structured_page = (tmp_path / "gratin.html").read_bytes()
+    assert render_recipe_file(recipe_input, "Servir avec une salade verte.")
+    assert (tmp_path / "gratin.html").read_bytes() == structured_page
+
+
+def test_structured_recipe_from_raw_output():
+    class Output:
+        pydantic = None
+        raw = "```json\n" + structured_recipe().model_dump_json() + "\n```"
+
+    recipe = structured_recipe_from_output(Output())
+    assert recipe == structured_recipe()
+    Output.raw = json.dumps({"name": "Gratin"})
+    assert structured_recipe_from_output(Output()) is None
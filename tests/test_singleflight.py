@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+from menu_planner.metrics import get_metrics, reset_metrics
+from menu_planner.tools import singleflight
+from menu_planner.tools.singleflight import SingleFlight, normalize_search_query
+
+
+@pytest.fixture(autouse=True)
+def metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def counters(name="serper"):
+    return get_metrics().tool_cache.get(name, {"hits": 0, "misses": 0, "coalesced": 0})
+
+
+class BlockingCall:
+    """Appel de test qui attend `release` avant de rendre son résultat (ou de lever `error`)."""
+
+    def __init__(self, result="résultats", error=None):
+        self.result = result
+        self.error = error
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def run_in_threads(flight, key, call, count):
+    results, errors = [], []
+
+    def target():
+        try:
+            results.append(flight.do(key, call))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    flight = SingleFlight("serper")
+    call = BlockingCall()
+    threads, results, errors = run_in_threads(flight, "poulet basquaise", call, 4)
+    call.started.wait(5)
+    wait_for(lambda: counters()["coalesced"] == 3)
+    call.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert call.calls == 1
+    assert results == ["résultats"] * 4 and errors == []
+    assert counters() == {"hits": 0, "misses": 1, "coalesced": 3}
+    # Une fois l'appel terminé, la demande suivante est servie par la mémoire
+    assert flight.do("poulet basquaise", call) == "résultats"
+    assert call.calls == 1
+    assert counters()["hits"] == 1
+
+
+def test_errors_are_shared_but_not_memoized():
+    flight = SingleFlight("serper")
+    call = BlockingCall(error=RuntimeError("quota"))
+    threads, results, errors = run_in_threads(flight, "tarte", call, 3)
+    call.started.wait(5)
+    wait_for(lambda: counters()["coalesced"] == 2)
+    call.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [] and len(errors) == 3
+
+    retry = BlockingCall(result="ok")
+    retry.release.set()
+    assert flight.do("tarte", retry) == "ok"
+    assert retry.calls == 1
+    assert counters() == {"hits": 0, "misses": 2, "coalesced": 2}
+
+
+def test_results_expire_after_the_ttl(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(singleflight, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    flight = SingleFlight("serper", ttl=60)
+    calls = []
+    call = lambda: calls.append(1) or len(calls)
+
+    assert flight.do("soupe", call) == 1
+    clock.now += 59
+    assert flight.do("soupe", call) == 1
+    clock.now += 2
+    assert flight.do("soupe", call) == 2
+    assert counters() == {"hits": 1, "misses": 2, "coalesced": 0}
+
+
+def test_least_recently_used_results_are_evicted():
+    flight = SingleFlight("scrapeninja", max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        flight.do(key, lambda: key)
+    flight.do("b", lambda: "b again")
+    assert counters("scrapeninja") == {"hits": 1, "misses": 4, "coalesced": 0}
+
+
+def test_async_calls_share_the_same_layer():
+    flight = SingleFlight("serper")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def both():
+        return await asyncio.gather(flight.ado("tarte", call), flight.ado("tarte", call))
+
+    assert asyncio.run(both()) == ["ok", "ok"]
+    assert len(calls) == 1
+    assert counters() == {"hits": 0, "misses": 1, "coalesced": 1}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Poulet basquaise recette", "basquaise poulet recette"),
+    ("recette : poulet BASQUAISE", "basquaise poulet recette"),
+    ("Crème brûlée", "brulee creme"),
+    ("curry au poulet", "curry poulet"),
+    ("poulet poulet au curry", "curry poulet"),
+    ("de la", "de la"),
+])
+def test_normalize_search_query(query, expected):
+    assert normalize_search_query(query) == expected
@@ -0,0 +1,118 @@
+import inspect
+import json
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+pytest.importorskip("crewai")
+
+from menu_planner.validation import (  # noqa: E402
+    OutputValidationError,
+    clean_html,
+    clean_ingredients,
+    clean_menu,
+    clean_paprika_yaml,
+    clean_structured_recipe,
+    clean_text,
+    output_guardrail,
+    parse_json,
+)
+
+INGREDIENTS = [{"name": "pomme", "quantity": 4, "unit": ""}, {"name": "sucre", "quantity": 50, "unit": "g"}]
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MENU = {"menu": {day: {meal: {"title": f"{meal} {day}", "description": "Plat", "calories": 500}
+                       for meal in ("lunch", "dinner")} for day in DAYS}}
+
+PAPRIKA_YAML = """name: Tarte aux pommes
+servings: 4
+source: Maison
+source_url: https://example.org/tarte
+prep_time: 20 min
+cook_time: 35
+categories:
+  - Dessert
+difficulty: Facile
+rating: 5
+ingredients: |
+  4 pommes
+directions: |
+  1. Cuire.
+"""
+
+
+def fenced(text, language="json"):
+    return f"```{language}\n{text}\n```"
+
+
+def test_parse_json_strips_code_fences():
+    assert parse_json(fenced('{"a": 1}')) == {"a": 1}
+    with pytest.raises(OutputValidationError, match="JSON invalide"):
+        parse_json("{'a': 1}")
+
+
+@pytest.mark.parametrize("data", [INGREDIENTS, {"ingredients": INGREDIENTS}])
+def test_clean_ingredients(data):
+    cleaned = json.loads(clean_ingredients(fenced(json.dumps(data))))
+    assert cleaned == [{"name": "pomme", "quantity": 4.0, "unit": ""}, {"name": "sucre", "quantity": 50.0, "unit": "g"}]
+
+
+@pytest.mark.parametrize("data, message", [
+    ([], "non vide"),
+    ([{"name": "pomme", "quantity": "quelques", "unit": ""}], "Ingrédient 1"),
+])
+def test_clean_ingredients_rejects(data, message):
+    with pytest.raises(OutputValidationError, match=message):
+        clean_ingredients(json.dumps(data))
+
+
+def test_clean_menu():
+    assert json.loads(clean_menu(fenced(json.dumps(MENU)))) == MENU
+    broken = json.loads(json.dumps(MENU))
+    del broken["menu"]["sunday"]["dinner"]
+    with pytest.raises(OutputValidationError, match="menu.sunday.dinner"):
+        clean_menu(json.dumps(broken))
+
+
+def test_clean_structured_recipe_keeps_the_url_as_text():
+    recipe = {"name": "Tarte", "servings": "4", "prep_time": "20 min", "difficulty": "Facile",
+              "source_url": "https://example.org/tarte", "ingredients": INGREDIENTS, "directions": ["Cuire."]}
+    cleaned = json.loads(clean_structured_recipe(json.dumps(recipe)))
+    assert cleaned["source_url"] == "https://example.org/tarte"
+    with pytest.raises(OutputValidationError, match="StructuredRecipe"):
+        clean_structured_recipe(json.dumps({**recipe, "directions": "Cuire."}))
+
+
+def test_clean_paprika_yaml_accepts_numbers_and_omitted_fields():
+    cleaned = clean_paprika_yaml(fenced(PAPRIKA_YAML, "yaml"))
+    assert yaml.safe_load(cleaned)["name"] == "Tarte aux pommes"
+    assert not cleaned.startswith("```")
+
+
+def test_clean_paprika_yaml_rejects():
+    with pytest.raises(OutputValidationError, match="YAML invalide"):
+        clean_paprika_yaml("name: [Tarte")
+    with pytest.raises(OutputValidationError, match="clé: valeur"):
+        clean_paprika_yaml("- Tarte")
+    with pytest.raises(OutputValidationError, match="PaprikaRecipe"):
+        clean_paprika_yaml(PAPRIKA_YAML.replace("difficulty: Facile\n", ""))
+
+
+def test_clean_html_and_text():
+    assert clean_html(fenced("<!DOCTYPE html><html></html>", "html")) == "<!DOCTYPE html><html></html>\n"
+    with pytest.raises(OutputValidationError):
+        clean_html("Voici la page demandée.")
+    assert clean_text(fenced("# Liste", "markdown")) == "# Liste\n"
+    with pytest.raises(OutputValidationError):
+        clean_text("```\n```")
+
+
+def test_output_guardrail():
+    guardrail = output_guardrail("menu", clean_menu)
+    # CrewAI lit le code source du garde-fou
+    assert inspect.getsource(guardrail)
+    assert guardrail(SimpleNamespace(raw=json.dumps(MENU))) == (True, clean_menu(json.dumps(MENU)))
+    success, feedback = guardrail(SimpleNamespace(raw="pas du JSON"))
+    assert not success
+    assert "JSON invalide" in feedback